@@ -1,6 +1,10 @@
-# == Setting up SQLite database in memory ================================
+# == Setting up SQLite database ==========================================
 # https://stackoverflow.com/a/32681822
+import os
+import sqlite3
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
 
 # Instancia la base de datos utilizando SQLAlchemy. 
 db = SQLAlchemy()
@@ -12,10 +16,145 @@ class Config:
     Esta clase contiene las configuraciones de la aplicación, en particular
     las relacionadas con la base de datos.
     """
-    # URI de la base de datos. En este caso, se está utilizando SQLite en memoria.
-    # SQLALCHEMY_DATABASE_URI = 'sqlite:///database.db'
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    # Hilos de waitress que atienden peticiones. El pool de conexiones a la base
+    # de datos se dimensiona a partir de este valor.
+    THREADS = int(os.getenv("THREADS", "4"))
+
+    # Procesos de waitress que comparten el socket de escucha (WORKERS > 1
+    # requiere una base de datos en disco), conexiones pendientes de aceptar,
+    # conexiones abiertas a la vez por proceso y segundos tras los que se
+    # cierra una conexion inactiva.
+    WORKERS = int(os.getenv("WORKERS", "1"))
+    BACKLOG = int(os.getenv("BACKLOG", "1024"))
+    CONNECTION_LIMIT = int(os.getenv("CONNECTION_LIMIT", "100"))
+    CHANNEL_TIMEOUT = int(os.getenv("CHANNEL_TIMEOUT", "120"))
+
+    # Numero de hilos del pool de verificacion en segundo plano.
+    EMAIL_VERIFICATION_WORKERS = int(os.getenv("EMAIL_VERIFICATION_WORKERS", "8"))
+
+    # Almacenamiento de la base de datos:
+    # - 'file': SQLite en fichero (DATABASE_PATH, relativo a la carpeta
+    #   instance/ de la aplicacion) en modo WAL. Los datos sobreviven a los
+    #   reinicios y los lectores no esperan a los escritores.
+    # - 'memory': SQLite en memoria con cache compartida, de modo que todas las
+    #   conexiones del pool ven la misma base de datos. Pensado para pruebas.
+    # DATABASE_URI permite indicar directamente cualquier otra URI.
+    STORAGE = os.getenv("STORAGE", "file")
+    DATABASE_PATH = os.getenv("DATABASE_PATH", "database.db")
+    if STORAGE == "memory":
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///file:roams?mode=memory&cache=shared&uri=true'
+    else:
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{DATABASE_PATH}'
+    SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URI", SQLALCHEMY_DATABASE_URI)
+
+    # Pool de conexiones: una conexion por hilo de waitress y, como desborde,
+    # una por hilo de verificacion en segundo plano. `timeout` es el tiempo que
+    # SQLite espera a que se libere un bloqueo de escritura antes de fallar.
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "poolclass": QueuePool,
+        "pool_size": int(os.getenv("DB_POOL_SIZE", THREADS)),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", EMAIL_VERIFICATION_WORKERS)),
+        "connect_args": {
+            "check_same_thread": False,
+            "timeout": float(os.getenv("SQLITE_BUSY_TIMEOUT", "5")),
+        },
+    }
+
+    # PRAGMAs que se aplican a cada conexion SQLite nueva.
+    SQLITE_PRAGMAS = {
+        "journal_mode": "WAL" if STORAGE != "memory" else "MEMORY",
+        "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+        # Negativo: tamaño en KiB (64 MiB por conexion)
+        "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-65536")),
+        "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+        "temp_store": os.getenv("SQLITE_TEMP_STORE", "MEMORY"),
+    }
 
     # Esta configuración habilita el seguimiento de modificaciones de los objetos
     # de la base de datos.
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Modo de verificacion del correo de los clientes:
+    # - 'sync': las comprobaciones DNS/SMTP se hacen durante la peticion.
+    # - 'async': se guarda el cliente con el correo en estado 'pending' y las
+    #   comprobaciones se hacen en segundo plano en un pool de hilos.
+    EMAIL_VERIFICATION = os.getenv("EMAIL_VERIFICATION", "sync")
+
+    # Registros por bloque en la importacion masiva de clientes (validacion,
+    # consulta de existentes e insercion en lote).
+    BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "500"))
+
+    # Tamaño de pagina por defecto y maximo de los listados paginados
+    # (GET /api/client y GET /api/mortgage).
+    PAGE_SIZE = int(os.getenv("PAGE_SIZE", "100"))
+    MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "1000"))
+
+    # Filas que se leen de la base de datos por lote en los listados en streaming.
+    STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "1000"))
+
+    # Numero maximo de hipotecas por peticion en POST /api/client/<dni>/mortgage/batch.
+    MORTGAGE_BATCH_MAX = int(os.getenv("MORTGAGE_BATCH_MAX", "100"))
+
+    # Numero maximo de valores de TAE y de plazos en una tabla de cotizacion.
+    QUOTE_MAX_POINTS = int(os.getenv("QUOTE_MAX_POINTS", "200"))
+
+    # Segundos que los navegadores pueden reutilizar la pagina del explorador
+    # sin volver a pedirla (Cache-Control: max-age).
+    INDEX_MAX_AGE = int(os.getenv("INDEX_MAX_AGE", "60"))
+
+    # Cache de lectura de clientes serializados: backend ('local' o la ruta
+    # 'modulo:Clase' de un backend compartido), numero de entradas y segundos
+    # que puede vivir una entrada (limita la desincronizacion entre procesos).
+    CLIENT_CACHE_BACKEND = os.getenv("CLIENT_CACHE_BACKEND", "local")
+    CLIENT_CACHE_SIZE = int(os.getenv("CLIENT_CACHE_SIZE", "10000"))
+    CLIENT_CACHE_TTL = float(os.getenv("CLIENT_CACHE_TTL", "60"))
+
+    # Precalentar la aplicacion al crearla (plantillas del explorador,
+    # expresiones regulares de los validadores y pool de conexiones).
+    WARM_UP = os.getenv("WARM_UP", "0").lower() in ("1", "true", "yes")
+
+    # Respuestas guardadas por Idempotency-Key en las rutas POST de clientes e
+    # hipotecas: numero maximo, segundos que se conservan y segundos que una
+    # peticion repetida espera a que termine la original en curso.
+    IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "10000"))
+    IDEMPOTENCY_TTL = float(os.getenv("IDEMPOTENCY_TTL", "86400"))
+    IDEMPOTENCY_WAIT_TIMEOUT = float(os.getenv("IDEMPOTENCY_WAIT_TIMEOUT", "30"))
+
+    # Numero maximo de identificadores por peticion en POST /api/validate/dni.
+    VALIDATE_MAX_IDS = int(os.getenv("VALIDATE_MAX_IDS", "100000"))
+
+    # Logging estructurado (JSON) a traves de una cola con un hilo escritor:
+    # nivel minimo, fraccion de peticiones correctas que se registran en el log
+    # de acceso (los errores se registran siempre) y tamaño de la cola (si se
+    # llena, los registros se descartan en vez de bloquear las peticiones).
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+    LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+    # Serializador de las respuestas JSON: 'auto' usa orjson si esta instalado
+    # y si no la libreria estandar, 'orjson' exige orjson y 'std' usa siempre
+    # la libreria estandar.
+    JSON_PROVIDER = os.getenv("JSON_PROVIDER", "auto")
+
+
+def init_storage(app):
+    """
+    Inicializa la base de datos de la aplicacion y registra los PRAGMAs de
+    SQLITE_PRAGMAS para que se apliquen a cada conexion nueva del pool.
+
+    Args:
+        app (Flask): Aplicacion Flask ya configurada.
+    """
+    db.init_app(app)
+    pragmas = app.config.get("SQLITE_PRAGMAS", {})
+
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        if not isinstance(dbapi_connection, sqlite3.Connection):
+            return
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    with app.app_context():
+        event.listen(db.engine, "connect", set_sqlite_pragmas)
@@ -1,2 +1,5 @@
 from .client import Client
-from .mortgage import Mortgage
\ No newline at end of file
+from .mortgage import Mortgage
+from .table_version import TableVersion
+from .portfolio_stat import PortfolioStat
+from .migrations import migrate_schema
@@ -23,6 +23,18 @@ class Client(db.Model):
             type: integer
             description: Capital financiero del cliente.
             example: 5000
+        email_status:
+            type: string
+            description: Estado de verificacion del correo (pending, verified, invalid) o null si no tiene correo.
+            example: "verified"
+        email_error:
+            type: string
+            description: Motivo por el que el correo no es valido, si lo hay.
+            example: null
+        version:
+            type: integer
+            description: Version del cliente. Cambia con cada modificacion del cliente o de sus hipotecas.
+            example: 3
         mortgages:
             type: array
             items:
@@ -39,6 +51,9 @@ class Client(db.Model):
     name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(100), nullable=True)
     capital = db.Column(db.Integer, nullable=True)
+    email_status = db.Column(db.String(16), nullable=True)
+    email_error = db.Column(db.String(100), nullable=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
     # https://www.tutorialspoint.com/sqlalchemy/sqlalchemy_orm_building_relationship.htm
     mortgages = db.relationship('Mortgage', back_populates='client', cascade="all, delete-orphan")
 
@@ -55,15 +70,40 @@ class Client(db.Model):
                 "name": "Juan Perez",
                 "email": "juan.perez@example.com",
                 "capital": 5000,
+                "email_status": "verified",
+                "email_error": None,
                 "mortgages": []
             }
         """
+        return Client.row_dict(
+            (self.dni, self.name, self.email, self.capital, self.email_status, self.email_error),
+            [mortgage.get_dict() for mortgage in self.mortgages]
+        )
+
+    @classmethod
+    def row_columns(cls):
+        """
+        Columnas necesarias para serializar un cliente sin cargar la instancia
+        (consultas de SQLAlchemy Core), en el orden que espera `row_dict`.
+        """
+        return (cls.dni, cls.name, cls.email, cls.capital, cls.email_status, cls.email_error)
+
+    @staticmethod
+    def row_dict(row, mortgages):
+        """
+        Diccionario de un cliente a partir de una fila con las columnas de
+        `row_columns` y de sus hipotecas ya serializadas. Es la misma
+        representacion que `get_dict`.
+        """
+        dni, name, email, capital, email_status, email_error = row
         return {
-            "dni": self.dni.upper(),
-            "name": self.name,
-            "email": self.email,
-            "capital": self.capital,
-            "mortgages": [mortgage.get_dict() for mortgage in self.mortgages]
+            "dni": dni.upper(),
+            "name": name,
+            "email": email,
+            "capital": capital,
+            "email_status": email_status,
+            "email_error": email_error,
+            "mortgages": mortgages
         }
 
     # Representation 
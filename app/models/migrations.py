@@ -0,0 +1,104 @@
+from config import db
+
+# == Schema migrations ====================================================
+# Cada paso recibe una conexion dentro de una transaccion y debe ser idempotente:
+# en una base de datos nueva `db.create_all()` ya crea el esquema final, y los
+# pasos solo deben actuar sobre bases de datos creadas con versiones anteriores.
+# La version aplicada se guarda en `PRAGMA user_version`.
+
+def _columns(connection, table):
+    """Nombres de las columnas de una tabla."""
+    return {row[1] for row in connection.exec_driver_sql(f"PRAGMA table_info({table})")}
+
+def _add_client_version_columns(connection):
+    """Columnas de estado de verificacion del correo y de version del cliente."""
+    columns = _columns(connection, "client")
+    if "email_status" not in columns:
+        connection.exec_driver_sql("ALTER TABLE client ADD COLUMN email_status VARCHAR(16)")
+    if "email_error" not in columns:
+        connection.exec_driver_sql("ALTER TABLE client ADD COLUMN email_error VARCHAR(100)")
+    if "version" not in columns:
+        connection.exec_driver_sql("ALTER TABLE client ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+
+def _rekey_mortgage_by_client(connection):
+    """
+    Cambia la clave primaria de las hipotecas de (tae, years) a (dni, tae, years)
+    y crea el indice de cobertura por dni. SQLite no permite cambiar la clave
+    primaria de una tabla, por lo que se reconstruye la tabla.
+    """
+    primary_key = {row[1] for row in connection.exec_driver_sql("PRAGMA table_info(mortgage)") if row[5]}
+    if not primary_key or "dni" in primary_key:
+        return
+    connection.exec_driver_sql("ALTER TABLE mortgage RENAME TO mortgage_old")
+    connection.exec_driver_sql(
+        "CREATE TABLE mortgage ("
+        " dni VARCHAR(9) NOT NULL,"
+        " tae INTEGER NOT NULL,"
+        " years INTEGER NOT NULL,"
+        " monthly_fee INTEGER NOT NULL,"
+        " PRIMARY KEY (dni, tae, years),"
+        " FOREIGN KEY(dni) REFERENCES client (dni))"
+    )
+    connection.exec_driver_sql(
+        "INSERT INTO mortgage (dni, tae, years, monthly_fee)"
+        " SELECT dni, tae, years, monthly_fee FROM mortgage_old"
+    )
+    connection.exec_driver_sql("DROP TABLE mortgage_old")
+    connection.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_mortgage_dni_covering ON mortgage (dni, tae, years, monthly_fee)"
+    )
+
+def _add_mortgage_capital(connection):
+    """
+    Columna de capital prestado de las hipotecas. En las hipotecas existentes se
+    obtiene invirtiendo la formula de la cuota: C = cuota * (1 - (1 + i) ^ -n) / i.
+    """
+    if "capital" in _columns(connection, "mortgage"):
+        return
+    connection.exec_driver_sql("ALTER TABLE mortgage ADD COLUMN capital INTEGER")
+    rows = connection.exec_driver_sql("SELECT dni, tae, years, monthly_fee FROM mortgage").fetchall()
+    for dni, tae, years, fee in rows:
+        i, n = tae / 1200, years * 12
+        capital = fee * n if i == 0 else fee * (1 - (1 + i) ** -n) / i
+        connection.exec_driver_sql(
+            "UPDATE mortgage SET capital = ? WHERE dni = ? AND tae = ? AND years = ?",
+            (round(capital), dni, tae, years)
+        )
+
+def _fill_portfolio_stats(connection):
+    """Calcula por primera vez los agregados de la cartera."""
+    if connection.exec_driver_sql("SELECT COUNT(*) FROM portfolio_stat").scalar():
+        return
+    from services.stats_service import recompute_portfolio_stats
+    recompute_portfolio_stats(connection)
+
+def _seed_table_versions(connection):
+    """
+    Crea las filas de los contadores de version, para que `bump_version` solo
+    tenga que actualizarlas (dos primeras escrituras concurrentes no compiten
+    por insertar la misma fila).
+    """
+    from .table_version import TableVersion
+    for name in TableVersion.NAMES:
+        connection.exec_driver_sql("INSERT OR IGNORE INTO table_version (name, version) VALUES (?, 0)", (name,))
+
+MIGRATIONS = [
+    _add_client_version_columns,
+    _rekey_mortgage_by_client,
+    _add_mortgage_capital,
+    _fill_portfolio_stats,
+    _seed_table_versions,
+]
+
+def migrate_schema():
+    """
+    Crea las tablas que no existan y aplica los pasos de migracion pendientes.
+    Se puede llamar en cada arranque. Requiere un contexto de aplicacion.
+    """
+    db.create_all()
+    with db.engine.begin() as connection:
+        current = connection.exec_driver_sql("PRAGMA user_version").scalar()
+        for version, step in enumerate(MIGRATIONS, start=1):
+            if version > current:
+                step(connection)
+        connection.exec_driver_sql(f"PRAGMA user_version = {len(MIGRATIONS)}")
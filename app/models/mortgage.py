@@ -23,17 +23,32 @@ class Mortgage(db.Model):
             type: integer
             description: Cuota mensual de la hipoteca en euros.
             example: 500
+        capital:
+            type: integer
+            description: Capital prestado (capital del cliente al contratar la hipoteca).
+            example: 100000
         total_fee:
             type: integer
             description: Calculo del total a pagar durante la duracion completa de la hipoteca.
             example: 120000
     """
-    dni = db.Column(db.String(9), db.ForeignKey('client.dni'), nullable=False)
+    # Clave primaria (dni, tae, years): cada cliente tiene sus propias hipotecas
+    # y las de un cliente forman un rango contiguo del indice.
+    dni = db.Column(db.String(9), db.ForeignKey('client.dni'), primary_key=True)
     tae = db.Column(db.Integer, primary_key=True)
     years = db.Column(db.Integer, primary_key=True)
     monthly_fee = db.Column(db.Integer, nullable=False)
+    # Solo lo leen las estadisticas: se difiere para que el listado siga
+    # resolviendose con el indice de cobertura.
+    capital = db.deferred(db.Column(db.Integer, nullable=True))
     client = db.relationship("Client", back_populates='mortgages')
 
+    # Indice que cubre el listado de hipotecas de un cliente: la consulta se
+    # resuelve recorriendo solo el indice, sin leer la tabla ni el cliente.
+    __table_args__ = (
+        db.Index('ix_mortgage_dni_covering', 'dni', 'tae', 'years', 'monthly_fee'),
+    )
+
     def get_dict(self):
         """
         Convierte la instancia de la hipoteca a un diccionario.
@@ -50,12 +65,28 @@ class Mortgage(db.Model):
                 "total_fee": 120000
             }
         """
+        return Mortgage.row_dict(self.dni, self.tae, self.years, self.monthly_fee)
+
+    @classmethod
+    def row_columns(cls):
+        """
+        Columnas necesarias para serializar una hipoteca sin cargar la instancia
+        (consultas de SQLAlchemy Core), en el orden que espera `row_dict`.
+        """
+        return (cls.dni, cls.tae, cls.years, cls.monthly_fee)
+
+    @staticmethod
+    def row_dict(dni, tae, years, monthly_fee):
+        """
+        Diccionario de una hipoteca a partir de los valores de `row_columns`.
+        Es la misma representacion que `get_dict`.
+        """
         return {
-            "dni": self.dni,
-            "tae": self.tae,
-            "years": self.years,
-            "monthly_fee": self.monthly_fee,
-            "total_fee": self.monthly_fee * self.years * 12,
+            "dni": dni,
+            "tae": tae,
+            "years": years,
+            "monthly_fee": monthly_fee,
+            "total_fee": monthly_fee * years * 12,
         }
 
     def __repr__(self):
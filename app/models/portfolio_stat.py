@@ -0,0 +1,63 @@
+import json
+from config import db
+
+# -- PORTFOLIO STAT ------------------------------------------------------
+class PortfolioStat(db.Model):
+    """
+    ---
+    description: Agregados de la cartera mantenidos de forma incremental por las
+        rutas de escritura. Cada fila es un cubo ('client', 'mortgage' o
+        'tae:<n>') con sus sumas, de modo que las estadisticas se leen sin
+        recorrer las tablas de clientes e hipotecas.
+    properties:
+        bucket:
+            type: string
+            description: Nombre del cubo.
+            example: "tae:3"
+        count:
+            type: integer
+            description: Numero de clientes o hipotecas del cubo.
+            example: 12
+        capital:
+            type: number
+            description: Suma del capital de los clientes o del capital prestado.
+            example: 1200000
+        years:
+            type: integer
+            description: Suma de los plazos en años de las hipotecas.
+            example: 240
+        repayment:
+            type: number
+            description: Suma del total a pagar de las hipotecas.
+            example: 1597241.07
+    """
+    __tablename__ = 'portfolio_stat'
+    bucket = db.Column(db.String(32), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    capital = db.Column(db.Float, nullable=False, default=0)
+    years = db.Column(db.Integer, nullable=False, default=0)
+    repayment = db.Column(db.Float, nullable=False, default=0)
+
+    def get_dict(self):
+        """
+        Convierte la instancia a un diccionario.
+
+        Returns:
+            dict: Un diccionario con el cubo y sus sumas.
+        """
+        return {
+            "bucket": self.bucket,
+            "count": self.count,
+            "capital": self.capital,
+            "years": self.years,
+            "repayment": self.repayment,
+        }
+
+    def __repr__(self):
+        """
+        Representacion en formato JSON del objeto PortfolioStat.
+
+        Returns:
+            str: Representacion JSON del objeto.
+        """
+        return json.dumps(self.get_dict())
@@ -0,0 +1,43 @@
+import json
+from config import db
+
+# -- TABLE VERSION -------------------------------------------------------
+class TableVersion(db.Model):
+    """
+    ---
+    description: Contador de version por tabla. Se incrementa en cada escritura
+        sobre la tabla y se usa para generar los ETag de los listados y de los
+        recursos de cliente.
+    properties:
+        name:
+            type: string
+            description: Nombre de la tabla.
+            example: "client"
+        version:
+            type: integer
+            description: Version actual de la tabla.
+            example: 42
+    """
+    __tablename__ = 'table_version'
+    # Contadores que existen siempre: `migrate_schema` crea sus filas
+    NAMES = ("client", "mortgage", "stats")
+    name = db.Column(db.String(32), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    def get_dict(self):
+        """
+        Convierte la instancia a un diccionario.
+
+        Returns:
+            dict: Un diccionario con el nombre de la tabla y su version.
+        """
+        return {"name": self.name, "version": self.version}
+
+    def __repr__(self):
+        """
+        Representacion en formato JSON del objeto TableVersion.
+
+        Returns:
+            str: Representacion JSON del objeto.
+        """
+        return json.dumps(self.get_dict())
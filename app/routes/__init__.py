@@ -1,2 +1,5 @@
 from .client_routes import client_bp
-from .mortgage_routes import mortgage_bp
\ No newline at end of file
+from .mortgage_routes import mortgage_bp
+from .validate_routes import validate_bp
+from .stats_routes import stats_bp
+from .metrics_routes import metrics_bp
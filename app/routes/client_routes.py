@@ -1,43 +1,79 @@
-import sys
+import logging
 from config import db
-from flask  import Blueprint, request
+from flask  import Blueprint, Response, current_app, request, stream_with_context
 from models import Client, Mortgage
-from services import verify_dni, verify_client, verify_mortgage
+from services import verify_dni, verify_client, verify_mortgage, verify_emails_domain
+from services import EMAIL_PENDING, EMAIL_VERIFIED, is_async, schedule_email_verification
+from services import monthly_fee, monthly_fees, parse_quote_axis, quote_grid, amortization_schedule, schedule_rows
+from services import CLIENT_CACHE, idempotent, client_statement, client_dicts, iter_client_dicts
+from services import record_clients, record_client_capital, record_mortgage, record_mortgages, forget_client_mortgages
+from services import bump_version, get_version, resource_etag, collection_etag, not_modified
+from services import iter_records, chunked, page_args, keyset_page, stream_format, stream_rows, NDJSON_MIMETYPE, JSON_MIMETYPE
+from sqlalchemy import insert, select, tuple_, update
 # Se define el Blueprint 'client_routes' para agrupar todas las rutas relacionadas con clientes
 client_bp = Blueprint('client_routes', __name__)
+logger = logging.getLogger(__name__)
 
 # Ruta para obtener todos los clientes
 @client_bp.route('/api/client', methods=['GET'])
 def get_client_all():
     """
-    Ruta para obtener todos los clientes.
+    Ruta para obtener todos los clientes, paginados por DNI.
     
     Metodo: GET
-    URL: /api/client
+    URL: /api/client?limit=<n>&after=<cursor>
+    
+    Parametros:
+    - limit (opcional): Numero de clientes por pagina (PAGE_SIZE por defecto, como maximo MAX_PAGE_SIZE).
+    - after (opcional): Cursor devuelto en "next" por la pagina anterior.
+    - stream (opcional): Si es 1 se devuelven todos los clientes en streaming
+      como {"value": [...]}. Con la cabecera `Accept: application/x-ndjson` se
+      devuelven en streaming con un cliente por linea.
     
     Respuesta esperada:
     Si hay clientes en la base de datos:
     {
-        "value": [lista de clientes]
+        "value": [lista de clientes],
+        "next": cursor de la siguiente pagina o null si es la ultima
     }
     
     En caso de error:
     - 200: Si se pueden recuperar los clientes.
+    - 400: Si los parametros de paginacion no son validos.
     - 500: Error interno del servidor.
     """
     try:
         # Debugging: Se imprime la solicitud recibida
-        print("/api/client -- GET")
-        # Se obtienen todos los clientes desde la base de datos
-        clients = db.session.query(Client).all()
-        # Se transforma la lista de clientes en formato de diccionario para enviar como respuesta
-        for i in range(len(clients)):
-            clients[i] = clients[i].get_dict()
-        # Respuesta con todos los clientes
-        return {"value": clients}, 200
-    except Exception as e:
+        logger.debug("/api/client -- GET")
+        # Si el cliente ya tiene esta version del listado no se consulta nada mas
+        # (el formato negociado forma parte del ETag)
+        mimetype = stream_format(request)
+        etag = collection_etag("clients", get_version("client"), request.query_string, mimetype or JSON_MIMETYPE)
+        headers = {"ETag": etag, "Vary": "Accept"}
+        if not_modified(request, etag):
+            return "", 304, headers
+        # Volcado completo en streaming: se recorre la tabla por lotes de
+        # STREAM_BATCH_SIZE filas, sin materializar la lista entera ni crear
+        # objetos del ORM
+        if mimetype:
+            clients = iter_client_dicts(
+                db.session, client_statement().order_by(Client.dni), current_app.config["STREAM_BATCH_SIZE"]
+            )
+            return Response(stream_with_context(stream_rows(clients, mimetype)), mimetype=mimetype, headers=headers)
+        try:
+            limit, after = page_args(request.args, current_app.config["PAGE_SIZE"], current_app.config["MAX_PAGE_SIZE"])
+            # Se obtiene la pagina de clientes como filas de columnas y sus
+            # hipotecas con una unica consulta adicional para toda la pagina
+            rows, cursor = keyset_page(
+                db.session, client_statement(), [Client.dni], after, limit, lambda row: [row[0]], entities=False
+            )
+        except ValueError as error:
+            return {"error": {"pagination": str(error)}}, 400
+        # Respuesta con la pagina de clientes
+        return {"value": client_dicts(db.session, rows), "next": cursor}, 200, headers
+    except Exception:
         # En caso de error, se imprime y se retorna un error 500
-        print(e, file=sys.stderr)
+        logger.exception("Server internal error")
         return {"error": "Server internal error"}, 500
 
 
@@ -67,26 +103,100 @@ def get_client(dni):
     """
     try:
         # Debugging: Se imprime el DNI recibido
-        print("/api/client/<dni> -- GET. Received client: ", dni)
+        logger.debug("/api/client/<dni> -- GET", extra={"dni": dni})
         # Verificacion del DNI
         error  = verify_dni(dni)
         if error:
             return {"error": {"dni": error}}, 400
-        # Se obtiene el cliente desde la base de datos
-        client = db.session.get(Client, dni.lower())
-        if not client:
+        # Solo se lee la version del cliente: si el que pregunta ya la tiene
+        # (If-None-Match) se responde 304 sin cargar ni serializar nada
+        version = _client_version(dni)
+        if version is None:
+            return {"error": f"No client associated with the identification {dni.upper()} given"}, 404
+        etag = resource_etag("client", version)
+        if not_modified(request, etag):
+            return "", 304, {"ETag": etag}
+        # Se obtiene el cliente ya serializado de la cache o de la base de datos
+        cached = _get_cached_client(dni, version)
+        if not cached:
             return {"error": f"No client associated with the identification {dni.upper()} given"}, 404
-        else:
-            # Respuesta con los datos del cliente
-            return client.get_dict(), 200
-    except Exception as e:
+        # Respuesta con los datos del cliente
+        return cached["value"], 200, {"ETag": resource_etag("client", cached["version"])}
+    except Exception:
         # En caso de error, se imprime y se retorna un error 500
-        print(e, file=sys.stderr)
+        logger.exception("Server internal error")
         return {"error": "Server internal error"}, 500
 
 
+def _client_version(dni):
+    """
+    Version actual de un cliente, leida de la columna `version` sin cargar el
+    cliente ni sus hipotecas.
+
+    Args:
+        dni (str): DNI del cliente.
+
+    Returns:
+        int | None: Version del cliente o None si no existe.
+    """
+    return db.session.execute(select(Client.version).where(Client.dni == dni.lower())).scalar()
+
+
+def _get_cached_client(dni, version):
+    """
+    Cliente serializado (con sus hipotecas) y su version. Se lee de la cache de
+    clientes si la entrada es de la version actual y, si no, de la base de
+    datos, guardandolo en la cache con la version del cliente leido. Asi, una
+    entrada guardada por una lectura que se cruza con una escritura queda con
+    una version antigua y no se vuelve a servir.
+
+    Args:
+        dni (str): DNI del cliente.
+        version (int): Version actual del cliente.
+
+    Returns:
+        dict | None: {"version": int, "value": dict} o None si no existe.
+    """
+    cached = CLIENT_CACHE.get(dni, version=version)
+    if cached is None:
+        client = db.session.get(Client, dni.lower())
+        if not client:
+            return None
+        cached = {"version": client.version, "value": client.get_dict()}
+        CLIENT_CACHE.set(dni, cached["version"], cached["value"])
+    return cached
+
+
+def _get_cached_client_mortgages(dni, version):
+    """
+    Hipotecas serializadas de un cliente y la version del cliente. Si el cliente
+    completo de la version actual esta en la cache se toman de ahi; si no, se
+    leen con un recorrido del indice (dni, tae, years, monthly_fee) sin cargar
+    el cliente.
+
+    Args:
+        dni (str): DNI del cliente.
+        version (int): Version actual del cliente.
+
+    Returns:
+        dict: {"version": int, "value": list}.
+    """
+    cached = CLIENT_CACHE.get(dni, "mortgages", version=version)
+    if cached is None:
+        client = CLIENT_CACHE.get(dni, version=version)
+        if client is not None:
+            return {"version": client["version"], "value": client["value"]["mortgages"]}
+        mortgages = db.session.execute(
+            select(Mortgage).where(Mortgage.dni == dni.lower()).order_by(Mortgage.tae, Mortgage.years)
+        ).scalars()
+        cached = {"version": version, "value": [mortgage.get_dict() for mortgage in mortgages]}
+        CLIENT_CACHE.set(dni, cached["version"], cached["value"], "mortgages")
+    return cached
+
+
 # Ruta para agregar un nuevo cliente
 @client_bp.route('/api/client', methods=['POST'])
+@idempotent
 def add_client():
     """
     Ruta para agregar un nuevo cliente.
@@ -108,6 +218,9 @@ def add_client():
         "value": el cliente creado
     }
     
+    Admite la cabecera Idempotency-Key: una repeticion con la misma clave
+    recibe la respuesta original sin volver a ejecutar la peticion.
+
     Codigos de retorno:
     - 200: Si el cliente se ha agregado exitosamente.
     - 400: Si ya existe un cliente con el mismo DNI o si los datos son invalidos.
@@ -116,9 +229,11 @@ def add_client():
     try:
         # Se obtiene el cliente desde el cuerpo de la solicitud (JSON)
         changes = request.get_json()
-        print("/api/client -- POST. Received client: ", changes)
-        # Se verifica si los datos del cliente son validos
-        errors = verify_client(changes)
+        logger.debug("/api/client -- POST")
+        # Se verifica si los datos del cliente son validos. En modo asincrono
+        # solo se hacen las comprobaciones locales, el correo se verifica despues.
+        background = is_async(current_app)
+        errors = verify_client(changes, network=not background)
         if errors:
             return {"error": errors}, 400
         # Se verifica si el cliente ya existe
@@ -127,16 +242,148 @@ def add_client():
             return {"error": {"client": f"Client under '{changes["dni"]}' already exists"}}, 400 
         # Se agrega el nuevo cliente a la base de datos
         client = Client(dni=changes["dni"].lower(), name=changes["name"], email=changes["email"], capital=changes["capital"])
+        if client.email:
+            client.email_status = EMAIL_PENDING if background else EMAIL_VERIFIED
+        client.version = bump_version("client")
+        record_clients([client.capital])
         db.session.add(client)
         db.session.commit()
+        if background and client.email:
+            schedule_email_verification(current_app._get_current_object(), client.dni, client.email)
         # Respuesta indicando que el cliente se agrego correctamente
         return {"value": client.get_dict()}, 200
-    except Exception as e:
+    except Exception:
         # En caso de error, se imprime y se retorna un error 500
-        print(e, file=sys.stderr)
+        logger.exception("Server internal error")
         return {"error": "Server internal error"}, 500
 
 
+# Ruta para importar clientes de forma masiva
+@client_bp.route('/api/client/bulk', methods=['POST'])
+def add_client_bulk():
+    """
+    Ruta para importar clientes de forma masiva.
+    
+    Metodo: POST
+    URL: /api/client/bulk
+    
+    Parametros:
+    Se espera un cuerpo NDJSON (un cliente por linea) o un array JSON con
+    clientes con los mismos campos que POST /api/client:
+    {"dni": "12345678Z", "name": "Nombre del Cliente", "email": "cliente@example.com", "capital": 10000}
+    {"dni": "87654321X", "name": "Otro Cliente", "email": "otro@example.com", "capital": 5000}
+
+    Respuesta esperada:
+    Se responde en streaming con una linea NDJSON por registro, en el mismo orden:
+    {"index": 0, "dni": "12345678Z", "status": 200}
+    {"index": 1, "dni": "87654321X", "status": 400, "error": {...}}
+    
+    Los registros se procesan por bloques (BULK_CHUNK_SIZE): se validan, se
+    buscan los DNI existentes con una unica consulta y se insertan en lote con
+    un commit por bloque.
+
+    Codigos de retorno (por registro):
+    - 200: Si el cliente se ha agregado exitosamente.
+    - 400: Si ya existe un cliente con el mismo DNI o si los datos son invalidos.
+    - 500: Error interno del servidor.
+    """
+    logger.debug("/api/client/bulk -- POST")
+    app = current_app._get_current_object()
+    background = is_async(app)
+    chunk_size = app.config.get("BULK_CHUNK_SIZE", 500)
+    dumps = app.json.dumps
+
+    def generate():
+        for chunk in chunked(iter_records(request.stream), chunk_size):
+            for result in _import_client_chunk(app, chunk, background):
+                yield dumps(result) + "\n"
+
+    return Response(stream_with_context(generate()), status=200, mimetype=NDJSON_MIMETYPE)
+
+
+def _import_client_chunk(app, chunk, background):
+    """
+    Valida e inserta un bloque de registros de la importacion masiva.
+
+    Args:
+        app (Flask): Aplicacion Flask.
+        chunk (list): Lista de tuplas (indice, registro, error) de iter_records.
+        background (bool): Si el correo se verifica en segundo plano.
+
+    Returns:
+        list: Resultado por registro, en el orden del bloque.
+    """
+    results = {}
+    valid = {}
+    # Primera pasada: comprobaciones locales y DNI repetidos dentro del bloque
+    for index, record, error in chunk:
+        if not error and not isinstance(record, dict):
+            error = "Record must be a JSON object"
+        if error:
+            results[index] = {"index": index, "status": 400, "error": {"record": error}}
+            continue
+        dni = record.get("dni")
+        # Un campo con un tipo inesperado (una lista, un objeto...) no puede
+        # interrumpir la respuesta, que ya se esta enviando: se marca el registro
+        try:
+            errors = verify_client(record, network=False) if isinstance(dni, str) and dni else {"dni": "DNI is required"}
+        except (AttributeError, TypeError, ValueError) as error:
+            logger.debug("Invalid bulk record %s: %s", index, error)
+            errors = {"record": "Record fields have invalid types"}
+        if not errors and not record.get("name"):
+            errors = {"name": "Name is required"}
+        if not errors and dni.lower() in valid:
+            errors = {"client": f"Client under '{dni}' is repeated in the request"}
+        if errors:
+            results[index] = {"index": index, "dni": dni, "status": 400, "error": errors}
+            continue
+        valid[dni.lower()] = (index, record)
+
+    try:
+        # DNI ya existentes: una unica consulta por bloque
+        if valid:
+            existing = db.session.execute(select(Client.dni).where(Client.dni.in_(list(valid)))).scalars()
+            for dni in existing:
+                index, record = valid.pop(dni)
+                results[index] = {"index": index, "dni": record["dni"], "status": 400,
+                                  "error": {"client": f"Client under '{record['dni']}' already exists"}}
+
+        # Verificacion de correos por red, agrupada por servidor MX
+        if valid and not background:
+            verdicts = verify_emails_domain([record.get("email") for _, record in valid.values()])
+            for dni, (index, record) in list(valid.items()):
+                if error := verdicts.get(record.get("email")):
+                    del valid[dni]
+                    results[index] = {"index": index, "dni": record["dni"], "status": 400, "error": {"email": error}}
+
+        # Insercion en lote (executemany) y un unico commit
+        rows = [{
+            "dni": dni,
+            "name": record["name"],
+            "email": record.get("email"),
+            "capital": record.get("capital"),
+            "email_status": (EMAIL_PENDING if background else EMAIL_VERIFIED) if record.get("email") else None,
+        } for dni, (_, record) in valid.items()]
+        if rows:
+            version = bump_version("client")
+            for row in rows:
+                row["version"] = version
+            db.session.execute(insert(Client), rows)
+            record_clients([row["capital"] for row in rows])
+            db.session.commit()
+        for dni, (index, record) in valid.items():
+            results[index] = {"index": index, "dni": record["dni"], "status": 200}
+            if background and record.get("email"):
+                schedule_email_verification(app, dni, record["email"])
+    except Exception:
+        # En caso de error, se imprime y se marca el resto del bloque como error 500
+        logger.exception("Server internal error")
+        db.session.rollback()
+        for dni, (index, record) in valid.items():
+            results.setdefault(index, {"index": index, "dni": record["dni"], "status": 500, "error": "Server internal error"})
+    return [results[index] for index, _, _ in chunk]
+
+
 # Ruta para actualizar los datos de un cliente
 @client_bp.route('/api/client/<dni>', methods=['PATCH'])
 def upd_client(dni):
@@ -165,10 +412,11 @@ def upd_client(dni):
     try:
         # Se obtiene la informacion de los cambios desde el cuerpo de la solicitud (JSON)
         changes = request.get_json()
-        print("/api/client -- PATCH. Received client:", dni, "and changes:", changes)
+        logger.debug("/api/client/<dni> -- PATCH", extra={"dni": dni})
         # Verificacion de los datos a actualizar
         changes["dni"] = dni
-        errors = verify_client(changes)
+        background = is_async(current_app)
+        errors = verify_client(changes, network=not background)
         if errors:
             return {"error": errors}, 400
         # Se obtiene el cliente desde la base de datos
@@ -180,14 +428,21 @@ def upd_client(dni):
             client.name = changes["name"]
         if "email" in changes:
             client.email = changes["email"]
+            client.email_status = (EMAIL_PENDING if background else EMAIL_VERIFIED) if client.email else None
+            client.email_error = None
         if "capital" in changes:
+            record_client_capital(client.capital, changes["capital"])
             client.capital = changes["capital"]
+        client.version = bump_version("client")
         db.session.commit()
+        CLIENT_CACHE.invalidate(dni)
+        if background and client.email and "email" in changes:
+            schedule_email_verification(current_app._get_current_object(), client.dni, client.email)
         # Respuesta indicando que los cambios fueron aplicados correctamente
         return {"value": client.get_dict()}, 200
-    except Exception as e:
+    except Exception:
         # En caso de error, se imprime y se retorna un error 500
-        print(e)
+        logger.exception("Server internal error")
         return {"error": "Server internal error"}, 500
 
 
@@ -217,7 +472,7 @@ def del_client(dni):
     """
     try:
         # Se obtiene el cliente por su DNI
-        print("/api/client -- DELETE. Received client: ", dni)
+        logger.debug("/api/client/<dni> -- DELETE", extra={"dni": dni})
         # Verificacion del DNI
         error  = verify_dni(dni)
         if error:
@@ -226,13 +481,19 @@ def del_client(dni):
         client = db.session.get(Client, dni.lower())
         if not client:
             return {"error": f"No client associated with the identification {dni.upper()} given"}, 404
-        # Se elimina el cliente
+        # Se elimina el cliente (y en cascada sus hipotecas)
+        bump_version("client")
+        record_clients([client.capital], sign=-1)
+        if client.mortgages:
+            bump_version("mortgage")
+            forget_client_mortgages(client.dni)
         db.session.delete(client)
         db.session.commit()
+        CLIENT_CACHE.invalidate(dni)
         return {"value": client.get_dict() }, 200
-    except Exception as e:
+    except Exception:
         # En caso de error, se imprime y se retorna un error 500
-        print(e)
+        logger.exception("Server internal error")
         return {"error": "Server internal error"}, 500
 
 
@@ -262,31 +523,38 @@ def get_client_mortgage_all(dni):
     """
     try:
         # Debugging: Se imprime el DNI recibido
-        print("/api/client/<dni> -- GET. Received client: ", dni)
+        logger.debug("/api/client/<dni>/mortgage -- GET", extra={"dni": dni})
         # Verificacion del DNI
         error  = verify_dni(dni)
         if error:
             return {"error": {"dni": error}}, 400
-        # Se obtiene el cliente desde la base de datos
-        client = db.session.get(Client, dni.lower())
-        if not client:
+        # Las hipotecas forman parte del cliente, por lo que comparten su
+        # version: si el que pregunta ya la tiene se responde 304 sin leerlas
+        version = _client_version(dni)
+        if version is None:
             return {"error": f"No client associated with the identification {dni.upper()} given"}, 404
-        else:
-            # Respuesta con las hipotecas del cliente
-            return client.get_dict()["mortgages"], 200
-    except Exception as e:
+        etag = resource_etag("client-mortgages", version)
+        if not_modified(request, etag):
+            return "", 304, {"ETag": etag}
+        # Se obtienen las hipotecas ya serializadas de la cache o de la base de datos
+        cached = _get_cached_client_mortgages(dni, version)
+        # Respuesta con las hipotecas del cliente
+        return cached["value"], 200, {"ETag": resource_etag("client-mortgages", cached["version"])}
+    except Exception:
         # En caso de error, se imprime y se retorna un error 500
-        print(e, file=sys.stderr)
+        logger.exception("Server internal error")
         return {"error": "Server internal error"}, 500
 
 # Ruta para agregar una nueva hipoteca a un cliente
 @client_bp.route('/api/client/<dni>/mortgage', methods=['POST'])
+@idempotent
 def add_client_mortgage(dni):
     """
-    Ruta para agregar un nuevo cliente.
+    Ruta para agregar una nueva hipoteca a un cliente. Si el cliente ya tiene
+    una hipoteca con esa TAE y ese plazo se devuelve la existente.
     
     Metodo: POST
-    URL: /api/client
+    URL: /api/client/<dni>/mortgage
     
     Parametros:
     - DNI: identificador del cliente
@@ -301,17 +569,20 @@ def add_client_mortgage(dni):
         "value": la hipoteca creada
     }
     
+    Admite la cabecera Idempotency-Key: una repeticion con la misma clave
+    recibe la respuesta original sin volver a ejecutar la peticion.
+
     Codigos de retorno:
     - 200: Si la hipoteca se ha agregado exitosamente.
-    - 400. Si los datos no son validos.
+    - 400: Si los datos no son validos o el cliente no tiene capital.
     - 404: Si no se encuentra un cliente con el DNI proporcionado.
     - 500: Error interno del servidor.
     """
     try:
-        # Se obtiene el cliente desde el cuerpo de la solicitud (JSON)
+        # Se obtiene la hipoteca desde el cuerpo de la solicitud (JSON)
         changes = request.get_json()
-        print("/api/client/<dni>/mortgage -- POST. Received client: ", dni)
-        # Se verifica si los datos del cliente son validos
+        logger.debug("/api/client/<dni>/mortgage -- POST", extra={"dni": dni})
+        # Se verifica si los datos de la hipoteca son validos
         changes["dni"] = dni
         tae = changes["tae"] if changes["tae"] else 0
         years = changes["years"] if changes["years"] else 0
@@ -320,37 +591,274 @@ def add_client_mortgage(dni):
             return {"error": errors}, 400
         tae = int(tae)
         years = int(years)
+        # Con plazo 0 la cuota no esta definida
+        if years < 1:
+            return {"error": {"years": "Years must be greater than 0"}}, 400
         # Se verifica si el cliente ya existe
         client = db.session.get(Client, dni.lower())
         if not client:
             return {"error": f"No client associated with the identification {dni.upper()} given"}, 404
-        # Se agrega el nuevo cliente a la base de datos
-        mortgage = db.session.get(Mortgage, (tae, years))
+        # Se agrega la nueva hipoteca a la base de datos (la cuota se calcula
+        # con el capital del cliente, que debe estar definido)
+        mortgage = db.session.get(Mortgage, (dni.lower(), tae, years))
         if not mortgage:
-            i = tae / 1200
-            n = years * 12
-            monthly_fee = (client.capital * i) / (1 - (1 + i) ** (-n)) 
-            mortgage = Mortgage(dni=dni.lower(), tae=tae, years=years, monthly_fee=monthly_fee, client=client)
+            if client.capital is None:
+                return {"error": {"capital": "The client has no capital defined"}}, 400
+            fee = monthly_fee(client.capital, tae, years)
+            mortgage = Mortgage(dni=dni.lower(), tae=tae, years=years, monthly_fee=fee, capital=client.capital, client=client)
             db.session.add(mortgage)
+            record_mortgage(mortgage)
+            client.version = bump_version("client")
+            bump_version("mortgage")
             db.session.commit()
-        # Respuesta indicando que el cliente se agrego correctamente
+            CLIENT_CACHE.invalidate(dni)
+        # Respuesta con la hipoteca creada (o la existente)
         return {"value": mortgage.get_dict()}, 200
-    except Exception as e:
+    except Exception:
         # En caso de error, se imprime y se retorna un error 500
-        print(e, file=sys.stderr)
+        logger.exception("Server internal error")
+        return {"error": "Server internal error"}, 500
+
+# Ruta para agregar varias hipotecas a un cliente en una unica transaccion
+@client_bp.route('/api/client/<dni>/mortgage/batch', methods=['POST'])
+@idempotent
+def add_client_mortgage_batch(dni):
+    """
+    Ruta para agregar varias hipotecas a un cliente de una vez.
+
+    Metodo: POST
+    URL: /api/client/<dni>/mortgage/batch
+
+    Parametros:
+    - DNI: identificador del cliente
+    Se espera un array JSON (como maximo MORTGAGE_BATCH_MAX elementos) con:
+    [
+        {"tae": "3", "years": "20"},
+        {"tae": "4", "years": "30"}
+    ]
+
+    Se validan todas las entradas, se carga el cliente una vez, se buscan las
+    hipotecas ya existentes con una unica consulta, se calculan las cuotas en
+    una pasada vectorizada y se insertan todas las nuevas con un unico commit.
+
+    Respuesta esperada (un resultado por entrada, en el mismo orden):
+    {
+        "value": [
+            {"index": 0, "status": 200, "created": true, "value": la hipoteca},
+            {"index": 1, "status": 400, "error": {...}}
+        ]
+    }
+
+    Admite la cabecera Idempotency-Key: una repeticion con la misma clave
+    recibe la respuesta original sin volver a ejecutar la peticion.
+
+    Codigos de retorno:
+    - 200: Si se han procesado las entradas (ver el estado de cada una).
+    - 400: Si el DNI o el cuerpo no son validos.
+    - 404: Si no se encuentra un cliente con el DNI proporcionado.
+    - 500: Error interno del servidor.
+    """
+    try:
+        logger.debug("/api/client/<dni>/mortgage/batch -- POST", extra={"dni": dni})
+        entries = request.get_json(silent=True)
+        if not isinstance(entries, list):
+            return {"error": {"batch": "Expected a JSON array of {tae, years} entries"}}, 400
+        limit = current_app.config["MORTGAGE_BATCH_MAX"]
+        if len(entries) > limit:
+            return {"error": {"batch": f"At most {limit} entries per request"}}, 400
+        if error := verify_dni(dni):
+            return {"error": {"dni": error}}, 400
+
+        # Validacion de todas las entradas y parejas repetidas en la peticion
+        results = {}
+        valid = {}
+        for index, entry in enumerate(entries):
+            if not isinstance(entry, dict):
+                results[index] = {"index": index, "status": 400, "error": {"entry": "Expected a {tae, years} object"}}
+                continue
+            tae = entry.get("tae") or 0
+            years = entry.get("years") or 0
+            # Un valor de otro tipo (un objeto, una lista, Infinity...) solo
+            # invalida su entrada, no el lote completo
+            try:
+                errors = verify_mortgage({"tae": tae, "years": years})
+                key = None if errors else (int(tae), int(years))
+            except (TypeError, ValueError, OverflowError) as error:
+                logger.debug("Invalid batch entry %s: %s", index, error)
+                errors = {"entry": "tae and years must be numbers"}
+            if not errors and key[1] < 1:
+                errors = {"years": "Years must be greater than 0"}
+            if not errors and key in valid:
+                errors = {"mortgage": f"Mortgage ({key[0]}, {key[1]}) is repeated in the request"}
+            if errors:
+                results[index] = {"index": index, "status": 400, "error": errors}
+                continue
+            valid[key] = index
+
+        # Se verifica si el cliente existe (solo se necesita su capital)
+        capital = db.session.execute(select(Client.capital).where(Client.dni == dni.lower())).first()
+        if capital is None:
+            return {"error": f"No client associated with the identification {dni.upper()} given"}, 404
+        capital = capital[0]
+
+        # Hipotecas ya existentes: una unica consulta para todo el lote
+        if valid:
+            existing = db.session.execute(
+                select(*Mortgage.row_columns())
+                .where(Mortgage.dni == dni.lower(), tuple_(Mortgage.tae, Mortgage.years).in_(list(valid)))
+            )
+            for row in existing:
+                index = valid.pop((row.tae, row.years))
+                results[index] = {"index": index, "status": 200, "created": False, "value": Mortgage.row_dict(*row)}
+
+        # Cuotas de todas las hipotecas nuevas en una pasada, insercion en lote
+        # y un unico commit
+        if valid:
+            pairs = list(valid)
+            fees = monthly_fees(capital or 0, [tae for tae, _ in pairs], [years for _, years in pairs])
+            rows = [{"dni": dni.lower(), "tae": tae, "years": years, "monthly_fee": fee, "capital": capital}
+                    for (tae, years), fee in zip(pairs, fees)]
+            db.session.execute(insert(Mortgage), rows)
+            record_mortgages(rows)
+            db.session.execute(update(Client).where(Client.dni == dni.lower()).values(version=bump_version("client")))
+            bump_version("mortgage")
+            db.session.commit()
+            CLIENT_CACHE.invalidate(dni)
+            for row in rows:
+                index = valid[(row["tae"], row["years"])]
+                results[index] = {"index": index, "status": 200, "created": True,
+                                  "value": Mortgage.row_dict(row["dni"], row["tae"], row["years"], row["monthly_fee"])}
+        return {"value": [results[index] for index in range(len(entries))]}, 200
+    except Exception:
+        # En caso de error, se imprime y se retorna un error 500
+        logger.exception("Server internal error")
+        db.session.rollback()
+        return {"error": "Server internal error"}, 500
+
+# Ruta para obtener el cuadro de amortizacion de una hipoteca de un cliente
+@client_bp.route('/api/client/<dni>/mortgage/<int:tae>/<int:years>/schedule', methods=['GET'])
+def get_client_mortgage_schedule(dni, tae, years):
+    """
+    Ruta para obtener el cuadro de amortizacion mensual de una hipoteca.
+    
+    Metodo: GET
+    URL: /api/client/<dni>/mortgage/<tae>/<years>/schedule
+    
+    Parametros:
+    - dni: El DNI del cliente
+    - tae: La TAE de la hipoteca
+    - years: El plazo en años de la hipoteca
+    
+    Respuesta esperada:
+    Se responde en streaming con una fila por mes:
+    {
+        "value": [{"month": 1, "fee": 1158.73, "interest": 300.0, "principal": 858.73, "balance": 119141.27}, ...]
+    }
+    Con la cabecera `Accept: application/x-ndjson` se devuelve una fila por linea.
+    
+    Codigos de retorno:
+    - 200: Si la hipoteca existe.
+    - 400: Si el DNI no es valido.
+    - 404: Si no se encuentra el cliente o la hipoteca.
+    - 500: Error interno del servidor.
+    """
+    try:
+        logger.debug("/api/client/<dni>/mortgage/<tae>/<years>/schedule -- GET", extra={"dni": dni})
+        # Verificacion del DNI
+        error  = verify_dni(dni)
+        if error:
+            return {"error": {"dni": error}}, 400
+        mortgage = db.session.get(Mortgage, (dni.lower(), tae, years))
+        if not mortgage:
+            return {"error": f"No mortgage associated with the given parameters"}, 404
+        # Cuadro de amortizacion (memorizado) emitido fila a fila, con el
+        # capital prestado en la hipoteca (el del cliente puede haber cambiado)
+        schedule = amortization_schedule(mortgage.capital or 0, tae, years)
+        mimetype = NDJSON_MIMETYPE if request.accept_mimetypes.best == NDJSON_MIMETYPE else JSON_MIMETYPE
+        return Response(stream_rows(schedule_rows(schedule), mimetype, dict), mimetype=mimetype, headers={"Vary": "Accept"})
+    except Exception:
+        # En caso de error, se imprime y se retorna un error 500
+        logger.exception("Server internal error")
+        return {"error": "Server internal error"}, 500
+
+# Ruta para calcular una tabla de cotizaciones de hipotecas para un cliente
+@client_bp.route('/api/client/<dni>/mortgage/quote', methods=['POST'])
+def quote_client_mortgage(dni):
+    """
+    Ruta para calcular las cuotas de hipoteca de un cliente para varias TAE y
+    plazos a la vez, sin guardar nada.
+    
+    Metodo: POST
+    URL: /api/client/<dni>/mortgage/quote
+    
+    Parametros:
+    - DNI: identificador del cliente
+    Se espera un JSON donde "tae" y "years" son listas de valores o rangos
+    {"start", "stop", "step"} (con "stop" incluido):
+    {
+        "tae": [1, 2, 3],
+        "years": {"start": 10, "stop": 30, "step": 5}
+    }
+
+    Respuesta esperada:
+    {
+        "value": {
+            "capital": 100000,
+            "tae": [1, 2, 3],
+            "years": [10, 15, 20, 25, 30],
+            "monthly_fee": [[...], ...],   (una fila por TAE, una columna por plazo)
+            "total_fee": [[...], ...]
+        }
+    }
+    
+    Codigos de retorno:
+    - 200: Si se ha calculado la tabla.
+    - 400: Si los datos no son validos o el cliente no tiene capital.
+    - 404: Si no se encuentra un cliente con el DNI proporcionado.
+    - 500: Error interno del servidor.
+    """
+    try:
+        changes = request.get_json(silent=True)
+        logger.debug("/api/client/<dni>/mortgage/quote -- POST", extra={"dni": dni})
+        if not isinstance(changes, dict):
+            return {"error": {"quote": "Expected a JSON object with tae and years"}}, 400
+        # Se verifican el DNI y los ejes de la tabla
+        errors = {}
+        if error := verify_dni(dni):
+            errors["dni"] = error
+        max_points = current_app.config["QUOTE_MAX_POINTS"]
+        taes, error = parse_quote_axis(changes.get("tae"), "tae", max_points)
+        if error:
+            errors["tae"] = error
+        years, error = parse_quote_axis(changes.get("years"), "years", max_points)
+        if error:
+            errors["years"] = error
+        if errors:
+            return {"error": errors}, 400
+        # Solo se necesita el capital del cliente
+        capital = db.session.execute(select(Client.capital).where(Client.dni == dni.lower())).first()
+        if not capital:
+            return {"error": f"No client associated with the identification {dni.upper()} given"}, 404
+        if capital[0] is None:
+            return {"error": {"capital": "The client has no capital defined"}}, 400
+        # Respuesta con la tabla de cotizaciones
+        return {"value": {"dni": dni.upper(), **quote_grid(capital[0], taes, years)}}, 200
+    except Exception:
+        # En caso de error, se imprime y se retorna un error 500
+        logger.exception("Server internal error")
         return {"error": "Server internal error"}, 500
 
 # Ruta para eliminar la hipoteca de un cliente por su DNI, el TAE y el plazo
 @client_bp.route('/api/client/<dni>/mortgage', methods=['DELETE'])
 def del_client_mortgage(dni):
     """
-    Ruta para eliminar un cliente por su DNI.
+    Ruta para eliminar una hipoteca de un cliente.
     
     Metodo: DELETE
-    URL: /api/client/<dni>
+    URL: /api/client/<dni>/mortgage
     
     Parametros:
-    - dni: El DNI del cliente a eliminar
+    - dni: El DNI del cliente
     - Un JSON con el tae y el plazo de la hipoteca a eliminar:
     {
         "tae": "20",
@@ -358,22 +866,22 @@ def del_client_mortgage(dni):
     }
     
     Respuesta esperada:
-    Si el cliente se elimina correctamente:
+    Si la hipoteca se elimina correctamente:
     {
         "value": la hipoteca eliminada
     }
     
     Codigos de retorno:
     - 200: La hipoteca ha sido eliminada correctamente.
-    - 400: Si el alguno de los datos no es valido.
+    - 400: Si alguno de los datos no es valido.
     - 404: Si no se encuentra el cliente o la hipoteca.
     - 500: Error interno del servidor.
     """
     try:
         # Se obtienen los datos desde el cuerpo de la solicitud (JSON)
         changes = request.get_json()
-        print("/api/client -- POST. Received client: ", changes)
-        # Se verifica si los datos del cliente son validos
+        logger.debug("/api/client/<dni>/mortgage -- DELETE", extra={"dni": dni})
+        # Se verifica si los datos de la hipoteca son validos
         changes["dni"] = dni
         tae = changes["tae"] if changes["tae"] else 0
         years = changes["years"] if changes["years"] else 0
@@ -386,14 +894,18 @@ def del_client_mortgage(dni):
         client = db.session.get(Client, dni.lower())
         if not client:
             return {"error": f"No client associated with the identification {dni.upper()} given"}, 404
-        mortgage = db.session.get(Mortgage, (tae, years))
+        mortgage = db.session.get(Mortgage, (dni.lower(), tae, years))
         if not mortgage:
             return {"error": f"No mortgage associated with the given parameters"}, 404
-        # Se elimina el cliente
+        # Se elimina la hipoteca
+        record_mortgage(mortgage, sign=-1)
         db.session.delete(mortgage)
+        client.version = bump_version("client")
+        bump_version("mortgage")
         db.session.commit()
+        CLIENT_CACHE.invalidate(dni)
         return {"value": mortgage.get_dict() }, 200
-    except Exception as e:
+    except Exception:
         # En caso de error, se imprime y se retorna un error 500
-        print(e)
+        logger.exception("Server internal error")
         return {"error": "Server internal error"}, 500
\ No newline at end of file
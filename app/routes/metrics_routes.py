@@ -0,0 +1,35 @@
+import logging
+from flask  import Blueprint, Response
+from services import CLIENT_CACHE, IDEMPOTENCY_STORE, email_cache_stats, logging_stats
+from services import SCHEDULE_CACHE, Gauge, register, register_cache, render_metrics, PROMETHEUS_MIMETYPE
+
+# Se define el Blueprint 'metrics_routes' para exportar las metricas
+metrics_bp = Blueprint('metrics_routes', __name__)
+logger = logging.getLogger(__name__)
+
+# Caches y cola de logging que se exportan junto a las metricas de peticiones
+register_cache("client", CLIENT_CACHE.stats)
+register_cache("email_mx", lambda: email_cache_stats()["mx"])
+register_cache("email_rcpt", lambda: email_cache_stats()["rcpt"])
+register_cache("schedule", SCHEDULE_CACHE.stats)
+register_cache("idempotency", IDEMPOTENCY_STORE.stats)
+register(Gauge('log_records', 'Registros de log en cola y descartados.',
+               lambda: [((field,), value) for field, value in logging_stats().items()], ('state',)))
+
+# Ruta para exportar las metricas en formato Prometheus
+@metrics_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """
+    Ruta para exportar las metricas de la aplicacion en el formato de texto de
+    Prometheus: peticiones y latencia por endpoint y estado, consultas SQL por
+    peticion, duracion de los validadores, uso de los hilos de waitress y
+    estado de las caches.
+    
+    Metodo: GET
+    URL: /metrics
+    
+    Codigos de retorno:
+    - 200: Todo bien.
+    """
+    logger.debug("/metrics -- GET")
+    return Response(render_metrics(), content_type=PROMETHEUS_MIMETYPE)
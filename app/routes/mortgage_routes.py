@@ -1,40 +1,69 @@
-import sys
+import logging
 from config import db
-from flask  import Blueprint
+from flask  import Blueprint, Response, current_app, request, stream_with_context
 from models import Mortgage
+from services import mortgage_statement, mortgage_dicts, iter_mortgage_dicts
+from services import page_args, keyset_page, stream_format, stream_rows, get_version, collection_etag, not_modified, JSON_MIMETYPE
 
 mortgage_bp = Blueprint('mortgage_routes', __name__)
+logger = logging.getLogger(__name__)
 
 @mortgage_bp.route('/api/mortgage', methods=['GET'])
 def get_mortgage_all():
     """
-    Ruta para obtener todas las hipotecas
+    Ruta para obtener todas las hipotecas, paginadas por (dni, tae, years)
     
     Metodo: GET
-    URL: /api/mortgage
+    URL: /api/mortgage?limit=<n>&after=<cursor>
     
     Parametros:
-    - Ninguno
+    - limit (opcional): Numero de hipotecas por pagina (PAGE_SIZE por defecto, como maximo MAX_PAGE_SIZE).
+    - after (opcional): Cursor devuelto en "next" por la pagina anterior.
+    - stream (opcional): Si es 1 se devuelven todas las hipotecas en streaming
+      como {"value": [...]}. Con la cabecera `Accept: application/x-ndjson` se
+      devuelven en streaming con una hipoteca por linea.
     
     Respuesta esperada:
-    Lista con todos las hipotecas
+    Pagina con las hipotecas
     {
-        "value": [...]
+        "value": [...],
+        "next": cursor de la siguiente pagina o null si es la ultima
     }
     
     Codigos de retorno
     - 200: Todo bien
+    - 400: Parametros de paginacion no validos
     - 500: Error interno del servidor
     """
     # Debug
-    print("/api/mortgage -- GET")
-    # Obtener todos los clientes
+    logger.debug("/api/mortgage -- GET")
+    # Obtener la pagina de hipotecas
     try:
-        mortgages = db.session.query(Mortgage).all()
-        for i in range(len(mortgages)):
-            mortgages[i] = mortgages[i].get_dict()
+        # Si el cliente ya tiene esta version del listado no se consulta nada mas
+        # (el formato negociado forma parte del ETag)
+        mimetype = stream_format(request)
+        etag = collection_etag("mortgages", get_version("mortgage"), request.query_string, mimetype or JSON_MIMETYPE)
+        headers = {"ETag": etag, "Vary": "Accept"}
+        if not_modified(request, etag):
+            return "", 304, headers
+        # Volcado completo en streaming por lotes de STREAM_BATCH_SIZE filas,
+        # serializadas desde las columnas sin crear objetos del ORM
+        if mimetype:
+            mortgages = iter_mortgage_dicts(
+                db.session, mortgage_statement().order_by(Mortgage.dni, Mortgage.tae, Mortgage.years),
+                current_app.config["STREAM_BATCH_SIZE"]
+            )
+            return Response(stream_with_context(stream_rows(mortgages, mimetype)), mimetype=mimetype, headers=headers)
+        try:
+            limit, after = page_args(request.args, current_app.config["PAGE_SIZE"], current_app.config["MAX_PAGE_SIZE"])
+            rows, cursor = keyset_page(
+                db.session, mortgage_statement(), [Mortgage.dni, Mortgage.tae, Mortgage.years], after, limit,
+                lambda row: [row[0], row[1], row[2]], entities=False
+            )
+        except ValueError as error:
+            return {"error": {"pagination": str(error)}}, 400
         # Return value
-        return {"value": mortgages}, 200
-    except Exception as e:
-        print(e, file=sys.stderr)
-        return {"error": "Server internal error"}, 500
\ No newline at end of file
+        return {"value": mortgage_dicts(rows), "next": cursor}, 200, headers
+    except Exception:
+        logger.exception("Server internal error")
+        return {"error": "Server internal error"}, 500
@@ -0,0 +1,78 @@
+import logging
+from config import db
+from flask  import Blueprint, request
+from services import get_portfolio_stats, recompute_portfolio_stats, bump_version, get_version, resource_etag, not_modified
+
+# Se define el Blueprint 'stats_routes' para las estadisticas de la cartera
+stats_bp = Blueprint('stats_routes', __name__)
+logger = logging.getLogger(__name__)
+
+def _stats_etag():
+    """
+    ETag de las estadisticas: cambian con cualquier escritura de clientes o
+    hipotecas y con cada recalculo de los agregados (version 'stats').
+    """
+    return resource_etag("stats", f"{get_version('client')}.{get_version('mortgage')}.{get_version('stats')}")
+
+# Ruta para obtener las estadisticas de la cartera
+@stats_bp.route('/api/stats', methods=['GET'])
+def get_stats():
+    """
+    Ruta para obtener las estadisticas de la cartera de clientes e hipotecas.
+    Se leen de los agregados que mantienen las rutas de escritura, por lo que
+    el coste no depende del numero de clientes ni de hipotecas.
+    
+    Metodo: GET
+    URL: /api/stats
+    
+    Respuesta esperada:
+    {
+        "clients": {"count": 2, "capital": 150000},
+        "mortgages": {"count": 1, "capital": 100000, "repayment": 133103.42, "average_years": 20.0, "average_tae": 3.0},
+        "tae": [{"tae": 3, "count": 1, "capital": 100000, "repayment": 133103.42, "average_years": 20.0}]
+    }
+    
+    Codigos de retorno:
+    - 200: Todo bien.
+    - 304: Si el cliente ya tiene la version actual (If-None-Match).
+    - 500: Error interno del servidor.
+    """
+    logger.debug("/api/stats -- GET")
+    try:
+        etag = _stats_etag()
+        if not_modified(request, etag):
+            return "", 304, {"ETag": etag}
+        return get_portfolio_stats(), 200, {"ETag": etag}
+    except Exception:
+        logger.exception("Server internal error")
+        return {"error": "Server internal error"}, 500
+
+# Ruta para recalcular los agregados de la cartera
+@stats_bp.route('/api/stats/recompute', methods=['POST'])
+def recompute_stats():
+    """
+    Ruta para recalcular los agregados recorriendo las tablas completas. Solo es
+    necesaria para reparar los agregados si se han desviado.
+    
+    Metodo: POST
+    URL: /api/stats/recompute
+    
+    Respuesta esperada:
+    Las estadisticas recalculadas, con el mismo formato que GET /api/stats.
+    
+    Codigos de retorno:
+    - 200: Los agregados se han recalculado.
+    - 500: Error interno del servidor.
+    """
+    logger.debug("/api/stats/recompute -- POST")
+    try:
+        recompute_portfolio_stats()
+        # Los agregados pueden cambiar sin escrituras de clientes ni hipotecas:
+        # las copias con el ETag anterior dejan de ser validas
+        bump_version("stats")
+        db.session.commit()
+        return get_portfolio_stats(), 200, {"ETag": _stats_etag()}
+    except Exception:
+        logger.exception("Server internal error")
+        db.session.rollback()
+        return {"error": "Server internal error"}, 500
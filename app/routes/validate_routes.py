@@ -0,0 +1,56 @@
+import logging
+from flask  import Blueprint, current_app, request
+from services import validate_identifiers
+
+# Se define el Blueprint 'validate_routes' para las rutas de validacion sin estado
+validate_bp = Blueprint('validate_routes', __name__)
+logger = logging.getLogger(__name__)
+
+# Ruta para validar identificadores DNI/NIE/CIF en lote
+@validate_bp.route('/api/validate/dni', methods=['POST'])
+def validate_dni_batch():
+    """
+    Ruta para validar muchos identificadores DNI/NIE/CIF en una sola peticion.
+
+    Metodo: POST
+    URL: /api/validate/dni
+
+    Parametros:
+    Se espera un JSON con la lista de identificadores, o directamente la lista:
+    {
+        "ids": ["12345678Z", "X1234567L", "B12345674"]
+    }
+    Tambien se admite un cuerpo text/plain con un identificador por linea.
+
+    Respuesta esperada:
+    {
+        "value": [{"id": "12345678Z", "type": "DNI", "valid": true, "error": null}, ...],
+        "summary": {"total": 3, "valid": 3, "invalid": 0}
+    }
+
+    Codigos de retorno:
+    - 200: Si se han validado los identificadores.
+    - 400: Si el cuerpo no es valido o supera VALIDATE_MAX_IDS identificadores.
+    - 500: Error interno del servidor.
+    """
+    try:
+        logger.debug("/api/validate/dni -- POST")
+        # Se obtienen los identificadores del cuerpo de la solicitud
+        if request.mimetype == 'text/plain':
+            ids = [line.strip() for line in request.get_data(as_text=True).splitlines() if line.strip()]
+        else:
+            body = request.get_json(silent=True)
+            ids = body.get("ids") if isinstance(body, dict) else body
+        if not isinstance(ids, list):
+            return {"error": {"ids": "Expected a list of identifiers"}}, 400
+        max_ids = current_app.config["VALIDATE_MAX_IDS"]
+        if len(ids) > max_ids:
+            return {"error": {"ids": f"At most {max_ids} identifiers are allowed per request"}}, 400
+        # Validacion de todos los identificadores
+        results = validate_identifiers(ids)
+        valid = sum(1 for result in results if result["valid"])
+        return {"value": results, "summary": {"total": len(results), "valid": valid, "invalid": len(results) - valid}}, 200
+    except Exception:
+        # En caso de error, se imprime y se retorna un error 500
+        logger.exception("Server internal error")
+        return {"error": "Server internal error"}, 500
@@ -1,28 +1,171 @@
 import os
-from config import db, Config
-from flask import Flask, render_template
-from routes import client_bp, mortgage_bp
-from waitress import serve
+import hashlib
+import logging
+import sys
+import threading
+import time
+from config import db, init_storage, Config
+from flask import Flask, current_app, make_response, render_template, request
+from jinja2 import TemplateNotFound
+from models import migrate_schema
+from sqlalchemy import text
+from routes import client_bp, mortgage_bp, validate_bp, stats_bp, metrics_bp
+from services import verify_client, verify_mortgage, configure_client_cache, configure_idempotency, configure_json, configure_logging, configure_metrics, run_prefork, serve
 
 # Se verifica desde que direccion IP y puerto de inicio del servidor
 HOST = os.getenv("HOST", "127.0.0.1")
 PORT = os.getenv("PORT", "8080")
+# Modo del servidor: 'wsgi' (waitress, un hilo por peticion) o 'asgi' (bucle de
+# eventos de anyio con las verificaciones de correo asincronas; requiere uvicorn)
+SERVER_MODE = os.getenv("SERVER_MODE", "wsgi")
 
-# Se crea una instancia de la aplicación Flask
-app = Flask(__name__)
+logger = logging.getLogger(__name__)
 
-# Se carga la configuración de la aplicación desde un objeto de configuración
-# Config es un objeto que debe contener variables como HOST, PORT, DATABASE_URI, etc.
-app.config.from_object(Config)
+# == Application factory =================================================
+def create_app(config=Config, warm_up=None):
+    """
+    Crea y configura la aplicacion Flask: logging, JSON, metricas, cache de
+    clientes, blueprints y base de datos. El esquema se crea o se migra al
+    crear la aplicacion (las migraciones son idempotentes).
+
+    Args:
+        config (type | dict): Objeto o diccionario de configuracion (Config por defecto).
+        warm_up (bool | None): Si es True se precalientan las plantillas, los
+            validadores y el pool de conexiones. None = WARM_UP de la configuracion.
+
+    Returns:
+        Flask: Aplicacion lista para servir peticiones.
+    """
+    start = time.perf_counter()
+    # Se crea una instancia de la aplicación Flask
+    app = Flask(__name__)
+
+    # Se carga la configuración de la aplicación desde un objeto de configuración
+    # Config es un objeto que debe contener variables como DATABASE_URI, etc.
+    if isinstance(config, dict):
+        app.config.from_object(Config)
+        app.config.update(config)
+    else:
+        app.config.from_object(config)
+
+    # Se configura el logging estructurado y el log de acceso
+    configure_logging(app)
+
+    # Se registra el proveedor JSON de las respuestas (orjson si esta disponible)
+    configure_json(app)
+
+    # Se activan las metricas de peticiones y de consultas SQL (/metrics)
+    configure_metrics(app)
+
+    # Se configura el backend de la cache de lectura de clientes
+    configure_client_cache(app)
+
+    # Se dimensiona el almacen de respuestas por Idempotency-Key
+    configure_idempotency(app)
+
+    # Se registran los blueprints para las rutas de cliente y hipoteca
+    # Estos blueprints están definidos en otro lugar y contienen las rutas relacionadas
+    # con las operaciones CRUD para clientes y sus hipotecas.
+    app.register_blueprint(client_bp)
+    app.register_blueprint(mortgage_bp)
+    app.register_blueprint(validate_bp)
+    app.register_blueprint(stats_bp)
+    app.register_blueprint(metrics_bp)
+    app.add_url_rule("/", view_func=index)
+
+    # Inicializa la base de datos, crea las tablas si no existen y aplica las
+    # migraciones pendientes a las bases de datos existentes
+    init_storage(app)
+    with app.app_context():
+        migrate_schema()
+
+    if app.config["WARM_UP"] if warm_up is None else warm_up:
+        warm_up_app(app)
+
+    app.extensions["startup_seconds"] = time.perf_counter() - start
+    logger.info("Application created", extra={"duration_ms": round(app.extensions["startup_seconds"] * 1000, 3)})
+    return app
+
+def warm_up_app(app):
+    """
+    Precalienta la aplicacion para que la primera peticion no pague costes
+    de arranque: compila y renderiza la pagina del explorador (plantillas
+    Jinja), compila las expresiones regulares de los validadores y abre una
+    conexion del pool con sus PRAGMAs.
+
+    Args:
+        app (Flask): Aplicacion Flask.
+    """
+    with app.test_request_context("/"):
+        _index_page()
+    verify_client({"dni": "12345678z", "name": "Warm Up", "email": "warm.up@example.com", "capital": 1}, network=False)
+    verify_mortgage({"dni": "12345678z", "tae": 1, "years": 1})
+    with app.app_context():
+        db.session.execute(text("SELECT 1"))
+        db.session.remove()
+
+# Pagina del explorador ya renderizada, por aplicacion, junto con la huella
+# de las rutas con las que se genero: {"fingerprint": ..., "html": ..., "etag": ...}
+_index_lock = threading.Lock()
+
+def _rules_fingerprint():
+    """
+    Huella de las rutas registradas en la aplicacion. Cambia si se registran
+    blueprints o rutas nuevas, lo que obliga a regenerar el explorador.
+    """
+    return hash(tuple((rule.rule, rule.endpoint, tuple(sorted(rule.methods))) for rule in current_app.url_map.iter_rules()))
+
+def _render_index():
+    """
+    Renderiza la pagina del explorador con la lista de rutas de la API y la
+    plantilla de cada una.
 
-# Se registran los blueprints para las rutas de cliente y hipoteca
-# Estos blueprints están definidos en otro lugar y contienen las rutas relacionadas
-# con las operaciones CRUD para clientes y sus hipotecas.
-app.register_blueprint(client_bp)
-app.register_blueprint(mortgage_bp)
+    Returns:
+        str: HTML de la pagina.
+    """
+    # Lista para almacenar las rutas de la API que se mostrarán
+    rules = []
+    
+    # Itera sobre todas las reglas de URL registradas en la aplicación
+    for rule in current_app.url_map.iter_rules():
+        # Si la ruta comienza con "/api", se agrega a la lista de reglas
+        if not rule.rule.startswith("/api"):
+            continue
+        try:
+            # Intenta renderizar la plantilla HTML asociada con el endpoint
+            html = render_template(f"{rule.endpoint.split('.')[-1]}.html", host=f'http://{HOST}', endpoint=rule.rule)
+        except TemplateNotFound:
+            # Si no hay plantilla para el endpoint, se muestra un mensaje por defecto
+            html = '<p>No template defined</p>'
+        rules.append({
+            "name": rule.rule,
+            "method": ''.join(rule.methods - {"HEAD", "OPTIONS"}),  # Excluye métodos HEAD y OPTIONS
+            "html": html
+        })
+    
+    # Renderiza la página HTML con la lista de reglas de la API
+    return render_template("index.html", rules=rules)
+
+def _index_page():
+    """
+    Pagina del explorador de la aplicacion actual, renderizandola si no existe
+    o si han cambiado las rutas registradas.
+
+    Returns:
+        dict: {"fingerprint": ..., "html": ..., "etag": ...}
+    """
+    fingerprint = _rules_fingerprint()
+    page = current_app.extensions.get("index_page", {})
+    if page.get("fingerprint") != fingerprint:
+        with _index_lock:
+            page = current_app.extensions.get("index_page", {})
+            if page.get("fingerprint") != fingerprint:
+                html = _render_index()
+                page = {"fingerprint": fingerprint, "html": html, "etag": hashlib.sha1(html.encode()).hexdigest()}
+                current_app.extensions["index_page"] = page
+    return page
 
 # Ruta principal que se activa cuando se hace una solicitud GET a la raíz "/"
-@app.route("/")
 def index():
     """
     Esta es la ruta principal de la aplicación. Su propósito es generar un
@@ -31,51 +174,54 @@ def index():
     El resultado es una página web que muestra las rutas y sus métodos HTTP 
     correspondientes permitiendo ademas su uso en tiempo real.
 
+    La página se renderiza en la primera petición y se reutiliza mientras no
+    cambien las rutas registradas. Se sirve con ETag y Cache-Control, por lo que
+    las peticiones con If-None-Match reciben un 304 sin cuerpo.
+
     Respuesta:
         - HTML con la lista de rutas disponibles en la API.
     """
-    # Lista para almacenar las rutas de la API que se mostrarán
-    rules = []
-    
-    # Itera sobre todas las reglas de URL registradas en la aplicación
-    for rule in app.url_map.iter_rules():
-        try:
-            # Si la ruta comienza con "/api", se agrega a la lista de reglas
-            if rule.rule.startswith("/api"):
-                rules.append({
-                    "name": rule.rule,
-                    "method": ''.join(rule.methods - {"HEAD", "OPTIONS"}),  # Excluye métodos HEAD y OPTIONS
-                    # Intenta renderizar la plantilla HTML asociada con el endpoint
-                    "html": render_template(f"{rule.endpoint.split('.')[-1]}.html", host=f'http://{HOST}', endpoint=rule.rule)
-                })
-        except:
-            # Si hay un error al intentar renderizar la plantilla, se agrega una entrada
-            rules.append({
-                "name": rule.rule,
-                "method": ''.join(rule.methods - {"HEAD", "OPTIONS"}),
-                "html": '<p>No template defined</p>'  # Mensaje por defecto si no se encuentra una plantilla
-            })
-    
-    # Renderiza la página HTML con la lista de reglas de la API
-    return render_template("index.html", rules=rules)
+    page = _index_page()
+    response = make_response(page["html"])
+    response.set_etag(page["etag"])
+    response.cache_control.public = True
+    response.cache_control.max_age = current_app.config["INDEX_MAX_AGE"]
+    return response.make_conditional(request)
 
 
 # == Starting the server =================================================
 # Esta sección se ejecuta cuando el archivo es ejecutado como script (python app.py)
 if __name__ == '__main__':
     """
-    Al ejecutar la aplicación, este bloque inicializa la base de datos y
-    arranca el servidor web que gestionará las solicitudes entrantes.
+    Al ejecutar la aplicación, este bloque crea la aplicacion (con la base de
+    datos ya inicializada) y arranca el servidor web que gestionará las
+    solicitudes entrantes.
     """
-
-    # Inicializa la base de datos
-    with app.app_context():
-        # Establece la aplicación en el contexto de la base de datos
-        db.init_app(app)
-        # Crea las tablas de la base de datos si no existen
-        db.create_all()
+    # Los errores de configuracion (dependencias opcionales que faltan,
+    # combinaciones no admitidas) se muestran como un mensaje, sin traza
+    try:
+        app = create_app()
+    except RuntimeError as error:
+        sys.exit(f"[ERROR] {error}")
     
     # Arranca el servidor en el host y puerto especificados
-    print(f"Serving server at http://{HOST}:{PORT}, you can use the API at this address.")
-    # Llama a la función `serve` para iniciar el servidor web
-    serve(app, host=HOST, port=PORT)
+    logger.info(f"Serving server at http://{HOST}:{PORT}, you can use the API at this address.")
+    if SERVER_MODE == "asgi":
+        if app.config["WORKERS"] > 1:
+            sys.exit("[ERROR] WORKERS > 1 is only supported with SERVER_MODE=wsgi")
+        try:
+            import uvicorn
+        except ImportError:
+            sys.exit("[ERROR] SERVER_MODE=asgi requires uvicorn: python -m pip install -r requirements-optional.txt")
+        from services import AsgiApp
+        # El logging ya esta configurado: uvicorn no debe sustituirlo
+        uvicorn.run(AsgiApp(app, threads=app.config["THREADS"]), host=HOST, port=int(PORT), log_config=None, lifespan="on")
+    elif app.config["WORKERS"] > 1:
+        # Varios procesos de waitress sobre el mismo socket, supervisados
+        try:
+            run_prefork(app, HOST, PORT, app.config["WORKERS"])
+        except RuntimeError as error:
+            sys.exit(f"[ERROR] {error}")
+    else:
+        # Un solo proceso; el uso de sus hilos se exporta en /metrics
+        serve(app, HOST, PORT)
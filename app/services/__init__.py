@@ -1,2 +1,41 @@
-from .client_service import verify_name, verify_dni, verify_email, verify_capital, verify_client
+import importlib
+from .cache_service import TTLCache, LocalCacheBackend, ClientCache, CLIENT_CACHE, configure_client_cache
+from .client_service import verify_name, verify_dni, verify_email, verify_email_format, verify_email_domain, verify_emails_domain, verify_capital, verify_client, email_cache_stats, store_rcpt_verdicts
+from .dni_service import check_identifier, classify_identifier, validate_identifiers
 from .mortgage_service import verify_tae, verify_years, verify_mortgage
+from .verification_service import EMAIL_PENDING, EMAIL_VERIFIED, EMAIL_INVALID, is_async, schedule_email_verification
+from .bulk_service import iter_records, chunked
+from .pagination_service import page_args, keyset_page, encode_cursor, decode_cursor
+from .stream_service import NDJSON_MIMETYPE, JSON_MIMETYPE, stream_format, stream_rows
+from .quote_service import monthly_fee, monthly_fees, monthly_fee_grid, quote_grid, parse_quote_axis
+from .schedule_service import SCHEDULE_CACHE, amortization_schedule, schedule_rows
+from .version_service import bump_version, get_version, resource_etag, collection_etag, not_modified
+from .stats_service import record_clients, record_client_capital, record_mortgage, record_mortgages, forget_client_mortgages, recompute_portfolio_stats, get_portfolio_stats
+from .logging_service import JsonFormatter, NonBlockingQueueHandler, configure_logging, logging_stats, stop_logging
+from .metrics_service import Counter, Histogram, Gauge, PROMETHEUS_MIMETYPE, register, register_cache, render_metrics, timed, configure_metrics, observe_dispatcher
+from .serialization_service import client_statement, mortgage_statement, client_dicts, mortgage_dicts, iter_client_dicts, iter_mortgage_dicts
+from .json_service import FastJSONProvider, configure_json
+from .idempotency_service import IDEMPOTENCY_HEADER, IdempotencyStore, IDEMPOTENCY_STORE, configure_idempotency, idempotent
+from .prefork_service import waitress_options, serve, uses_shared_database, run_prefork
+
+# Modulos con dependencias de red pesadas (dnspython, smtplib, anyio) que se
+# importan la primera vez que se usa alguno de sus nombres
+_LAZY = {
+    "EmailVerifier": ".email_service",
+    "get_verifier": ".email_service",
+    "AsyncEmailVerifier": ".async_email_service",
+    "get_async_verifier": ".async_email_service",
+    "verify_emails_domain_async": ".async_email_service",
+    "prefetch_email_verdicts": ".async_email_service",
+    "AsgiApp": ".asgi_service",
+    "wsgi_environ": ".asgi_service",
+    "request_emails": ".asgi_service",
+}
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
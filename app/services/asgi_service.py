@@ -0,0 +1,189 @@
+import io
+import json
+import logging
+import re
+import sys
+import anyio
+import anyio.from_thread
+import anyio.to_thread
+from .async_email_service import prefetch_email_verdicts
+from .bulk_service import iter_records
+
+logger = logging.getLogger(__name__)
+
+# Rutas que verifican correos durante la peticion: (metodo, patron de la ruta,
+# True si el cuerpo es una importacion masiva)
+EMAIL_ROUTES = (
+    ("POST", re.compile(r"^/api/client/?$"), False),
+    ("PATCH", re.compile(r"^/api/client/[^/]+/?$"), False),
+    ("POST", re.compile(r"^/api/client/bulk/?$"), True),
+)
+
+class AsgiApp:
+    """
+    Aplicacion ASGI que sirve la aplicacion Flask (WSGI) desde un bucle de
+    eventos de anyio.
+
+    Las peticiones que verifican correos (alta, modificacion e importacion
+    masiva de clientes) resuelven antes los MX y comprueban los buzones de
+    forma asincrona; los veredictos quedan en las caches de verificacion y la
+    vista Flask ya no hace esperas de red. Asi, miles de verificaciones en
+    curso solo ocupan tareas del bucle de eventos y no hilos. El resto del
+    trabajo de la vista (validacion local y SQLite) se ejecuta en un pool de
+    `threads` hilos.
+
+    Args:
+        app (Flask): Aplicacion Flask.
+        threads (int): Hilos que ejecutan las vistas a la vez.
+        max_body_size (int): Tamaño maximo del cuerpo de una peticion en bytes.
+    """
+    def __init__(self, app, threads=4, max_body_size=64 * 1024 * 1024):
+        self.app = app
+        self.threads = threads
+        self.max_body_size = max_body_size
+        self._limiter = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._http(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        """Arranque y parada del servidor ASGI."""
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                self._limiter = anyio.CapacityLimiter(self.threads)
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _http(self, scope, receive, send):
+        """Atiende una peticion HTTP."""
+        body = await self._read_body(receive)
+        if body is None:
+            await send({"type": "http.response.start", "status": 413, "headers": [(b"content-length", b"0")]})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        if self.app.config.get("EMAIL_VERIFICATION", "sync") != "async":
+            await prefetch_email_verdicts(request_emails(scope["method"], scope["path"], body))
+        if self._limiter is None:
+            self._limiter = anyio.CapacityLimiter(self.threads)
+        await anyio.to_thread.run_sync(self._run_wsgi, wsgi_environ(scope, body), send, limiter=self._limiter)
+
+    async def _read_body(self, receive):
+        """Lee el cuerpo completo de la peticion, o None si supera el maximo."""
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                break
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > self.max_body_size:
+                return None
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                break
+        return b"".join(chunks)
+
+    def _run_wsgi(self, environ, send):
+        """
+        Ejecuta la aplicacion WSGI en un hilo del pool y envia la respuesta al
+        bucle de eventos trozo a trozo. La respuesta se recorre entera en el
+        mismo hilo, porque las respuestas en streaming de Flask mantienen su
+        contexto de peticion entre trozos.
+        """
+        status = {}
+
+        def start_response(status_line, headers, exc_info=None):
+            status["code"] = int(status_line.split(" ", 1)[0])
+            status["headers"] = [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers]
+            return lambda data: None
+
+        def start():
+            if not status.get("sent"):
+                anyio.from_thread.run(send, {"type": "http.response.start", "status": status["code"], "headers": status["headers"]})
+                status["sent"] = True
+
+        iterable = self.app(environ, start_response)
+        try:
+            for chunk in iterable:
+                if chunk:
+                    start()
+                    anyio.from_thread.run(send, {"type": "http.response.body", "body": chunk, "more_body": True})
+            start()
+            anyio.from_thread.run(send, {"type": "http.response.body", "body": b""})
+        finally:
+            if hasattr(iterable, "close"):
+                iterable.close()
+
+def wsgi_environ(scope, body):
+    """
+    Construye el entorno WSGI (PEP 3333) de una peticion HTTP ASGI.
+
+    Args:
+        scope (dict): Scope ASGI de la peticion.
+        body (bytes): Cuerpo completo de la peticion.
+
+    Returns:
+        dict: Entorno WSGI.
+    """
+    server = scope.get("server") or ("localhost", 80)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": str(server[0]),
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    if scope.get("client"):
+        environ["REMOTE_ADDR"], environ["REMOTE_PORT"] = scope["client"][0], str(scope["client"][1])
+    for name, value in scope.get("headers", []):
+        name = name.decode("latin-1").upper().replace("-", "_")
+        value = value.decode("latin-1")
+        if name == "CONTENT_TYPE":
+            environ["CONTENT_TYPE"] = value
+            continue
+        if name == "CONTENT_LENGTH":
+            continue
+        key = f"HTTP_{name}"
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+def request_emails(method, path, body):
+    """
+    Correos que verificara la vista de una peticion, segun su ruta.
+
+    Args:
+        method (str): Metodo HTTP.
+        path (str): Ruta de la peticion.
+        body (bytes): Cuerpo de la peticion.
+
+    Returns:
+        list: Correos del cuerpo (vacia si la ruta no verifica correos).
+    """
+    for route_method, pattern, bulk in EMAIL_ROUTES:
+        if method != route_method or not pattern.match(path):
+            continue
+        if bulk:
+            return [record.get("email") for _, record, _ in iter_records(io.BytesIO(body)) if isinstance(record, dict)]
+        try:
+            record = json.loads(body)
+        except ValueError:
+            return []
+        return [record.get("email")] if isinstance(record, dict) else []
+    return []
@@ -0,0 +1,216 @@
+import logging
+import time
+import anyio
+import dns.asyncresolver
+import dns.resolver
+from anyio.streams.buffered import BufferedByteReceiveStream
+from .cache_service import MISSING
+from .client_service import EMAIL_CACHE_TTL, EMAIL_CACHE_NEGATIVE_TTL, MX_CACHE, RCPT_CACHE, verify_email_format, store_rcpt_verdicts
+from .email_service import MAX_RCPT_PER_TRANSACTION, get_verifier
+from .metrics_service import VERIFY_LATENCY
+
+logger = logging.getLogger(__name__)
+
+# == Verificacion de correos sin bloquear hilos ===========================
+# Version asincrona (anyio) de la verificacion DNS/SMTP de client_service.
+# Comparte las caches de veredictos MX_CACHE y RCPT_CACHE, de modo que un
+# correo verificado aqui ya no necesita red en la verificacion sincrona.
+
+class SMTPReplyError(Exception):
+    """Respuesta SMTP inesperada en una sesion asincrona."""
+    def __init__(self, code, command):
+        super().__init__(f"{command!r} answered with {code}")
+        self.code = code
+
+class AsyncSMTPSession:
+    """
+    Sesion SMTP minima sobre un flujo de anyio: solo lo necesario para
+    comprobar buzones (HELO, MAIL FROM, RCPT TO, RSET y QUIT).
+
+    Args:
+        stream (ByteStream): Conexion TCP con el servidor de correo.
+        timeout (float): Segundos maximos de espera de cada respuesta.
+    """
+    def __init__(self, stream, timeout):
+        self.stream = stream
+        self.reader = BufferedByteReceiveStream(stream)
+        self.timeout = timeout
+
+    async def reply(self):
+        """Lee una respuesta (posiblemente de varias lineas) y devuelve su codigo."""
+        with anyio.fail_after(self.timeout):
+            while True:
+                line = await self.reader.receive_until(b"\r\n", 4096)
+                if line[3:4] != b"-":
+                    return int(line[:3])
+
+    async def command(self, line):
+        """Envia un comando y devuelve el codigo de la respuesta."""
+        await self.stream.send(line.encode() + b"\r\n")
+        return await self.reply()
+
+    async def expect(self, line, code=250):
+        """Envia un comando y falla si la respuesta no es `code`."""
+        reply = await self.command(line)
+        if reply != code:
+            raise SMTPReplyError(reply, line)
+
+class AsyncEmailVerifier:
+    """
+    Motor de verificacion de correos asincrono: resolutor DNS de
+    dns.asyncresolver y sesiones SMTP sobre sockets de anyio. Toma los
+    timeouts, el remitente y el nombre del HELO del motor sincrono.
+
+    Args:
+        verifier (EmailVerifier): Motor sincrono del que se copia la configuracion.
+        port (int): Puerto SMTP de los servidores de correo.
+    """
+    def __init__(self, verifier, port=25):
+        self.resolver = dns.asyncresolver.Resolver()
+        self.resolver.timeout = verifier.resolver.timeout
+        self.resolver.lifetime = verifier.resolver.lifetime
+        self.resolver.cache = dns.resolver.LRUCache(4096)
+        self.timeout = verifier.pool.timeout
+        self.helo_name = verifier.pool.helo_name
+        self.mail_from = verifier.mail_from
+        self.port = port
+
+    async def mx_hosts(self, domain):
+        """
+        Obtiene los servidores de correo de un dominio ordenados por prioridad.
+
+        Raises:
+            dns.exception.DNSException: Si el dominio no existe o no tiene MX.
+        """
+        answer = await self.resolver.resolve(domain, 'MX')
+        records = sorted(answer, key=lambda record: record.preference)
+        return tuple(record.exchange.to_text().rstrip('.') for record in records)
+
+    async def rcpt_many(self, hosts, addresses):
+        """
+        Comprueba varias direcciones de un mismo dominio con RCPT TO, probando
+        los hosts MX en orden hasta que uno responde.
+
+        Returns:
+            dict: Codigo SMTP por direccion. Vacio si ningun host ha respondido.
+        """
+        for host in hosts:
+            try:
+                return await self._rcpt_batch(host, addresses)
+            except (OSError, SMTPReplyError, ValueError, anyio.IncompleteRead, anyio.DelimiterNotFound) as error:
+                logger.warning("Cannot verify the email with %s: %s", host, error)
+        return {}
+
+    async def _rcpt_batch(self, host, addresses):
+        """Comprueba las direcciones contra un host en una sesion nueva."""
+        with anyio.fail_after(self.timeout):
+            stream = await anyio.connect_tcp(host, self.port)
+        async with stream:
+            session = AsyncSMTPSession(stream, self.timeout)
+            if await session.reply() != 220:
+                raise SMTPReplyError(220, "greeting")
+            await session.expect(f"HELO {self.helo_name}")
+            codes = {}
+            for start in range(0, len(addresses), MAX_RCPT_PER_TRANSACTION):
+                await session.expect(f"MAIL FROM:<{self.mail_from}>")
+                for address in addresses[start:start + MAX_RCPT_PER_TRANSACTION]:
+                    codes[address] = await session.command(f"RCPT TO:<{address}>")
+                await session.expect("RSET")
+            await session.command("QUIT")
+        return codes
+
+# Motor asincrono compartido, creado en el primer uso a partir del sincrono
+_async_verifier = None
+
+def get_async_verifier():
+    """
+    Devuelve el motor de verificacion asincrono compartido.
+
+    Returns:
+        AsyncEmailVerifier: Motor de verificacion.
+    """
+    global _async_verifier
+    if _async_verifier is None:
+        _async_verifier = AsyncEmailVerifier(get_verifier())
+    return _async_verifier
+
+async def verify_emails_domain_async(emails):
+    """
+    Equivalente asincrono de `verify_emails_domain`: las consultas DNS y las
+    sesiones SMTP de distintos dominios se hacen de forma concurrente en el
+    bucle de eventos, sin ocupar un hilo por verificacion.
+
+    Args:
+        emails (list): Direcciones a verificar (con formato ya validado).
+
+    Returns:
+        dict: Mensaje de error por direccion (cadena vacia si es valida).
+    """
+    start = time.perf_counter()
+    verifier = get_async_verifier()
+    verdicts = {}
+    domains = {}
+    for email in emails:
+        if not email:
+            verdicts[email] = ''
+            continue
+        verdict = RCPT_CACHE.get(email.lower())
+        if verdict is not MISSING:
+            verdicts[email] = verdict
+            continue
+        domains.setdefault(email.split('@')[1].lower(), []).append(email)
+
+    # Resolucion MX de todos los dominios a la vez y agrupacion por hosts
+    pending = {}
+
+    async def resolve(domain, addresses):
+        hosts = await _mx_hosts(verifier, domain)
+        if not hosts:
+            verdicts.update((email, 'The email service does not exist') for email in addresses)
+            return
+        pending.setdefault(hosts, []).extend(addresses)
+
+    async with anyio.create_task_group() as group:
+        for domain, addresses in domains.items():
+            group.start_soon(resolve, domain, addresses)
+
+    # Una sesion SMTP por grupo de hosts, todas a la vez
+    async def check(hosts, addresses):
+        verdicts.update(store_rcpt_verdicts(addresses, await verifier.rcpt_many(hosts, addresses)))
+
+    async with anyio.create_task_group() as group:
+        for hosts, addresses in pending.items():
+            group.start_soon(check, hosts, addresses)
+
+    VERIFY_LATENCY.observe(time.perf_counter() - start, "verify_emails_domain_async")
+    return verdicts
+
+async def _mx_hosts(verifier, domain):
+    """Hosts MX del dominio (cacheados por dominio), o None si no tiene."""
+    hosts = MX_CACHE.get(domain)
+    if hosts is MISSING:
+        try:
+            hosts = await verifier.mx_hosts(domain)
+            MX_CACHE.set(domain, hosts, EMAIL_CACHE_TTL)
+        except Exception as error:
+            logger.warning("Cannot resolve the MX hosts of %s: %s", domain, error)
+            hosts = None
+            MX_CACHE.set(domain, hosts, EMAIL_CACHE_NEGATIVE_TTL)
+    return hosts
+
+async def prefetch_email_verdicts(emails):
+    """
+    Verifica de forma asincrona las direcciones con formato valido para que
+    sus veredictos queden en cache. Los fallos se registran y se ignoran: la
+    verificacion sincrona los repetira.
+
+    Args:
+        emails (iterable): Direcciones a verificar.
+    """
+    emails = [email for email in emails if isinstance(email, str) and email and not verify_email_format(email)]
+    if not emails:
+        return
+    try:
+        await verify_emails_domain_async(emails)
+    except Exception:
+        logger.exception("Email prefetch failed")
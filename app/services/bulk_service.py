@@ -0,0 +1,125 @@
+import codecs
+import json
+
+# Tamaño de lectura del cuerpo de la peticion
+READ_SIZE = 64 * 1024
+
+def iter_records(stream):
+    """
+    Lee registros JSON de un flujo de bytes sin cargarlo entero en memoria. Se
+    admite NDJSON (un objeto por linea) o un array JSON de objetos.
+
+    Args:
+        stream: Objeto tipo fichero con el cuerpo de la peticion.
+
+    Yields:
+        tuple: (indice, registro, error). Si el registro no se puede decodificar
+        `registro` es None y `error` contiene el motivo.
+
+    Example:
+        >>> list(iter_records(io.BytesIO(b'{"dni": "1"}\\n{"dni": "2"}')))
+        [(0, {'dni': '1'}, None), (1, {'dni': '2'}, None)]
+    """
+    chunks = _iter_text(stream)
+    buffer = ''
+    for buffer in chunks:
+        if buffer.strip():
+            break
+    else:
+        return
+    if buffer.lstrip().startswith('['):
+        yield from _iter_json_array(buffer, chunks)
+    else:
+        yield from _iter_ndjson(buffer, chunks)
+
+def _iter_text(stream):
+    """Decodifica el flujo de bytes en trozos de texto UTF-8."""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    while True:
+        data = stream.read(READ_SIZE)
+        if not data:
+            tail = decoder.decode(b'', final=True)
+            if tail:
+                yield tail
+            return
+        yield decoder.decode(data)
+
+def _iter_ndjson(buffer, chunks):
+    """Registros de un cuerpo NDJSON."""
+    index = 0
+    while True:
+        *lines, buffer = buffer.split('\n')
+        for line in lines:
+            if line.strip():
+                yield (index, *_decode(line))
+                index += 1
+        chunk = next(chunks, None)
+        if chunk is None:
+            break
+        buffer += chunk
+    if buffer.strip():
+        yield (index, *_decode(buffer))
+
+def _iter_json_array(buffer, chunks):
+    """Registros de un cuerpo con un array JSON, decodificado incrementalmente."""
+    decoder = json.JSONDecoder()
+    index = 0
+    position = buffer.index('[') + 1
+    exhausted = False
+    while True:
+        # Se saltan espacios y separadores entre elementos
+        while position < len(buffer) and buffer[position] in ' \t\r\n,':
+            position += 1
+        if position < len(buffer) and buffer[position] == ']':
+            return
+        if position < len(buffer):
+            try:
+                record, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError as error:
+                # El elemento puede estar partido entre dos lecturas
+                if not exhausted:
+                    record, end = None, None
+                else:
+                    yield index, None, f"Invalid JSON: {error.msg}"
+                    return
+            if end is not None:
+                yield index, record, None if isinstance(record, dict) else "Each record must be a JSON object"
+                index += 1
+                # Se descarta lo ya procesado para no acumular el cuerpo entero
+                buffer, position = buffer[end:], 0
+                continue
+        elif exhausted:
+            yield index, None, "Invalid JSON: unterminated array"
+            return
+        chunk = next(chunks, None)
+        if chunk is None:
+            exhausted = True
+        else:
+            buffer += chunk
+
+def _decode(line):
+    """Decodifica una linea NDJSON en (registro, error)."""
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError as error:
+        return None, f"Invalid JSON: {error.msg}"
+    if not isinstance(record, dict):
+        return None, "Each record must be a JSON object"
+    return record, None
+
+def chunked(iterable, size):
+    """
+    Agrupa los elementos de un iterable en listas de como mucho `size` elementos.
+
+    Example:
+        >>> list(chunked(range(5), 2))
+        [[0, 1], [2, 3], [4]]
+    """
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
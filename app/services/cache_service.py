@@ -0,0 +1,227 @@
+import importlib
+import threading
+import time
+from collections import OrderedDict
+
+# Centinela para distinguir "no esta en cache" de un valor None almacenado
+MISSING = object()
+
+class TTLCache:
+    """
+    Cache en memoria acotada y segura entre hilos. Cada entrada tiene su propio
+    tiempo de vida (TTL) y, cuando se alcanza el tamaño maximo, se desaloja la
+    entrada usada hace mas tiempo (LRU).
+
+    Args:
+        maxsize (int): Numero maximo de entradas.
+        ttl (float | None): Tiempo de vida por defecto en segundos. None = sin caducidad.
+
+    Example:
+        >>> cache = TTLCache(maxsize=2, ttl=60)
+        >>> cache.set("a", 1)
+        >>> cache.get("a")
+        1
+        >>> cache.stats()["hits"]
+        1
+    """
+    def __init__(self, maxsize=1024, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=MISSING):
+        """
+        Obtiene el valor asociado a la clave si existe y no ha caducado.
+
+        Args:
+            key: Clave a buscar.
+            default: Valor devuelto si la clave no esta o ha caducado.
+
+        Returns:
+            El valor almacenado o `default`.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires is None or expires > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                # Entrada caducada: se elimina
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl=MISSING):
+        """
+        Almacena un valor. Si no se indica `ttl` se usa el de la cache.
+
+        Args:
+            key: Clave.
+            value: Valor a almacenar.
+            ttl (float | None): Tiempo de vida en segundos para esta entrada.
+        """
+        ttl = self.ttl if ttl is MISSING else ttl
+        expires = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        """Elimina la clave de la cache si existe."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """Vacia la cache y reinicia los contadores."""
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        """
+        Estadisticas de uso de la cache.
+
+        Returns:
+            dict: Aciertos, fallos, desalojos, tamaño y ratio de aciertos.
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+class LocalCacheBackend:
+    """
+    Backend de cache local al proceso, basado en `TTLCache`. Cualquier otro
+    backend (p.ej. uno compartido entre procesos) debe ofrecer los mismos
+    metodos: get, set, delete, clear y stats.
+
+    Args:
+        maxsize (int): Numero maximo de entradas.
+        ttl (float | None): Tiempo de vida de las entradas en segundos.
+    """
+    def __init__(self, maxsize=10000, ttl=60):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, key):
+        """Valor asociado a la clave o None si no esta."""
+        return self._cache.get(key, None)
+
+    def set(self, key, value):
+        """Almacena el valor con el TTL del backend."""
+        self._cache.set(key, value)
+
+    def delete(self, key):
+        """Elimina la clave."""
+        self._cache.delete(key)
+
+    def clear(self):
+        """Vacia el backend."""
+        self._cache.clear()
+
+    def stats(self):
+        """Estadisticas de uso del backend."""
+        return self._cache.stats()
+
+class ClientCache:
+    """
+    Cache de lectura de clientes ya serializados, indexada por DNI normalizado.
+    Guarda la version del cliente y su representacion (incluidas las
+    hipotecas), de modo que una lectura cacheada solo consulta la version del
+    cliente y no carga ni serializa nada. Cada cliente puede tener varias
+    representaciones cacheadas (`KINDS`): el cliente completo o solo su lista
+    de hipotecas.
+
+    Las escrituras sobre un cliente o sus hipotecas deben incrementar su
+    version y llamar a `invalidate` tras el commit. Las lecturas piden la
+    entrada de la version actual, de modo que una entrada antigua guardada por
+    una lectura que se cruza con la escritura nunca se sirve.
+
+    Args:
+        backend: Backend de almacenamiento (por defecto `LocalCacheBackend`).
+    """
+    KINDS = ("client", "mortgages")
+
+    def __init__(self, backend=None):
+        self.backend = backend or LocalCacheBackend()
+
+    @staticmethod
+    def key(dni, kind="client"):
+        """Clave normalizada de un DNI."""
+        return f"{kind}:{dni.lower()}"
+
+    def get(self, dni, kind="client", version=None):
+        """
+        Entrada cacheada del cliente.
+
+        Args:
+            dni (str): DNI del cliente.
+            kind (str): Representacion (una de `KINDS`).
+            version (int | None): Si se indica, solo se devuelve la entrada de
+                esa version.
+
+        Returns:
+            dict | None: {"version": int, "value": dict | list} o None si no esta.
+        """
+        entry = self.backend.get(self.key(dni, kind))
+        if entry is not None and version is not None and entry["version"] != version:
+            return None
+        return entry
+
+    def set(self, dni, version, value, kind="client"):
+        """Guarda la representacion de un cliente y su version."""
+        self.backend.set(self.key(dni, kind), {"version": version, "value": value})
+
+    def invalidate(self, dni):
+        """Descarta todas las entradas de un cliente."""
+        for kind in self.KINDS:
+            self.backend.delete(self.key(dni, kind))
+
+    def clear(self):
+        """Descarta todas las entradas."""
+        self.backend.clear()
+
+    def stats(self):
+        """Estadisticas de aciertos y fallos del backend."""
+        return self.backend.stats()
+
+# Cache de clientes compartida por la aplicacion. `configure_client_cache`
+# sustituye su backend segun la configuracion.
+CLIENT_CACHE = ClientCache()
+
+def configure_client_cache(app):
+    """
+    Configura el backend de la cache de clientes a partir de la aplicacion.
+
+    CLIENT_CACHE_BACKEND puede ser 'local' o la ruta 'modulo:Clase' de un
+    backend alternativo, que se construye con (maxsize, ttl).
+
+    Args:
+        app (Flask): Aplicacion Flask.
+    """
+    spec = app.config.get("CLIENT_CACHE_BACKEND", "local")
+    maxsize = app.config.get("CLIENT_CACHE_SIZE", 10000)
+    ttl = app.config.get("CLIENT_CACHE_TTL", 60)
+    if spec == "local":
+        backend_class = LocalCacheBackend
+    else:
+        module, _, name = spec.partition(":")
+        backend_class = getattr(importlib.import_module(module), name)
+    CLIENT_CACHE.backend = backend_class(maxsize=maxsize, ttl=ttl)
@@ -1,9 +1,23 @@
+import os
+import logging
 import re
-import dns.resolver
-import smtplib
-import socket
+from collections import defaultdict
+from .cache_service import TTLCache, MISSING
+from .dni_service import verify_dni
+from .metrics_service import timed
+
+logger = logging.getLogger(__name__)
+
+# Caches de veredictos de la verificacion de correos. El paso MX se cachea por
+# dominio y el paso RCPT por direccion. Los veredictos positivos duran mas que
+# los negativos (dominios caidos, buzones rechazados) para poder recuperarse.
+EMAIL_CACHE_TTL = float(os.getenv("EMAIL_CACHE_TTL", "86400"))
+EMAIL_CACHE_NEGATIVE_TTL = float(os.getenv("EMAIL_CACHE_NEGATIVE_TTL", "600"))
+MX_CACHE = TTLCache(maxsize=int(os.getenv("EMAIL_MX_CACHE_SIZE", "4096")))
+RCPT_CACHE = TTLCache(maxsize=int(os.getenv("EMAIL_RCPT_CACHE_SIZE", "65536")))
 
 # Verificación del nombre
+@timed
 def verify_name(name):
     """
     Verifica si el nombre es válido. Debe contener solo caracteres alfabéticos y espacios.
@@ -25,73 +39,26 @@ def verify_name(name):
     else:
         return 'El nombre solo puede contener caracteres y espacios'
 
-# Verificación del DNI/NIE/CIF
-def verify_dni(dni):
+# Verificación del correo electrónico
+@timed
+def verify_email(email):
     """
-    Verifica si el identificador DNI/NIE/CIF es válido.
+    Verifica si una dirección de correo electrónico es válida: formato, dominio
+    (consulta MX) y existencia del buzón (RCPT TO).
 
     Args:
-        dni (str): Identificador a verificar.
+        email (str): Dirección de correo a verificar.
 
     Returns:
-        str: Cadena vacía si es válido, mensaje de error si no lo es.
+        str: Cadena vacía si es válida, mensaje de error si no lo es.
     """
-    dni = dni.upper()  # Convertir a mayúsculas para consistencia.
-
-    # Definiciones de patrones y validaciones de documentos
-    LETTERS = 'TRWAGMYFPDXBNJZSQVHLCKE'
-    DNI_REGEX = r'^(\d{8})([A-Z])$'
-    NIE_REGEX = r'^[XYZ]\d{7}[A-Z]$'
-    CIF_LETTERS = 'JABCDEFGHI'
-    CIF_REGEX = r'^([ABCDEFGHJKLMNPQRSUVW])(\d{7})([0-9A-J])$'
-
-    def aux_cif(n):
-        """Auxiliar para calcular dígitos de control del CIF."""
-        n = str(int(n) * 2)
-        return sum(int(digit) for digit in n)
-
-    # Verificación base: si el identificador está vacío
-    if not dni or dni == '':
-        return ''
-    
-    # Validar DNI
-    if re.match(DNI_REGEX, dni, re.IGNORECASE):
-        number = int(dni[:-1])
-        control = dni[-1]
-        if control != LETTERS[number % 23]:
-            return 'DNI incorrecto'
-    
-    # Validar NIE
-    elif re.match(NIE_REGEX, dni, re.IGNORECASE):
-        number = int(dni[1:-1])
-        control = dni[-1]
-        if control != LETTERS[number % 23]:
-            return 'NIE incorrecto'
-    
-    # Validar CIF
-    elif re.match(CIF_REGEX, dni, re.IGNORECASE):
-        letter = dni[0]
-        number = dni[1:-1]
-        control = dni[-1]
+    return verify_email_format(email) or verify_email_domain(email)
 
-        fst_term = sum(int(number[i]) for i in range(1, 7, 2))
-        snd_term = sum(aux_cif(number[i]) for i in range(0, 7, 2))
-        end_term = (10 - (fst_term + snd_term) % 10) % 10
-
-        try:
-            if (letter in 'NPQRSW' and control != CIF_LETTERS[end_term]) or (letter not in 'NPQRSW' and int(control) != end_term):
-                return 'CIF incorrecto'
-        except:
-            return 'CIF incorrecto'
-    else:
-        return f'Identificador {dni} no válido'
-    
-    return ''
-
-# Verificación del correo electrónico
-def verify_email(email):
+# Verificación del formato del correo electrónico (sin red)
+@timed
+def verify_email_format(email):
     """
-    Verifica si una dirección de correo electrónico es válida.
+    Verifica unicamente el formato de una dirección de correo electrónico.
 
     Args:
         email (str): Dirección de correo a verificar.
@@ -108,31 +75,118 @@ def verify_email(email):
     if not re.match(EMAIL_REGEX, email, re.IGNORECASE):
         return 'The email address is badly formatted'
     
-    # Segunda verificación: existencia del dominio a través de consulta DNS
-    domain = email.split('@')[1]
-    try:
-        record = dns.resolver.resolve(domain, 'MX')[0].exchange.to_text()[:-1]
-    except Exception as error:
-        print(error)
-        return 'The email service does not exist'
-    
-    # Tercera verificación: probar el envío de un correo
-    smtp = smtplib.SMTP()
-    smtp.set_debuglevel(False)
-    try:
-        smtp.connect(record, 25)
-        smtp.helo(socket.gethostname())
-        smtp.mail('me@domain.com')
-        code, _ = smtp.rcpt(email)
-        smtp.quit()
-        if code != 250:
-            return 'The email does not exist'
-    except Exception as error:
-        print("Cannot verify the email:", error)
-    
     return ''
 
+# Verificación del dominio y buzón del correo electrónico (DNS y SMTP)
+@timed
+def verify_email_domain(email):
+    """
+    Verifica que el dominio de la dirección tenga servidor de correo (MX) y que
+    este acepte el buzón. Se asume que el formato ya ha sido validado.
+
+    Args:
+        email (str): Dirección de correo a verificar.
+
+    Returns:
+        str: Cadena vacía si es válida, mensaje de error si no lo es.
+    """
+    # Verificación base: si el correo está vacío
+    if not email or email == '':
+        return ''
+    return verify_emails_domain([email])[email]
+
+# Verificación de varias direcciones agrupando las comprobaciones por host MX
+@timed
+def verify_emails_domain(emails):
+    """
+    Verifica el dominio y el buzón de varias direcciones. Las direcciones que
+    comparten servidores MX se comprueban sobre una misma sesión SMTP.
+
+    Args:
+        emails (list): Direcciones a verificar (con formato ya validado).
+
+    Returns:
+        dict: Mensaje de error por dirección (cadena vacía si es válida).
+    """
+    verdicts = {}
+    pending = defaultdict(list)
+    for email in emails:
+        if not email:
+            verdicts[email] = ''
+            continue
+        # Tercera verificación (cacheada): resultado previo del buzón
+        verdict = RCPT_CACHE.get(email.lower())
+        if verdict is not MISSING:
+            verdicts[email] = verdict
+            continue
+        # Segunda verificación: existencia del dominio a través de consulta DNS
+        hosts = _mx_hosts(email.split('@')[1].lower())
+        if not hosts:
+            verdicts[email] = 'The email service does not exist'
+            continue
+        pending[hosts].append(email)
+
+    # Tercera verificación: probar el envío de un correo, una sesión por host
+    for hosts, addresses in pending.items():
+        verdicts.update(store_rcpt_verdicts(addresses, _verifier().rcpt_many(hosts, addresses)))
+    return verdicts
+
+def store_rcpt_verdicts(addresses, codes):
+    """
+    Convierte los codigos de respuesta RCPT TO en veredictos y los guarda en
+    la cache de buzones.
+
+    Args:
+        addresses (list): Direcciones comprobadas.
+        codes (dict): Codigo SMTP por direccion (vacio si no se ha podido comprobar).
+
+    Returns:
+        dict: Mensaje de error por direccion (cadena vacia si es valida).
+    """
+    verdicts = {}
+    for email in addresses:
+        code = codes.get(email)
+        if code == 250:
+            verdict, ttl = '', EMAIL_CACHE_TTL
+        elif code is None:
+            # No se ha podido verificar: se acepta, pero solo durante el TTL
+            # negativo para no pagar el timeout de un servidor caido.
+            verdict, ttl = '', EMAIL_CACHE_NEGATIVE_TTL
+        else:
+            verdict, ttl = 'The email does not exist', EMAIL_CACHE_NEGATIVE_TTL
+        RCPT_CACHE.set(email.lower(), verdict, ttl)
+        verdicts[email] = verdict
+    return verdicts
+
+def _verifier():
+    """Motor de verificacion compartido. email_service (dnspython y smtplib) se importa en el primer uso."""
+    from .email_service import get_verifier
+    return get_verifier()
+
+def _mx_hosts(domain):
+    """Hosts MX del dominio (cacheados por dominio), o None si no tiene."""
+    hosts = MX_CACHE.get(domain)
+    if hosts is MISSING:
+        try:
+            hosts = _verifier().mx_hosts(domain)
+            MX_CACHE.set(domain, hosts, EMAIL_CACHE_TTL)
+        except Exception as error:
+            logger.warning("Cannot resolve the MX hosts of %s: %s", domain, error)
+            hosts = None
+            MX_CACHE.set(domain, hosts, EMAIL_CACHE_NEGATIVE_TTL)
+    return hosts
+
+def email_cache_stats():
+    """
+    Estadisticas de las caches de verificacion de correo.
+
+    Returns:
+        dict: Estadisticas de las caches MX (por dominio) y RCPT (por direccion).
+    """
+    return {"mx": MX_CACHE.stats(), "rcpt": RCPT_CACHE.stats()}
+
 # Verificación del capital prestado
+@timed
 def verify_capital(capital):
     """
     Verifica si el valor del capital prestado es válido.
@@ -151,7 +205,7 @@ def verify_capital(capital):
     try:
         capital = int(capital)
     except ValueError as error:
-        print(error)
+        logger.debug("Invalid capital: %s", error)
         return 'Invalid capital'
     
     # Segunda verificación: no puede ser negativo
@@ -161,23 +215,27 @@ def verify_capital(capital):
     return ''
 
 # Función principal para verificar un cliente
-def verify_client(client):
+@timed
+def verify_client(client, network=True):
     """
     Verifica los datos de un cliente mediante varias funciones de validación.
 
     Args:
         client (dict): Diccionario con los datos del cliente a verificar.
+        network (bool): Si es False, solo se comprueba el formato del correo y
+            se omiten las verificaciones DNS/SMTP.
 
     Returns:
         dict: Diccionario con los errores encontrados, vacío si todo es válido.
     """
     errors = {}
+    check_email = verify_email if network else verify_email_format
 
     if "name" in client and (error := verify_name(client["name"])):
         errors["name"] = error
     if "dni" in client and (error := verify_dni(client["dni"])):
         errors["dni"] = error
-    if "email" in client and (error := verify_email(client["email"])):
+    if "email" in client and (error := check_email(client["email"])):
         errors["email"] = error
     if "capital" in client and (error := verify_capital(client["capital"])):
         errors["capital"] = error
@@ -0,0 +1,104 @@
+import re
+from functools import lru_cache
+from .metrics_service import timed
+
+# Letras de control del DNI/NIE y del CIF
+LETTERS = 'TRWAGMYFPDXBNJZSQVHLCKE'
+CIF_LETTERS = 'JABCDEFGHI'
+# Tipos de CIF cuyo control es una letra en vez de un digito
+CIF_LETTER_CONTROL = 'NPQRSW'
+# Suma de los digitos del doble de cada digito (posiciones impares del CIF)
+CIF_DOUBLE_SUM = (0, 2, 4, 6, 8, 1, 3, 5, 7, 9)
+
+# Un unico patron precompilado que clasifica el identificador en una pasada:
+# el grupo que casa indica si es DNI, NIE o CIF.
+IDENTIFIER_REGEX = re.compile(
+    r'^(?:(?P<dni>\d{8})[A-Z]'
+    r'|(?P<nie>[XYZ]\d{7})[A-Z]'
+    r'|(?P<cif>[ABCDEFGHJKLMNPQRSUVW]\d{7})[0-9A-J])$'
+)
+
+def classify_identifier(dni):
+    """
+    Clasifica y valida un identificador DNI/NIE/CIF.
+
+    Args:
+        dni (str): Identificador a verificar (no distingue mayusculas).
+
+    Returns:
+        tuple: (tipo, error). `tipo` es 'DNI', 'NIE', 'CIF' o None si el
+        formato no corresponde a ninguno; `error` es cadena vacia si es valido.
+
+    Example:
+        >>> classify_identifier("12345678z")
+        ('DNI', '')
+        >>> classify_identifier("X1234567A")
+        ('NIE', 'NIE incorrecto')
+    """
+    dni = dni.upper()  # Convertir a mayúsculas para consistencia.
+
+    # Verificación base: si el identificador está vacío
+    if not dni:
+        return None, ''
+
+    match = IDENTIFIER_REGEX.match(dni)
+    if not match:
+        return None, f'Identificador {dni} no válido'
+    control = dni[-1]
+
+    # Validar DNI
+    if number := match.group('dni'):
+        return 'DNI', '' if control == LETTERS[int(number) % 23] else 'DNI incorrecto'
+
+    # Validar NIE
+    if number := match.group('nie'):
+        return 'NIE', '' if control == LETTERS[int(number[1:]) % 23] else 'NIE incorrecto'
+
+    # Validar CIF
+    letter = dni[0]
+    number = dni[1:-1]
+    fst_term = int(number[1]) + int(number[3]) + int(number[5])
+    snd_term = sum(CIF_DOUBLE_SUM[int(number[i])] for i in (0, 2, 4, 6))
+    end_term = (10 - (fst_term + snd_term) % 10) % 10
+    if letter in CIF_LETTER_CONTROL:
+        valid = control == CIF_LETTERS[end_term]
+    else:
+        valid = control.isdigit() and int(control) == end_term
+    return 'CIF', '' if valid else 'CIF incorrecto'
+
+# Version memorizada para las rutas, que validan una y otra vez los mismos DNI
+check_identifier = lru_cache(maxsize=4096)(classify_identifier)
+
+@timed
+def verify_dni(dni):
+    """
+    Verifica si el identificador DNI/NIE/CIF es válido.
+
+    Args:
+        dni (str): Identificador a verificar.
+
+    Returns:
+        str: Cadena vacía si es válido, mensaje de error si no lo es.
+    """
+    return check_identifier(dni)[1]
+
+def validate_identifiers(identifiers):
+    """
+    Valida una lista de identificadores.
+
+    Args:
+        identifiers (list): Identificadores a verificar.
+
+    Returns:
+        list: Un diccionario por identificador con su tipo, si es valido y el
+        error en caso contrario, en el mismo orden.
+    """
+    results = []
+    for identifier in identifiers:
+        if not isinstance(identifier, str) or not identifier:
+            results.append({"id": identifier, "type": None, "valid": False, "error": "Identifier must be a non-empty string"})
+            continue
+        # Sin memorizar: un lote grande solo desplazaria las entradas de las rutas
+        kind, error = classify_identifier(identifier)
+        results.append({"id": identifier, "type": kind, "valid": not error, "error": error or None})
+    return results
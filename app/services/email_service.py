@@ -0,0 +1,202 @@
+import os
+import logging
+import smtplib
+import socket
+import threading
+import time
+import dns.resolver
+
+logger = logging.getLogger(__name__)
+
+# Maximo de destinatarios por transaccion SMTP. Muchos servidores rechazan mas
+# de 100 RCPT TO por transaccion (RFC 5321, 4.5.3.1.8).
+MAX_RCPT_PER_TRANSACTION = 100
+
+class SMTPSessionPool:
+    """
+    Pool de sesiones SMTP abiertas por servidor de correo (host MX). Permite
+    reutilizar la misma conexion (TCP + HELO) para verificar muchas direcciones.
+
+    Args:
+        timeout (float): Timeout de conexion y lectura en segundos.
+        max_idle (int): Sesiones ociosas que se conservan por host.
+        idle_timeout (float): Segundos tras los que una sesion ociosa se descarta.
+        helo_name (str): Nombre a anunciar en el HELO.
+    """
+    def __init__(self, timeout=10, max_idle=2, idle_timeout=30, helo_name=None):
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.idle_timeout = idle_timeout
+        self.helo_name = helo_name or socket.gethostname()
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, host):
+        """
+        Obtiene una sesion para el host, reutilizando una ociosa si la hay.
+
+        Returns:
+            tuple: (sesion SMTP, True si es reutilizada).
+        """
+        now = time.monotonic()
+        with self._lock:
+            sessions = self._idle.get(host, [])
+            while sessions:
+                smtp, last_used = sessions.pop()
+                if now - last_used < self.idle_timeout:
+                    return smtp, True
+                self._close(smtp)
+        return self.connect(host), False
+
+    def connect(self, host):
+        """Abre una sesion nueva contra el host (conexion y HELO)."""
+        smtp = smtplib.SMTP(timeout=self.timeout)
+        smtp.set_debuglevel(False)
+        smtp.connect(host, 25)
+        smtp.helo(self.helo_name)
+        return smtp
+
+    def release(self, host, smtp):
+        """Devuelve una sesion al pool (o la cierra si el pool esta lleno)."""
+        with self._lock:
+            sessions = self._idle.setdefault(host, [])
+            if len(sessions) < self.max_idle:
+                sessions.append((smtp, time.monotonic()))
+                return
+        self._close(smtp)
+
+    def discard(self, smtp):
+        """Cierra una sesion que ha fallado sin devolverla al pool."""
+        self._close(smtp)
+
+    def close_all(self):
+        """Cierra todas las sesiones ociosas."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for sessions in idle.values():
+            for smtp, _ in sessions:
+                self._close(smtp)
+
+    def _close(self, smtp):
+        try:
+            smtp.quit()
+        except Exception:
+            smtp.close()
+
+class EmailVerifier:
+    """
+    Motor compartido de verificacion de correos: resolutor DNS reutilizado con
+    cache y timeouts propios, recorrido de los registros MX por prioridad y
+    pool de sesiones SMTP por host para comprobar varios RCPT TO por conexion.
+
+    Args:
+        dns_timeout (float): Timeout de cada consulta DNS a un servidor.
+        dns_lifetime (float): Tiempo maximo total de una resolucion DNS.
+        dns_cache_size (int): Entradas de la cache del resolutor.
+        smtp_timeout (float): Timeout de las sesiones SMTP.
+        smtp_pool_size (int): Sesiones ociosas conservadas por host MX.
+        smtp_idle_timeout (float): Segundos que se conserva una sesion ociosa.
+        mail_from (str): Remitente usado en el MAIL FROM.
+    """
+    def __init__(self, dns_timeout=3, dns_lifetime=6, dns_cache_size=4096, smtp_timeout=10,
+                 smtp_pool_size=2, smtp_idle_timeout=30, mail_from='me@domain.com'):
+        self.resolver = dns.resolver.Resolver()
+        self.resolver.timeout = dns_timeout
+        self.resolver.lifetime = dns_lifetime
+        self.resolver.cache = dns.resolver.LRUCache(dns_cache_size)
+        self.pool = SMTPSessionPool(timeout=smtp_timeout, max_idle=smtp_pool_size, idle_timeout=smtp_idle_timeout)
+        self.mail_from = mail_from
+
+    def mx_hosts(self, domain):
+        """
+        Obtiene los servidores de correo de un dominio ordenados por prioridad.
+
+        Args:
+            domain (str): Dominio a resolver.
+
+        Returns:
+            tuple: Hosts MX, de mayor a menor prioridad.
+
+        Raises:
+            dns.exception.DNSException: Si el dominio no existe o no tiene MX.
+        """
+        answer = self.resolver.resolve(domain, 'MX')
+        records = sorted(answer, key=lambda record: record.preference)
+        return tuple(record.exchange.to_text().rstrip('.') for record in records)
+
+    def rcpt_many(self, hosts, addresses):
+        """
+        Comprueba varias direcciones de un mismo dominio con RCPT TO. Se prueban
+        los hosts MX en orden hasta que uno responde.
+
+        Args:
+            hosts (tuple): Hosts MX del dominio, por prioridad.
+            addresses (list): Direcciones a comprobar.
+
+        Returns:
+            dict: Codigo SMTP de respuesta por direccion. Vacio si ningun host
+            ha podido atender la comprobacion.
+        """
+        for host in hosts:
+            try:
+                return self._rcpt_batch(host, addresses)
+            except (OSError, smtplib.SMTPException) as error:
+                logger.warning("Cannot verify the email with %s: %s", host, error)
+        return {}
+
+    def _rcpt_batch(self, host, addresses):
+        """Comprueba las direcciones contra un host usando una sesion del pool."""
+        smtp, reused = self.pool.acquire(host)
+        try:
+            try:
+                codes = self._rcpt_session(smtp, addresses)
+            except smtplib.SMTPServerDisconnected:
+                # Una sesion ociosa puede haber sido cerrada por el servidor:
+                # se reintenta una vez con una conexion nueva.
+                if not reused:
+                    raise
+                self.pool.discard(smtp)
+                smtp = self.pool.connect(host)
+                codes = self._rcpt_session(smtp, addresses)
+        except Exception:
+            self.pool.discard(smtp)
+            raise
+        self.pool.release(host, smtp)
+        return codes
+
+    def _rcpt_session(self, smtp, addresses):
+        """Ejecuta las transacciones MAIL FROM / RCPT TO / RSET necesarias."""
+        codes = {}
+        for start in range(0, len(addresses), MAX_RCPT_PER_TRANSACTION):
+            code, message = smtp.mail(self.mail_from)
+            if code != 250:
+                raise smtplib.SMTPSenderRefused(code, message, self.mail_from)
+            for address in addresses[start:start + MAX_RCPT_PER_TRANSACTION]:
+                codes[address], _ = smtp.rcpt(address)
+            smtp.rset()
+        return codes
+
+# Motor compartido por toda la aplicacion, creado en el primer uso
+_verifier = None
+_verifier_lock = threading.Lock()
+
+def get_verifier():
+    """
+    Devuelve el motor de verificacion compartido, creandolo la primera vez con
+    la configuracion de las variables de entorno.
+
+    Returns:
+        EmailVerifier: Motor de verificacion.
+    """
+    global _verifier
+    if _verifier is None:
+        with _verifier_lock:
+            if _verifier is None:
+                _verifier = EmailVerifier(
+                    dns_timeout=float(os.getenv("EMAIL_DNS_TIMEOUT", "3")),
+                    dns_lifetime=float(os.getenv("EMAIL_DNS_LIFETIME", "6")),
+                    smtp_timeout=float(os.getenv("EMAIL_SMTP_TIMEOUT", "10")),
+                    smtp_pool_size=int(os.getenv("EMAIL_SMTP_POOL_SIZE", "2")),
+                    smtp_idle_timeout=float(os.getenv("EMAIL_SMTP_IDLE_TIMEOUT", "30")),
+                )
+    return _verifier
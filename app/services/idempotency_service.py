@@ -0,0 +1,150 @@
+import functools
+import hashlib
+import threading
+import time
+from flask import current_app, request
+from .cache_service import TTLCache, MISSING
+
+# Cabecera con la clave de idempotencia y cabecera que marca las respuestas repetidas
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+# Longitud maxima de una clave de idempotencia
+MAX_KEY_LENGTH = 255
+
+class IdempotencyStore:
+    """
+    Almacen de respuestas por clave de idempotencia, acotado y con TTL, que
+    ademas registra las peticiones en curso: una peticion repetida mientras la
+    original se esta ejecutando espera a que termine y recibe su respuesta.
+
+    Args:
+        maxsize (int): Numero maximo de respuestas almacenadas.
+        ttl (float): Segundos que se conserva cada respuesta.
+    """
+    def __init__(self, maxsize=10000, ttl=86400):
+        self.responses = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def begin(self, key, timeout):
+        """
+        Reserva la ejecucion de una clave o devuelve la respuesta almacenada.
+        Si otra peticion con la misma clave esta en curso, espera a que
+        termine (como mucho `timeout` segundos).
+
+        Args:
+            key: Clave de idempotencia (con el metodo y la ruta).
+            timeout (float): Segundos maximos de espera.
+
+        Returns:
+            dict | None: Respuesta almacenada, o None si la peticion actual
+            debe ejecutarse (y despues llamar a `finish`).
+
+        Raises:
+            TimeoutError: Si la peticion original no termina a tiempo.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                stored = self.responses.get(key)
+                if stored is not MISSING:
+                    return stored
+                event = self._inflight.get(key)
+                if event is None:
+                    self._inflight[key] = threading.Event()
+                    return None
+            # Si la original termina sin respuesta almacenable (error 500), la
+            # siguiente vuelta reserva la clave para esta peticion
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not event.wait(remaining):
+                raise TimeoutError(key)
+
+    def finish(self, key, stored):
+        """
+        Libera una clave reservada con `begin`, almacenando la respuesta si la
+        hay, y despierta a las peticiones que esperaban.
+
+        Args:
+            key: Clave de idempotencia.
+            stored (dict | None): Respuesta a almacenar, o None para no almacenar nada.
+        """
+        with self._lock:
+            if stored is not None:
+                self.responses.set(key, stored)
+            event = self._inflight.pop(key, None)
+        if event is not None:
+            event.set()
+
+    def configure(self, maxsize, ttl):
+        """Sustituye el almacen de respuestas por uno vacio con otro tamaño y TTL."""
+        with self._lock:
+            self.responses = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def stats(self):
+        """Estadisticas del almacen de respuestas y peticiones en curso."""
+        with self._lock:
+            inflight = len(self._inflight)
+        return {**self.responses.stats(), "inflight": inflight}
+
+# Almacen compartido por la aplicacion
+IDEMPOTENCY_STORE = IdempotencyStore()
+
+def configure_idempotency(app):
+    """
+    Dimensiona el almacen de respuestas con IDEMPOTENCY_CACHE_SIZE e
+    IDEMPOTENCY_TTL.
+
+    Args:
+        app (Flask): Aplicacion Flask.
+    """
+    IDEMPOTENCY_STORE.configure(app.config.get("IDEMPOTENCY_CACHE_SIZE", 10000), app.config.get("IDEMPOTENCY_TTL", 86400))
+
+def idempotent(view):
+    """
+    Decorador de rutas POST que admite la cabecera Idempotency-Key.
+
+    La primera peticion con una clave se ejecuta y, si no termina con un error
+    5xx, se guardan su estado y su cuerpo. Las repeticiones con la misma clave,
+    metodo y ruta reciben esa respuesta (con la cabecera Idempotent-Replayed)
+    sin validar nada ni consultar la base de datos. Las que llegan mientras la
+    original esta en curso esperan a que termine (IDEMPOTENCY_WAIT_TIMEOUT).
+
+    Errores:
+    - 400: Si la clave es demasiado larga.
+    - 409: Si la peticion original sigue en curso al agotar la espera.
+    - 422: Si la clave se reutiliza con un cuerpo distinto.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return view(*args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return {"error": {"idempotency_key": f"Idempotency-Key cannot be longer than {MAX_KEY_LENGTH} characters"}}, 400
+        scoped = (request.method, request.path, key)
+        fingerprint = hashlib.sha256(request.get_data()).hexdigest()
+        try:
+            stored = IDEMPOTENCY_STORE.begin(scoped, current_app.config.get("IDEMPOTENCY_WAIT_TIMEOUT", 30))
+        except TimeoutError:
+            return {"error": {"idempotency_key": "A request with this Idempotency-Key is still in progress"}}, 409
+        if stored is not None:
+            if stored["fingerprint"] != fingerprint:
+                return {"error": {"idempotency_key": "Idempotency-Key was already used with a different request body"}}, 422
+            return current_app.response_class(
+                stored["body"], status=stored["status"], content_type=stored["content_type"], headers={REPLAYED_HEADER: "true"}
+            )
+
+        stored = None
+        try:
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code < 500 and not response.is_streamed:
+                stored = {
+                    "fingerprint": fingerprint,
+                    "status": response.status_code,
+                    "body": response.get_data(),
+                    "content_type": response.content_type,
+                }
+            return response
+        finally:
+            IDEMPOTENCY_STORE.finish(scoped, stored)
+    return wrapper
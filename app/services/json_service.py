@@ -0,0 +1,69 @@
+import json
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional
+    orjson = None
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Proveedor JSON de Flask que serializa con orjson si esta instalado y, si
+    no, con un codificador de la libreria estandar creado una sola vez (en vez
+    de uno nuevo por respuesta). La salida es la misma que la del proveedor por
+    defecto: claves ordenadas y separadores compactos fuera del modo debug
+    (orjson escribe UTF-8 sin escapar los caracteres no ASCII).
+    """
+    # Opciones de orjson equivalentes a las del proveedor por defecto
+    ORJSON_OPTIONS = (orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY) if orjson else 0
+
+    def __init__(self, app, use_orjson=True):
+        super().__init__(app)
+        self.use_orjson = bool(orjson) and use_orjson
+        self._encoder = json.JSONEncoder(
+            sort_keys=self.sort_keys, ensure_ascii=self.ensure_ascii,
+            separators=(",", ":"), default=self.default
+        )
+
+    def dumps(self, obj, **kwargs):
+        """Serializa `obj` a una cadena JSON."""
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        if self.use_orjson:
+            return orjson.dumps(obj, default=self.default, option=self.ORJSON_OPTIONS).decode()
+        return self._encoder.encode(obj)
+
+    def dumps_bytes(self, obj):
+        """Serializa `obj` directamente a bytes UTF-8 (sin pasar por str con orjson)."""
+        if self.use_orjson:
+            return orjson.dumps(obj, default=self.default, option=self.ORJSON_OPTIONS)
+        return self._encoder.encode(obj).encode()
+
+    def loads(self, s, **kwargs):
+        """Deserializa una cadena o bytes JSON."""
+        if self.use_orjson and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        """Respuesta JSON; en modo debug se mantiene la salida indentada por defecto."""
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj) + b"\n", mimetype=self.mimetype)
+
+def configure_json(app):
+    """
+    Registra el proveedor JSON de la aplicacion segun JSON_PROVIDER:
+    'auto' (orjson si esta instalado), 'orjson' (obligatorio) o 'std'.
+
+    Args:
+        app (Flask): Aplicacion Flask.
+
+    Raises:
+        RuntimeError: Si se pide 'orjson' y no esta instalado.
+    """
+    provider = app.config.get("JSON_PROVIDER", "auto")
+    if provider == "orjson" and orjson is None:
+        raise RuntimeError("JSON_PROVIDER=orjson requires orjson: python -m pip install -r requirements-optional.txt")
+    app.json = FastJSONProvider(app, use_orjson=provider != "std")
@@ -0,0 +1,154 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import time
+import uuid
+from logging.handlers import QueueHandler, QueueListener
+from flask import current_app, g, has_request_context, request
+
+# Atributos estandar de un LogRecord: el resto son campos extra (`extra=`)
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id"}
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formatea cada registro como una linea JSON con la marca de tiempo, el
+    nivel, el logger, el mensaje, el id de la peticion y los campos extra.
+
+    Example:
+        {"ts": "2025-01-01T10:00:00.123Z", "level": "INFO", "logger": "access",
+         "message": "request", "request_id": "3f2a...", "status": 200, "duration_ms": 1.4}
+    """
+    def format(self, record):
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Handler que deja los registros en una cola acotada para que un hilo
+    escritor los emita. Si la cola esta llena el registro se descarta (y se
+    cuenta) en lugar de bloquear el hilo de la peticion.
+    """
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record):
+        # El mensaje, la traza y el id de la peticion se resuelven en el hilo
+        # que registra; el formateo JSON y la escritura, en el hilo escritor.
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        if not getattr(record, "request_id", None) and has_request_context():
+            record.request_id = g.get("request_id")
+        return record
+
+# Listener (hilo escritor) activo, para poder pararlo al reconfigurar o al salir
+_listener = None
+_handler = None
+
+def configure_logging(app):
+    """
+    Configura el logging de la aplicacion: el logger raiz escribe en una cola
+    acotada (LOG_QUEUE_SIZE) y un hilo en segundo plano emite los registros en
+    JSON por la salida estandar. Ademas registra el log de acceso de cada
+    peticion (id, ruta, estado y duracion) con el muestreo de LOG_SAMPLE_RATE.
+
+    Args:
+        app (Flask): Aplicacion Flask.
+    """
+    global _listener, _handler
+    if _listener is not None:
+        _listener.stop()
+
+    log_queue = queue.Queue(maxsize=app.config.get("LOG_QUEUE_SIZE", 10000))
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter())
+    _listener = QueueListener(log_queue, output, respect_handler_level=False)
+    _handler = NonBlockingQueueHandler(log_queue)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_handler)
+    root.setLevel(app.config.get("LOG_LEVEL", "INFO").upper())
+    _listener.start()
+
+    if "access_log" not in app.extensions:
+        app.before_request(_start_request)
+        app.after_request(_log_request)
+        app.extensions["access_log"] = access_logger
+
+def logging_stats():
+    """
+    Estadisticas del logging.
+
+    Returns:
+        dict: Registros pendientes en la cola y registros descartados.
+    """
+    if _handler is None:
+        return {"queued": 0, "dropped": 0}
+    return {"queued": _handler.queue.qsize(), "dropped": _handler.dropped}
+
+@atexit.register
+def stop_logging():
+    """Emite los registros pendientes y para el hilo escritor (al terminar el proceso)."""
+    if _listener is not None:
+        _listener.stop()
+
+def _forget_listener():
+    """Tras un fork el hilo escritor no existe en el hijo: se configura de nuevo."""
+    global _listener
+    _listener = None
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_listener)
+
+# == Log de acceso ========================================================
+access_logger = logging.getLogger("access")
+
+def _start_request():
+    """Asigna el id de la peticion (X-Request-ID o uno nuevo) y toma el tiempo de inicio."""
+    g.request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+    g.request_start = time.perf_counter()
+
+def _log_request(response):
+    """Registra la peticion ya atendida. Las respuestas con error se registran siempre."""
+    response.headers["X-Request-ID"] = g.request_id
+    rate = current_app.config.get("LOG_SAMPLE_RATE", 1.0)
+    if response.status_code < 400 and rate < 1.0 and random.random() >= rate:
+        return response
+    access_logger.info("request", extra={
+        "method": request.method,
+        "route": request.url_rule.rule if request.url_rule else None,
+        "path": request.path,
+        "status": response.status_code,
+        "duration_ms": round((time.perf_counter() - g.request_start) * 1000, 3),
+    })
+    return response
@@ -0,0 +1,279 @@
+import functools
+import threading
+import time
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# == Metricas =============================================================
+# Implementacion minima del formato de texto de Prometheus (version 0.0.4):
+# contadores, histogramas y medidores calculados al exportar.
+
+PROMETHEUS_MIMETYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Limites (en segundos) de los histogramas de latencia
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Limites de los histogramas de tiempos cortos (consultas SQL y validadores)
+FAST_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+# Limites del numero de consultas SQL por peticion
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+def _escape(value):
+    """Escapa el valor de una etiqueta (barras, comillas y saltos de linea)."""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(names, values):
+    """Etiquetas en formato Prometheus: {a="1",b="2"}."""
+    if not names:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + '}'
+
+class Counter:
+    """
+    Contador monotono con etiquetas.
+
+    Args:
+        name (str): Nombre de la metrica.
+        help (str): Descripcion.
+        labels (tuple): Nombres de las etiquetas.
+    """
+    kind = 'counter'
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        """Incrementa el contador de la combinacion de etiquetas."""
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        """Lineas de muestra de la metrica."""
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_labels(self.labels, key)} {value}" for key, value in values]
+
+class Histogram:
+    """
+    Histograma acumulado con etiquetas.
+
+    Args:
+        name (str): Nombre de la metrica.
+        help (str): Descripcion.
+        labels (tuple): Nombres de las etiquetas.
+        buckets (tuple): Limites superiores de los cubos, ordenados.
+    """
+    kind = 'histogram'
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        """Registra una observacion para la combinacion de etiquetas."""
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [[0] * len(self.buckets), 0, 0.0]
+            counts = series[0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            series[1] += 1
+            series[2] += value
+
+    def samples(self):
+        """Lineas de muestra de la metrica (cubos acumulados, _sum y _count)."""
+        with self._lock:
+            values = [(key, list(counts), count, total) for key, (counts, count, total) in self._values.items()]
+        names = self.labels + ('le',)
+        lines = []
+        for key, counts, count, total in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_labels(names, key + (bound,))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_labels(names, key + ('+Inf',))} {count}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, key)} {total}")
+            lines.append(f"{self.name}_count{_labels(self.labels, key)} {count}")
+        return lines
+
+class Gauge:
+    """
+    Medidor cuyo valor se obtiene al exportar llamando a `collect`, que
+    devuelve una lista de (valores de las etiquetas, valor).
+
+    Args:
+        name (str): Nombre de la metrica.
+        help (str): Descripcion.
+        collect (callable): Funcion que devuelve las muestras.
+        labels (tuple): Nombres de las etiquetas.
+    """
+    kind = 'gauge'
+
+    def __init__(self, name, help, collect, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.collect = collect
+
+    def samples(self):
+        """Lineas de muestra de la metrica."""
+        return [f"{self.name}{_labels(self.labels, key)} {value}" for key, value in self.collect()]
+
+# Metricas registradas, en el orden en que se exportan
+REGISTRY = []
+
+def register(metric):
+    """Registra una metrica para exportarla en /metrics y la devuelve."""
+    REGISTRY.append(metric)
+    return metric
+
+def render_metrics():
+    """
+    Exporta todas las metricas registradas.
+
+    Returns:
+        str: Metricas en el formato de texto de Prometheus.
+    """
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.samples())
+    return '\n'.join(lines) + '\n'
+
+# == Metricas de la aplicacion ============================================
+HTTP_REQUESTS = register(Counter(
+    'http_requests_total', 'Peticiones HTTP atendidas.', ('endpoint', 'method', 'status')))
+HTTP_LATENCY = register(Histogram(
+    'http_request_duration_seconds', 'Duracion de las peticiones HTTP.', ('endpoint', 'method', 'status')))
+HTTP_SQL_QUERIES = register(Histogram(
+    'http_request_sql_queries', 'Consultas SQL por peticion.', ('endpoint',), COUNT_BUCKETS))
+HTTP_SQL_TIME = register(Histogram(
+    'http_request_sql_duration_seconds', 'Tiempo en consultas SQL por peticion.', ('endpoint',)))
+SQL_QUERIES = register(Counter(
+    'sql_queries_total', 'Consultas SQL ejecutadas.'))
+SQL_LATENCY = register(Histogram(
+    'sql_query_duration_seconds', 'Duracion de cada consulta SQL.', (), FAST_BUCKETS))
+VERIFY_LATENCY = register(Histogram(
+    'verify_duration_seconds', 'Duracion de las funciones de validacion.', ('function',), FAST_BUCKETS))
+
+def timed(function):
+    """
+    Decorador que mide la duracion de una funcion de validacion en
+    `verify_duration_seconds`, etiquetada con el nombre de la funcion.
+    """
+    name = function.__name__
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            VERIFY_LATENCY.observe(time.perf_counter() - start, name)
+    return wrapper
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    SQL_QUERIES.inc()
+    SQL_LATENCY.observe(elapsed)
+    if has_request_context():
+        g.sql_queries = g.get("sql_queries", 0) + 1
+        g.sql_seconds = g.get("sql_seconds", 0.0) + elapsed
+
+def _handle_error(context):
+    # Una consulta fallida no llega a after_cursor_execute
+    if context.connection is not None and context.connection.info.get("query_start"):
+        context.connection.info["query_start"].pop()
+
+def _start_request():
+    g.metrics_start = time.perf_counter()
+
+def _record_request(response):
+    endpoint = request.endpoint or 'unmatched'
+    status = str(response.status_code)
+    HTTP_REQUESTS.inc(endpoint, request.method, status)
+    HTTP_LATENCY.observe(time.perf_counter() - g.get("metrics_start", time.perf_counter()), endpoint, request.method, status)
+    HTTP_SQL_QUERIES.observe(g.get("sql_queries", 0), endpoint)
+    HTTP_SQL_TIME.observe(g.get("sql_seconds", 0.0), endpoint)
+    return response
+
+def configure_metrics(app):
+    """
+    Activa la instrumentacion: latencia y numero de peticiones por endpoint y
+    estado, y numero y tiempo de las consultas SQL (eventos de SQLAlchemy).
+
+    Args:
+        app (Flask): Aplicacion Flask.
+    """
+    if "metrics" in app.extensions:
+        return
+    app.before_request(_start_request)
+    app.after_request(_record_request)
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+    app.extensions["metrics"] = REGISTRY
+
+# == Waitress =============================================================
+# Dispatcher de tareas de waitress, si el servidor se ha arrancado con
+# `observe_dispatcher`.
+_dispatcher = None
+
+def observe_dispatcher(dispatcher):
+    """
+    Exporta la cola y el uso de los hilos del dispatcher de waitress.
+
+    Args:
+        dispatcher: `server.task_dispatcher` de un servidor de waitress.
+    """
+    global _dispatcher
+    _dispatcher = dispatcher
+
+def _waitress_samples():
+    if _dispatcher is None:
+        return []
+    with _dispatcher.lock:
+        threads = len(_dispatcher.threads) - _dispatcher.stop_count
+        return [(("threads",), threads), (("active",), _dispatcher.active_count), (("queue",), len(_dispatcher.queue))]
+
+register(Gauge('waitress_tasks', 'Hilos de waitress, hilos ocupados y tareas en cola.', _waitress_samples, ('state',)))
+
+# == Caches ===============================================================
+# Funciones `stats()` de las caches exportadas, por nombre
+_caches = {}
+
+def register_cache(name, stats):
+    """
+    Exporta los aciertos, fallos, desalojos y tamaño de una cache.
+
+    Args:
+        name (str): Nombre de la cache en la etiqueta `cache`.
+        stats (callable): Funcion que devuelve el diccionario de `TTLCache.stats`.
+    """
+    _caches[name] = stats
+
+def _cache_samples():
+    samples = []
+    for name, stats in list(_caches.items()):
+        values = stats()
+        for field in ("hits", "misses", "evictions", "size"):
+            samples.append(((name, field), values.get(field, 0)))
+    return samples
+
+register(Gauge('cache_entries', 'Aciertos, fallos, desalojos y tamaño de las caches.', _cache_samples, ('cache', 'field')))
@@ -1,6 +1,10 @@
-import sys
+import logging
 from .client_service import verify_dni
+from .metrics_service import timed
 
+logger = logging.getLogger(__name__)
+
+@timed
 def verify_tae(tae):
     """
     Verifica la validez de la Tasa Anual Equivalente (TAE).
@@ -27,7 +31,7 @@ def verify_tae(tae):
     try:
         tae = int(tae)
     except ValueError as error:
-        print(error, file=sys.stderr)
+        logger.debug("Invalid mortgage value: %s", error)
         return 'Invalid tae'
     
     # Segunda verificación: no puede ser negativo
@@ -41,6 +45,7 @@ def verify_tae(tae):
     # TAE válido
     return ''
 
+@timed
 def verify_years(years):
     """
     Verifica la validez de los años de duración de la hipoteca.
@@ -67,7 +72,7 @@ def verify_years(years):
     try:
         years = int(years)
     except ValueError as error:
-        print(error, file=sys.stderr)
+        logger.debug("Invalid mortgage value: %s", error)
         return 'Invalid years'
     
     # Segunda verificación: no puede ser negativo
@@ -77,6 +82,7 @@ def verify_years(years):
     # Valor de años válido
     return ''
 
+@timed
 def verify_mortgage(mortgage):
     """
     Verifica la validez de los datos de una hipoteca.
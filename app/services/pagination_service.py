@@ -0,0 +1,98 @@
+import base64
+import json
+from sqlalchemy import tuple_
+
+def encode_cursor(values):
+    """
+    Codifica los valores de la clave del ultimo elemento de una pagina en un
+    cursor opaco apto para URL.
+
+    Example:
+        >>> decode_cursor(encode_cursor(["12345678z"]))
+        ['12345678z']
+    """
+    raw = json.dumps(list(values), separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """
+    Decodifica un cursor generado por `encode_cursor`.
+
+    Raises:
+        ValueError: Si el cursor no es valido.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(values, list) or not values:
+        raise ValueError('Invalid cursor')
+    # Las claves de ordenacion son cadenas o enteros (bool es subclase de int)
+    if any(type(value) not in (str, int) for value in values):
+        raise ValueError('Invalid cursor')
+    return values
+
+def page_args(args, default_limit, max_limit):
+    """
+    Obtiene los parametros de paginacion `limit` y `after` de la query string.
+
+    Args:
+        args (MultiDict): Parametros de la peticion (request.args).
+        default_limit (int): Tamaño de pagina si no se indica `limit`.
+        max_limit (int): Tamaño maximo de pagina permitido.
+
+    Returns:
+        tuple: (limit, after) donde `after` es la lista de valores de la clave
+        del cursor o None si se pide la primera pagina.
+
+    Raises:
+        ValueError: Si algun parametro no es valido.
+    """
+    try:
+        limit = int(args.get('limit', default_limit))
+    except ValueError:
+        raise ValueError('Invalid limit')
+    if limit < 1 or limit > max_limit:
+        raise ValueError(f'The limit must be between 1 and {max_limit}')
+    after = args.get('after')
+    return limit, decode_cursor(after) if after else None
+
+def keyset_page(session, statement, keys, after, limit, cursor_of, entities=True):
+    """
+    Ejecuta una consulta paginada por clave (keyset): en vez de OFFSET se filtra
+    por las filas con clave mayor que la del cursor, de forma que cada pagina
+    es un recorrido del indice con coste constante.
+
+    Args:
+        session (Session): Sesion de SQLAlchemy.
+        statement (Select): Consulta base sin ORDER BY ni LIMIT.
+        keys (list): Columnas que forman la clave unica de ordenacion.
+        after (list | None): Valores de la clave del cursor.
+        limit (int): Tamaño de pagina.
+        cursor_of (callable): Obtiene los valores de la clave de una fila.
+        entities (bool): Si es True se devuelven las entidades del ORM de la
+            consulta; si es False, las filas de columnas tal cual.
+
+    Returns:
+        tuple: (filas de la pagina, cursor de la pagina siguiente o None).
+
+    Raises:
+        ValueError: Si el cursor no corresponde con la clave.
+    """
+    if after is not None:
+        if len(after) != len(keys):
+            raise ValueError('Invalid cursor')
+        # Cada valor debe ser del tipo de su columna (cadena para el DNI, entero para tae y years)
+        if any(type(value) is not key.type.python_type for key, value in zip(keys, after)):
+            raise ValueError('Invalid cursor')
+        if len(keys) == 1:
+            statement = statement.where(keys[0] > after[0])
+        else:
+            statement = statement.where(tuple_(*keys) > tuple_(*after))
+    # Se pide un elemento de mas para saber si hay pagina siguiente
+    result = session.execute(statement.order_by(*keys).limit(limit + 1))
+    rows = result.scalars().all() if entities else result.all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(cursor_of(rows[-1]))
+    return rows, None
@@ -0,0 +1,157 @@
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from config import db
+from waitress import create_server
+from .logging_service import configure_logging, stop_logging
+from .metrics_service import observe_dispatcher
+
+logger = logging.getLogger(__name__)
+
+# Si un proceso hijo termina antes de estos segundos se espera antes de
+# volver a arrancarlo, para no entrar en un bucle de reinicios.
+MIN_WORKER_UPTIME = 1.0
+
+def waitress_options(app):
+    """
+    Opciones de waitress configuradas en la aplicacion.
+
+    Args:
+        app (Flask): Aplicacion Flask.
+
+    Returns:
+        dict: Argumentos de `waitress.create_server`.
+    """
+    return {
+        "threads": app.config["THREADS"],
+        "backlog": app.config["BACKLOG"],
+        "connection_limit": app.config["CONNECTION_LIMIT"],
+        "channel_timeout": app.config["CHANNEL_TIMEOUT"],
+    }
+
+def serve(app, host, port):
+    """
+    Sirve la aplicacion con waitress en un solo proceso.
+
+    Args:
+        app (Flask): Aplicacion Flask.
+        host (str): Direccion en la que escuchar.
+        port (int | str): Puerto en el que escuchar.
+    """
+    server = create_server(app, host=host, port=port, **waitress_options(app))
+    observe_dispatcher(server.task_dispatcher)
+    server.run()
+
+def uses_shared_database(app):
+    """
+    Indica si la base de datos de la aplicacion la pueden compartir varios
+    procesos (no es una base de datos SQLite en memoria).
+
+    Args:
+        app (Flask): Aplicacion Flask con la base de datos inicializada.
+
+    Returns:
+        bool: False si la base de datos es SQLite en memoria.
+    """
+    with app.app_context():
+        url = db.engine.url
+    if url.get_backend_name() != "sqlite":
+        return True
+    return bool(url.database) and url.database != ":memory:" and "mode=memory" not in str(url)
+
+def run_prefork(app, host, port, workers):
+    """
+    Arranca `workers` procesos hijo de waitress que comparten el socket de
+    escucha, abierto por el proceso padre antes de crearlos. El padre
+    supervisa a los hijos y vuelve a arrancar los que terminan; con SIGTERM o
+    SIGINT los para a todos y termina.
+
+    Cada hijo tiene sus propias conexiones a la base de datos, su cache de
+    clientes y sus metricas, por lo que la base de datos debe estar en disco.
+
+    Args:
+        app (Flask): Aplicacion Flask con la base de datos inicializada.
+        host (str): Direccion en la que escuchar.
+        port (int | str): Puerto en el que escuchar.
+        workers (int): Numero de procesos hijo.
+
+    Raises:
+        RuntimeError: Si el sistema no permite fork o la base de datos es en memoria.
+    """
+    if not hasattr(os, "fork"):
+        raise RuntimeError("WORKERS > 1 requires a platform with os.fork")
+    if not uses_shared_database(app):
+        raise RuntimeError("WORKERS > 1 requires an on-disk database shared by all workers (STORAGE=file)")
+
+    listener = socket.create_server((host, int(port)), backlog=app.config["BACKLOG"])
+    listener.set_inheritable(True)
+    # Las conexiones abiertas por el padre (migraciones) no se comparten con los hijos
+    with app.app_context():
+        db.engine.dispose()
+
+    children = {}
+    stopping = False
+
+    def spawn(slot):
+        pid = os.fork()
+        if pid == 0:
+            _run_worker(app, listener, slot)
+        children[pid] = (slot, time.monotonic())
+        logger.info("Worker started", extra={"pid": pid, "worker": slot})
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for slot in range(workers):
+        spawn(slot)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        slot, started = children.pop(pid, (None, None))
+        if slot is None or stopping:
+            continue
+        logger.warning("Worker exited, restarting", extra={"pid": pid, "worker": slot, "status": os.waitstatus_to_exitcode(status)})
+        if time.monotonic() - started < MIN_WORKER_UPTIME:
+            time.sleep(MIN_WORKER_UPTIME)
+        if not stopping:
+            spawn(slot)
+    listener.close()
+
+def _run_worker(app, listener, slot):
+    """Proceso hijo: sirve peticiones sobre el socket heredado hasta recibir SIGTERM."""
+    status = 0
+    try:
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        # El hilo escritor del log no sobrevive al fork
+        configure_logging(app)
+        with app.app_context():
+            db.engine.dispose(close=False)
+        server = create_server(app, sockets=[listener], **waitress_options(app))
+        observe_dispatcher(server.task_dispatcher)
+        server.run()
+    except SystemExit as exit:
+        status = exit.code or 0
+    except BaseException:
+        logger.exception("Worker failed", extra={"worker": slot})
+        status = 1
+    finally:
+        # os._exit no ejecuta atexit: se vacia la cola del log a mano
+        stop_logging()
+        os._exit(status)
@@ -0,0 +1,139 @@
+import numpy as np
+from .mortgage_service import verify_tae, verify_years
+
+def monthly_fee_grid(capital, taes, years):
+    """
+    Calcula en una sola pasada vectorizada la cuota mensual de una hipoteca
+    (sistema frances) para todas las combinaciones de TAE y plazo.
+
+        cuota = C * i / (1 - (1 + i) ^ -n),   i = TAE / 1200, n = años * 12
+
+    Con TAE 0 la formula no esta definida y la cuota es C / n.
+
+    Args:
+        capital (float): Capital prestado.
+        taes (list): TAE en porcentaje (filas de la matriz).
+        years (list): Plazos en años, mayores que 0 (columnas de la matriz).
+
+    Returns:
+        numpy.ndarray: Matriz (len(taes), len(years)) con las cuotas mensuales.
+
+    Example:
+        >>> monthly_fee_grid(120000, [0, 3], [10]).round(2).tolist()
+        [[1000.0], [1158.73]]
+    """
+    return _annuity(capital, np.asarray(taes, dtype=np.float64)[:, np.newaxis], np.asarray(years, dtype=np.float64)[np.newaxis, :])
+
+def monthly_fees(capital, taes, years):
+    """
+    Cuotas mensuales de varias hipotecas del mismo capital en una sola pasada
+    vectorizada: una cuota por cada pareja (taes[k], years[k]).
+
+    Args:
+        capital (float): Capital prestado.
+        taes (list): TAE en porcentaje de cada hipoteca.
+        years (list): Plazo en años de cada hipoteca, mayor que 0.
+
+    Returns:
+        list: Cuotas mensuales, en el orden de las parejas.
+
+    Example:
+        >>> [round(fee, 2) for fee in monthly_fees(120000, [0, 3], [10, 10])]
+        [1000.0, 1158.73]
+    """
+    return _annuity(capital, np.asarray(taes, dtype=np.float64), np.asarray(years, dtype=np.float64)).tolist()
+
+def _annuity(capital, taes, years):
+    """Cuota del sistema frances para arrays (que se difunden) de TAE y plazos."""
+    i = taes / 1200
+    n = years * 12
+    # Se sustituye i = 0 por 1 en la formula general para no dividir por cero;
+    # esas celdas se toman despues de la rama C / n
+    safe_i = np.where(i == 0, 1.0, i)
+    annuity = capital * safe_i / -np.expm1(-n * np.log1p(safe_i))
+    return np.where(i == 0, capital / n, annuity)
+
+def monthly_fee(capital, tae, years):
+    """
+    Cuota mensual de una unica hipoteca. Ver `monthly_fee_grid`.
+
+    Example:
+        >>> round(monthly_fee(120000, 0, 10), 2)
+        1000.0
+    """
+    return float(monthly_fee_grid(capital, [tae], [years])[0, 0])
+
+def quote_grid(capital, taes, years):
+    """
+    Tabla de cuotas mensuales y totales para todas las combinaciones de TAE y
+    plazo, redondeadas a centimos.
+
+    Args:
+        capital (float): Capital prestado.
+        taes (list): TAE en porcentaje.
+        years (list): Plazos en años.
+
+    Returns:
+        dict: Ejes de la tabla y matrices `monthly_fee` y `total_fee`
+        (una fila por TAE y una columna por plazo).
+    """
+    fees = monthly_fee_grid(capital, taes, years)
+    totals = fees * (np.asarray(years, dtype=np.float64) * 12)
+    return {
+        "capital": capital,
+        "tae": list(taes),
+        "years": list(years),
+        "monthly_fee": fees.round(2).tolist(),
+        "total_fee": totals.round(2).tolist(),
+    }
+
+def parse_quote_axis(value, name, max_points):
+    """
+    Interpreta un eje de la tabla de cotizacion. Se admite una lista de valores
+    o un rango {"start": a, "stop": b, "step": c} con `stop` incluido.
+
+    Args:
+        value (list | dict): Valor recibido en la peticion (solo enteros JSON).
+        name (str): 'tae' o 'years'.
+        max_points (int): Numero maximo de valores del eje.
+
+    Returns:
+        tuple: (lista de enteros, mensaje de error o cadena vacia).
+
+    Example:
+        >>> parse_quote_axis({"start": 1, "stop": 5, "step": 2}, "tae", 100)
+        ([1, 3, 5], '')
+    """
+    if isinstance(value, dict):
+        try:
+            start, stop, step = value["start"], value["stop"], value.get("step", 1)
+        except KeyError:
+            return [], f"Invalid {name} range, expected start, stop and optional step"
+        # Solo enteros: int() truncaria 1.9 a 1 y convertiria true en 1
+        if any(type(v) is not int for v in (start, stop, step)):
+            return [], f"Invalid {name}"
+        if step <= 0:
+            return [], f"The {name} step must be positive"
+        if stop < start:
+            return [], f"The {name} range is empty"
+        if (stop - start) // step + 1 > max_points:
+            return [], f"At most {max_points} {name} values are allowed"
+        values = list(range(start, stop + 1, step))
+    elif isinstance(value, list):
+        if not value:
+            return [], f"At least one {name} value is required"
+        if len(value) > max_points:
+            return [], f"At most {max_points} {name} values are allowed"
+        if any(type(v) is not int for v in value):
+            return [], f"Invalid {name}"
+        values = value
+    else:
+        return [], f"Expected a list or a range for {name}"
+
+    verify = verify_tae if name == "tae" else verify_years
+    for v in values:
+        if error := verify(v):
+            return [], error
+        if name == "years" and v < 1:
+            return [], 'Years must be greater than 0'
+    return values, ''
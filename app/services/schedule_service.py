@@ -0,0 +1,70 @@
+import os
+import numpy as np
+from .cache_service import TTLCache, MISSING
+from .quote_service import monthly_fee
+
+# Cuadros de amortizacion memorizados por (capital, tae, years). Los productos
+# mas consultados se sirven sin recalcular.
+SCHEDULE_CACHE = TTLCache(maxsize=int(os.getenv("SCHEDULE_CACHE_SIZE", "256")))
+
+def amortization_schedule(capital, tae, years):
+    """
+    Calcula de forma vectorizada el cuadro de amortizacion mensual (sistema
+    frances) de una hipoteca. El saldo pendiente tras el mes k es:
+
+        B_k = C * (1 + i) ^ k - cuota * ((1 + i) ^ k - 1) / i    (B_k = C - cuota * k si i = 0)
+
+    El resultado se memoriza por (capital, tae, years) en una cache LRU acotada.
+
+    Args:
+        capital (float): Capital prestado.
+        tae (int): TAE en porcentaje.
+        years (int): Plazo en años.
+
+    Returns:
+        dict: Cuota mensual y arrays (de solo lectura) `interest`, `principal`
+        y `balance` con un elemento por mes.
+    """
+    key = (capital, tae, years)
+    schedule = SCHEDULE_CACHE.get(key)
+    if schedule is not MISSING:
+        return schedule
+
+    fee = monthly_fee(capital, tae, years)
+    i = tae / 1200
+    k = np.arange(1, years * 12 + 1, dtype=np.float64)
+    if i == 0:
+        balance = capital - fee * k
+    else:
+        growth = np.power(1 + i, k)
+        balance = capital * growth - fee * (growth - 1) / i
+    # El ultimo saldo es 0 salvo error de redondeo
+    balance[-1] = 0.0
+    previous = np.concatenate(([float(capital)], balance[:-1]))
+    interest = previous * i
+    principal = fee - interest
+    for array in (interest, principal, balance):
+        array.setflags(write=False)
+
+    schedule = {"monthly_fee": fee, "interest": interest, "principal": principal, "balance": balance}
+    SCHEDULE_CACHE.set(key, schedule)
+    return schedule
+
+def schedule_rows(schedule):
+    """
+    Filas del cuadro de amortizacion, redondeadas a centimos.
+
+    Args:
+        schedule (dict): Resultado de `amortization_schedule`.
+
+    Yields:
+        dict: Mes, cuota, intereses, capital amortizado y saldo pendiente.
+    """
+    fee = round(schedule["monthly_fee"], 2)
+    columns = zip(
+        schedule["interest"].round(2).tolist(),
+        schedule["principal"].round(2).tolist(),
+        schedule["balance"].round(2).tolist(),
+    )
+    for month, (interest, principal, balance) in enumerate(columns, start=1):
+        yield {"month": month, "fee": fee, "interest": interest, "principal": principal, "balance": balance}
@@ -0,0 +1,80 @@
+from collections import defaultdict
+from models import Client, Mortgage
+from sqlalchemy import select
+
+# == Serializacion sin ORM ================================================
+# Los listados grandes seleccionan tuplas de columnas con SQLAlchemy Core y las
+# convierten directamente en diccionarios, sin crear instancias del ORM (ni
+# mapa de identidad ni atributos instrumentados). La representacion es la
+# misma que la de `get_dict` porque ambas usan `row_dict` de cada modelo.
+
+def client_statement():
+    """Consulta base de las columnas de los clientes, sin ORDER BY."""
+    return select(*Client.row_columns())
+
+def mortgage_statement():
+    """Consulta base de las columnas de las hipotecas, sin ORDER BY."""
+    return select(*Mortgage.row_columns())
+
+def mortgage_dicts(rows):
+    """
+    Serializa filas de `mortgage_statement`.
+
+    Args:
+        rows (iterable): Filas con las columnas de `Mortgage.row_columns`.
+
+    Returns:
+        list: Diccionarios de las hipotecas.
+    """
+    row_dict = Mortgage.row_dict
+    return [row_dict(*row) for row in rows]
+
+def client_dicts(session, rows):
+    """
+    Serializa filas de `client_statement` junto con sus hipotecas, que se
+    obtienen con una unica consulta para todo el lote.
+
+    Args:
+        session (Session): Sesion de SQLAlchemy.
+        rows (list): Filas con las columnas de `Client.row_columns`.
+
+    Returns:
+        list: Diccionarios de los clientes, en el orden de las filas.
+    """
+    if not rows:
+        return []
+    mortgages = defaultdict(list)
+    statement = mortgage_statement().where(Mortgage.dni.in_([row[0] for row in rows])) \
+        .order_by(Mortgage.dni, Mortgage.tae, Mortgage.years)
+    row_dict = Mortgage.row_dict
+    for row in session.execute(statement):
+        mortgages[row[0]].append(row_dict(*row))
+    return [Client.row_dict(row, mortgages.get(row[0], [])) for row in rows]
+
+def iter_client_dicts(session, statement, batch_size):
+    """
+    Recorre un listado de clientes por lotes de `batch_size` filas, con una
+    consulta de hipotecas por lote.
+
+    Args:
+        session (Session): Sesion de SQLAlchemy.
+        statement (Select): Consulta de `client_statement` ya ordenada.
+        batch_size (int): Filas por lote.
+
+    Yields:
+        dict: Diccionario de cada cliente.
+    """
+    result = session.execute(statement.execution_options(yield_per=batch_size))
+    for rows in result.partitions():
+        yield from client_dicts(session, rows)
+
+def iter_mortgage_dicts(session, statement, batch_size):
+    """
+    Recorre un listado de hipotecas por lotes de `batch_size` filas.
+
+    Yields:
+        dict: Diccionario de cada hipoteca.
+    """
+    result = session.execute(statement.execution_options(yield_per=batch_size))
+    for rows in result.partitions():
+        yield from mortgage_dicts(rows)
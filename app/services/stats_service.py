@@ -0,0 +1,178 @@
+from config import db
+from models import Client, Mortgage, PortfolioStat
+from sqlalchemy import String, cast, delete, func, insert, literal, select, update
+
+# Cubos de agregados: clientes, hipotecas y una fila de hipotecas por TAE
+CLIENT_BUCKET = 'client'
+MORTGAGE_BUCKET = 'mortgage'
+TAE_BUCKET = 'tae:'
+
+def _apply(bucket, count=0, capital=0, years=0, repayment=0):
+    """
+    Suma los incrementos a un cubo dentro de la transaccion en curso (se
+    confirma con el siguiente commit de la sesion), creandolo si no existe.
+    """
+    updated = db.session.execute(
+        update(PortfolioStat).where(PortfolioStat.bucket == bucket).values(
+            count=PortfolioStat.count + count,
+            capital=PortfolioStat.capital + capital,
+            years=PortfolioStat.years + years,
+            repayment=PortfolioStat.repayment + repayment,
+        )
+    )
+    if not updated.rowcount:
+        db.session.add(PortfolioStat(bucket=bucket, count=count, capital=capital, years=years, repayment=repayment))
+        db.session.flush()
+
+def _amount(capital):
+    """
+    Capital como numero: verify_capital admite cadenas numericas ("1000"),
+    que se convierten a entero. None y la cadena vacia cuentan como 0.
+    """
+    if not capital:
+        return 0
+    return capital if isinstance(capital, (int, float)) else int(capital)
+
+def record_clients(capitals, sign=1):
+    """
+    Registra el alta (sign=1) o la baja (sign=-1) de uno o varios clientes.
+
+    Args:
+        capitals (list): Capital de cada cliente (None cuenta como 0).
+        sign (int): 1 para altas, -1 para bajas.
+    """
+    capitals = [_amount(capital) for capital in capitals]
+    if capitals:
+        _apply(CLIENT_BUCKET, count=sign * len(capitals), capital=sign * sum(capitals))
+
+def record_client_capital(old, new):
+    """Registra el cambio de capital de un cliente."""
+    old, new = _amount(old), _amount(new)
+    if new != old:
+        _apply(CLIENT_BUCKET, capital=new - old)
+
+def record_mortgage(mortgage, sign=1):
+    """
+    Registra la contratacion (sign=1) o la cancelacion (sign=-1) de una hipoteca.
+
+    Args:
+        mortgage (Mortgage): Hipoteca con tae, years, monthly_fee y capital.
+        sign (int): 1 para altas, -1 para bajas.
+    """
+    capital = mortgage.capital or 0
+    repayment = mortgage.monthly_fee * mortgage.years * 12
+    for bucket in (MORTGAGE_BUCKET, f"{TAE_BUCKET}{mortgage.tae}"):
+        _apply(bucket, count=sign, capital=sign * capital, years=sign * mortgage.years, repayment=sign * repayment)
+
+def record_mortgages(rows, sign=1):
+    """
+    Registra la contratacion (sign=1) o la cancelacion (sign=-1) de varias
+    hipotecas con una sola actualizacion por cubo.
+
+    Args:
+        rows (list): Diccionarios con tae, years, monthly_fee y capital.
+        sign (int): 1 para altas, -1 para bajas.
+    """
+    buckets = {}
+    for row in rows:
+        repayment = row["monthly_fee"] * row["years"] * 12
+        for bucket in (MORTGAGE_BUCKET, f"{TAE_BUCKET}{row['tae']}"):
+            totals = buckets.setdefault(bucket, [0, 0, 0, 0.0])
+            totals[0] += 1
+            totals[1] += row["capital"] or 0
+            totals[2] += row["years"]
+            totals[3] += repayment
+    for bucket, (count, capital, years, repayment) in buckets.items():
+        _apply(bucket, count=sign * count, capital=sign * capital, years=sign * years, repayment=sign * repayment)
+
+def forget_client_mortgages(dni):
+    """
+    Descuenta de los agregados todas las hipotecas de un cliente. Se debe
+    llamar antes de borrar el cliente (las hipotecas se borran en cascada).
+
+    Args:
+        dni (str): DNI normalizado (en minusculas) del cliente.
+    """
+    rows = db.session.execute(
+        select(Mortgage.tae, *_mortgage_sums()).where(Mortgage.dni == dni).group_by(Mortgage.tae)
+    )
+    for tae, count, capital, years, repayment in rows:
+        for bucket in (MORTGAGE_BUCKET, f"{TAE_BUCKET}{tae}"):
+            _apply(bucket, count=-count, capital=-capital, years=-years, repayment=-repayment)
+
+def _mortgage_sums():
+    """Expresiones de agregacion de las hipotecas, en el orden de las columnas del cubo."""
+    return (
+        func.count(),
+        func.coalesce(func.sum(Mortgage.capital), 0),
+        func.coalesce(func.sum(Mortgage.years), 0),
+        func.coalesce(func.sum(Mortgage.monthly_fee * Mortgage.years * 12), 0),
+    )
+
+def recompute_portfolio_stats(connection=None):
+    """
+    Recalcula todos los agregados recorriendo las tablas de clientes e
+    hipotecas. Sirve para reparar los agregados si se han desviado.
+
+    Args:
+        connection: Conexion o sesion sobre la que ejecutar (por defecto la
+            sesion de la aplicacion). No se hace commit.
+    """
+    connection = connection if connection is not None else db.session
+    columns = ["bucket", "count", "capital", "years", "repayment"]
+    connection.execute(delete(PortfolioStat))
+    connection.execute(insert(PortfolioStat).from_select(columns, select(
+        literal(CLIENT_BUCKET), func.count(), func.coalesce(func.sum(Client.capital), 0), literal(0), literal(0)
+    ).select_from(Client)))
+    connection.execute(insert(PortfolioStat).from_select(columns, select(
+        literal(MORTGAGE_BUCKET), *_mortgage_sums()
+    ).select_from(Mortgage)))
+    connection.execute(insert(PortfolioStat).from_select(columns, select(
+        literal(TAE_BUCKET).concat(cast(Mortgage.tae, String)), *_mortgage_sums()
+    ).group_by(Mortgage.tae)))
+
+def get_portfolio_stats():
+    """
+    Estadisticas de la cartera a partir de los agregados. Solo se leen los
+    cubos (uno por TAE distinto), nunca las tablas de clientes e hipotecas.
+
+    Returns:
+        dict: Clientes, hipotecas y distribucion por TAE.
+
+    Example:
+        {
+            "clients": {"count": 2, "capital": 150000},
+            "mortgages": {"count": 1, "capital": 100000, "repayment": 133103.42,
+                          "average_years": 20.0, "average_tae": 3.0},
+            "tae": [{"tae": 3, "count": 1, "capital": 100000, "repayment": 133103.42, "average_years": 20.0}]
+        }
+    """
+    buckets = {stat.bucket: stat for stat in db.session.execute(select(PortfolioStat)).scalars()}
+    clients = buckets.get(CLIENT_BUCKET)
+    mortgages = buckets.get(MORTGAGE_BUCKET)
+    taes = sorted(
+        (int(name[len(TAE_BUCKET):]), stat) for name, stat in buckets.items()
+        if name.startswith(TAE_BUCKET) and stat.count > 0
+    )
+    count = mortgages.count if mortgages else 0
+    summary = _summary(mortgages)
+    summary["average_tae"] = round(sum(tae * stat.count for tae, stat in taes) / count, 2) if count else None
+    return {
+        "clients": {
+            "count": clients.count if clients else 0,
+            "capital": round(clients.capital, 2) if clients else 0,
+        },
+        "mortgages": summary,
+        "tae": [{"tae": tae, **_summary(stat)} for tae, stat in taes],
+    }
+
+def _summary(stat):
+    """Resumen de un cubo de hipotecas."""
+    if not stat or stat.count <= 0:
+        return {"count": 0, "capital": 0, "repayment": 0, "average_years": None}
+    return {
+        "count": stat.count,
+        "capital": round(stat.capital, 2),
+        "repayment": round(stat.repayment, 2),
+        "average_years": round(stat.years / stat.count, 2),
+    }
@@ -0,0 +1,55 @@
+from flask import current_app
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+JSON_MIMETYPE = 'application/json'
+
+def stream_format(request):
+    """
+    Indica si la peticion pide una respuesta en streaming y en que formato.
+
+    - `Accept: application/x-ndjson`: un objeto JSON por linea.
+    - `?stream=1`: el mismo documento {"value": [...]} que sin streaming,
+      pero emitido por trozos.
+
+    Args:
+        request (Request): Peticion de Flask.
+
+    Returns:
+        str | None: Mimetype de la respuesta, o None si no se pide streaming.
+    """
+    if request.accept_mimetypes.best == NDJSON_MIMETYPE:
+        return NDJSON_MIMETYPE
+    if request.args.get('stream', '').lower() in ('1', 'true', 'yes'):
+        return JSON_MIMETYPE
+    return None
+
+def stream_rows(rows, mimetype, serialize=None):
+    """
+    Genera el cuerpo de una respuesta en streaming a partir de un iterable de
+    filas, serializando una fila cada vez con el proveedor JSON de la
+    aplicacion (que se toma al llamar, dentro del contexto de la peticion).
+
+    Args:
+        rows (iterable): Filas a emitir (p.ej. un resultado con yield_per).
+        mimetype (str): Formato devuelto por `stream_format`.
+        serialize (callable | None): Convierte una fila en un diccionario. Si
+            es None las filas ya son diccionarios.
+
+    Returns:
+        iterator: Trozos (str) del cuerpo de la respuesta.
+    """
+    dumps = current_app.json.dumps
+    if serialize is not None:
+        rows = map(serialize, rows)
+    if mimetype == NDJSON_MIMETYPE:
+        return (dumps(row) + '\n' for row in rows)
+    return _json_document(rows, dumps)
+
+def _json_document(rows, dumps):
+    """Emite las filas como el documento {"value": [...]}."""
+    yield '{"value":['
+    separator = ''
+    for row in rows:
+        yield separator + dumps(row)
+        separator = ','
+    yield ']}'
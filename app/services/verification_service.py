@@ -0,0 +1,78 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from config import db
+from models import Client
+from .cache_service import CLIENT_CACHE
+from .client_service import verify_email_domain
+from .version_service import bump_version
+
+logger = logging.getLogger(__name__)
+
+# Estados de verificacion del correo de un cliente
+EMAIL_PENDING = 'pending'
+EMAIL_VERIFIED = 'verified'
+EMAIL_INVALID = 'invalid'
+
+# Pool de hilos compartido para las verificaciones en segundo plano. Se crea
+# bajo demanda con el tamaño configurado en la aplicacion.
+_executor = None
+_executor_lock = threading.Lock()
+
+def is_async(app):
+    """
+    Indica si la aplicacion verifica los correos en segundo plano.
+
+    Args:
+        app (Flask): Aplicacion Flask.
+
+    Returns:
+        bool: True si EMAIL_VERIFICATION es 'async'.
+    """
+    return app.config.get("EMAIL_VERIFICATION", "sync") == "async"
+
+def _get_executor(app):
+    """Devuelve el pool de verificacion, creandolo la primera vez."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=app.config.get("EMAIL_VERIFICATION_WORKERS", 8),
+                    thread_name_prefix="email-verification"
+                )
+    return _executor
+
+def schedule_email_verification(app, dni, email):
+    """
+    Encola la verificacion DNS/SMTP del correo de un cliente. Al terminar se
+    actualiza el estado de verificacion del cliente en la base de datos.
+
+    Args:
+        app (Flask): Aplicacion Flask (se necesita su contexto en el hilo).
+        dni (str): DNI normalizado (en minusculas) del cliente.
+        email (str): Correo a verificar.
+
+    Returns:
+        Future: Futuro de la tarea encolada.
+    """
+    return _get_executor(app).submit(_verify_client_email, app, dni, email)
+
+def _verify_client_email(app, dni, email):
+    """Tarea del pool: verifica el correo y guarda el resultado."""
+    try:
+        error = verify_email_domain(email)
+        with app.app_context():
+            client = db.session.get(Client, dni)
+            # Si el cliente se ha borrado o ha cambiado de correo mientras se
+            # verificaba, el resultado ya no aplica.
+            if client and client.email == email:
+                client.email_status = EMAIL_INVALID if error else EMAIL_VERIFIED
+                client.email_error = error or None
+                client.version = bump_version("client")
+                db.session.commit()
+                CLIENT_CACHE.invalidate(dni)
+        return error
+    except Exception:
+        logger.exception("Email verification failed", extra={"dni": dni})
+        raise
@@ -0,0 +1,73 @@
+import hashlib
+from config import db
+from models import TableVersion
+from sqlalchemy import select, update
+from werkzeug.http import quote_etag
+
+def bump_version(name):
+    """
+    Incrementa el contador de version de una tabla dentro de la transaccion en
+    curso (se confirma con el siguiente commit de la sesion). Las filas de los
+    contadores las crea `migrate_schema`, por lo que solo se actualizan.
+
+    Args:
+        name (str): Nombre de la tabla ('client', 'mortgage') o 'stats' (recalculos de los agregados).
+
+    Returns:
+        int: Nueva version de la tabla. Al ser un contador global nunca se repite,
+        por lo que tambien sirve como version de una fila concreta.
+
+    Raises:
+        LookupError: Si el contador no existe (no esta en `TableVersion.NAMES`).
+    """
+    updated = db.session.execute(
+        update(TableVersion).where(TableVersion.name == name).values(version=TableVersion.version + 1)
+    )
+    if not updated.rowcount:
+        raise LookupError(f"Unknown table version '{name}'")
+    return db.session.execute(select(TableVersion.version).where(TableVersion.name == name)).scalar()
+
+def get_version(name):
+    """
+    Version actual de una tabla.
+
+    Args:
+        name (str): Nombre de la tabla.
+
+    Returns:
+        int: Version de la tabla (0 si nunca se ha escrito en ella).
+    """
+    return db.session.execute(select(TableVersion.version).where(TableVersion.name == name)).scalar() or 0
+
+def resource_etag(kind, version):
+    """
+    ETag fuerte de un recurso a partir de su version.
+
+    Example:
+        >>> resource_etag("client", 7)
+        '"client-7"'
+    """
+    return quote_etag(f"{kind}-{version}")
+
+def collection_etag(kind, version, query_string=b'', mimetype='application/json'):
+    """
+    ETag fuerte de un listado: version de la tabla, parametros de la consulta
+    (cada pagina es una representacion distinta) y formato negociado con
+    Accept (la pagina JSON y el volcado NDJSON de la misma URL son
+    representaciones distintas; las respuestas llevan `Vary: Accept`).
+    """
+    digest = hashlib.sha1(query_string + b"\n" + mimetype.encode()).hexdigest()[:16]
+    return quote_etag(f"{kind}-{version}-{digest}")
+
+def not_modified(request, etag):
+    """
+    Indica si la peticion ya tiene la representacion actual (If-None-Match).
+
+    Args:
+        request (Request): Peticion de Flask.
+        etag (str): ETag actual del recurso, entrecomillado.
+
+    Returns:
+        bool: True si se debe responder 304.
+    """
+    return request.if_none_match.contains_weak(etag.strip('"'))
@@ -0,0 +1,23 @@
+import os
+import sys
+import pytest
+
+# Las pruebas importan los modulos de la aplicacion igual que server.py
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+
+@pytest.fixture
+def app(tmp_path):
+    """Aplicacion sobre una base de datos SQLite nueva en un directorio temporal."""
+    from server import create_app
+    return create_app({
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'database.db'}",
+        "EMAIL_VERIFICATION": "sync",
+        "WARM_UP": False,
+    })
+
+@pytest.fixture
+def client(app):
+    """Cliente de pruebas de Flask."""
+    return app.test_client()
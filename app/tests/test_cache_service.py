@@ -0,0 +1,28 @@
+from services import ClientCache, LocalCacheBackend, bump_version, get_version
+
+
+def test_client_cache_versioned_get():
+    cache = ClientCache(LocalCacheBackend(maxsize=10, ttl=60))
+    cache.set("12345678Z", 3, {"dni": "12345678Z"})
+    assert cache.get("12345678z", version=3) == {"version": 3, "value": {"dni": "12345678Z"}}
+    assert cache.get("12345678Z", version=4) is None
+    assert cache.get("12345678Z", "mortgages", version=3) is None
+
+
+def test_client_cache_misses_after_bump_version(app):
+    """Una entrada guardada antes de una escritura no se sirve con la version nueva."""
+    from config import db
+
+    cache = ClientCache(LocalCacheBackend(maxsize=10, ttl=60))
+    with app.app_context():
+        version = get_version("client")
+        cache.set("12345678Z", version, {"name": "Juan Perez"})
+        assert cache.get("12345678Z", version=version) is not None
+
+        # Escritura que no llega a invalidar (o una lectura que se cruza con ella)
+        new_version = bump_version("client")
+        db.session.commit()
+        assert cache.get("12345678Z", version=new_version) is None
+
+        cache.invalidate("12345678Z")
+        assert cache.get("12345678Z") is None
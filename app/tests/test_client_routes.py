@@ -0,0 +1,110 @@
+import json
+
+
+def test_add_client_with_string_capital(client):
+    """verify_capital admite cadenas numericas: el alta no debe fallar y los agregados las suman como numero."""
+    response = client.post("/api/client", json={"dni": "12345678Z", "name": "Juan Perez", "email": None, "capital": "1000"})
+    assert response.status_code == 200
+
+    response = client.patch("/api/client/12345678Z", json={"capital": "1500"})
+    assert response.status_code == 200
+
+    stats = client.get("/api/stats").get_json()
+    assert stats["clients"] == {"count": 1, "capital": 1500}
+
+
+def test_bulk_import_with_string_capital(client):
+    """Un capital en cadena no debe hacer fallar el bloque de la importacion masiva."""
+    body = (
+        '{"dni": "12345678Z", "name": "Juan Perez", "capital": "1000"}\n'
+        '{"dni": "87654321X", "name": "Ana Lopez", "capital": 500}\n'
+    )
+    response = client.post("/api/client/bulk", data=body, content_type="application/x-ndjson")
+    assert response.status_code == 200
+    assert [json.loads(line)["status"] for line in response.get_data(as_text=True).splitlines()] == [200, 200]
+
+    stats = client.get("/api/stats").get_json()
+    assert stats["clients"] == {"count": 2, "capital": 1500}
+
+
+def test_bulk_import_with_malformed_records(client):
+    """Los registros que no son objetos o tienen campos de otro tipo se rechazan sin cortar la respuesta."""
+    body = (
+        '42\n'
+        '{"dni": "12345678Z", "name": "Juan Perez", "capital": {"amount": 1000}}\n'
+        '{"dni": "87654321X", "name": ["Ana"]}\n'
+        '{"dni": "11111111H", "name": "Ana Lopez", "capital": 500}\n'
+    )
+    response = client.post("/api/client/bulk", data=body, content_type="application/x-ndjson")
+    results = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [result["index"] for result in results] == [0, 1, 2, 3]
+    assert [result["status"] for result in results] == [400, 400, 400, 200]
+
+
+def test_get_client_ignores_stale_cache_entry(client):
+    """Una entrada de la cache guardada con una version anterior no se sirve tras una modificacion."""
+    from services import CLIENT_CACHE
+
+    client.post("/api/client", json={"dni": "12345678Z", "name": "Juan Perez", "email": None, "capital": 1000})
+    first = client.get("/api/client/12345678Z")
+    stale = CLIENT_CACHE.get("12345678Z")
+    client.patch("/api/client/12345678Z", json={"name": "Juan Garcia"})
+    # Una lectura que se cruzo con la modificacion guarda la version antigua despues de invalidar
+    CLIENT_CACHE.set("12345678Z", stale["version"], stale["value"])
+
+    response = client.get("/api/client/12345678Z")
+    assert response.get_json()["name"] == "Juan Garcia"
+    assert response.headers["ETag"] != first.headers["ETag"]
+    assert client.get("/api/client/12345678Z", headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+
+
+def test_mortgage_batch_with_malformed_entries(client):
+    """Una entrada con tae o years de otro tipo recibe un 400 propio y el resto del lote se procesa."""
+    client.post("/api/client", json={"dni": "12345678Z", "name": "Juan Perez", "email": None, "capital": 100000})
+    entries = [{"tae": {"value": 3}, "years": 20}, {"tae": 3, "years": [20]}, {"tae": "3", "years": "20"}]
+    response = client.post("/api/client/12345678Z/mortgage/batch", json=entries)
+    assert response.status_code == 200
+    assert [result["status"] for result in response.get_json()["value"]] == [400, 400, 200]
+
+
+def test_schedule_uses_the_mortgage_capital(client):
+    """El cuadro de amortizacion usa el capital de la hipoteca aunque cambie el del cliente."""
+    client.post("/api/client", json={"dni": "12345678Z", "name": "Juan Perez", "email": None, "capital": 120000})
+    mortgage = client.post("/api/client/12345678Z/mortgage", json={"tae": 3, "years": 10}).get_json()
+    client.patch("/api/client/12345678Z", json={"capital": 240000})
+
+    response = client.get("/api/client/12345678Z/mortgage/3/10/schedule")
+    assert response.status_code == 200
+    rows = response.get_json()["value"]
+    assert rows[0]["fee"] == 1158.73
+    assert round(mortgage["value"]["monthly_fee"], 2) == 1158.73
+
+
+def test_list_etag_depends_on_the_negotiated_format(client):
+    """La pagina JSON y el volcado NDJSON de la misma URL tienen ETags distintos y Vary: Accept."""
+    client.post("/api/client", json={"dni": "12345678Z", "name": "Juan Perez", "email": None, "capital": 1000})
+    page = client.get("/api/client")
+    dump = client.get("/api/client", headers={"Accept": "application/x-ndjson"})
+    dump.close()
+    assert page.headers["ETag"] != dump.headers["ETag"]
+    assert page.headers["Vary"] == dump.headers["Vary"] == "Accept"
+
+    response = client.get("/api/client", headers={"Accept": "application/x-ndjson", "If-None-Match": page.headers["ETag"]})
+    response.close()
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+
+
+def test_quote_rejects_non_object_body(client):
+    """Un cuerpo que no es un objeto JSON es un 400, no un 500."""
+    client.post("/api/client", json={"dni": "12345678Z", "name": "Juan Perez", "email": None, "capital": 1000})
+    for body in ([1, 2], 3, "tae"):
+        assert client.post("/api/client/12345678Z/mortgage/quote", json=body).status_code == 400
+
+
+def test_add_mortgage_without_client_capital(client):
+    """Un cliente sin capital no puede contratar hipotecas: 400, no 500."""
+    client.post("/api/client", json={"dni": "12345678Z", "name": "Juan Perez", "email": None, "capital": None})
+    response = client.post("/api/client/12345678Z/mortgage", json={"tae": 3, "years": 10})
+    assert response.status_code == 400
+    assert response.get_json() == {"error": {"capital": "The client has no capital defined"}}
@@ -0,0 +1,58 @@
+import uuid
+import pytest
+from services import IdempotencyStore, idempotent
+
+
+def _key():
+    return str(uuid.uuid4())
+
+
+def test_replay_returns_the_stored_response(client):
+    key = _key()
+    body = {"dni": "12345678Z", "name": "Juan Perez", "email": None, "capital": 1000}
+    first = client.post("/api/client", json=body, headers={"Idempotency-Key": key})
+    second = client.post("/api/client", json=body, headers={"Idempotency-Key": key})
+    assert first.status_code == second.status_code == 200
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert second.get_data() == first.get_data()
+    # Sin la clave, el mismo alta se rechaza: la repeticion no se ha ejecutado
+    assert client.post("/api/client", json=body).status_code == 400
+
+
+def test_different_body_with_the_same_key_is_422(client):
+    key = _key()
+    client.post("/api/client", json={"dni": "12345678Z", "name": "Juan Perez", "email": None, "capital": 1000},
+                headers={"Idempotency-Key": key})
+    response = client.post("/api/client", json={"dni": "87654321X", "name": "Ana Lopez", "email": None, "capital": 1000},
+                           headers={"Idempotency-Key": key})
+    assert response.status_code == 422
+
+
+def test_server_errors_are_not_stored(app):
+    """Una respuesta 5xx no se guarda: el reintento con la misma clave se ejecuta de nuevo."""
+    calls = []
+
+    @idempotent
+    def flaky():
+        calls.append(1)
+        return ({"error": "Server internal error"}, 500) if len(calls) == 1 else ({"value": len(calls)}, 200)
+
+    app.add_url_rule("/test/flaky", "flaky", flaky, methods=["POST"])
+    client = app.test_client()
+    key = _key()
+    assert client.post("/test/flaky", json={}, headers={"Idempotency-Key": key}).status_code == 500
+    retry = client.post("/test/flaky", json={}, headers={"Idempotency-Key": key})
+    assert retry.status_code == 200
+    assert "Idempotent-Replayed" not in retry.headers
+    assert client.post("/test/flaky", json={}, headers={"Idempotency-Key": key}).headers["Idempotent-Replayed"] == "true"
+    assert len(calls) == 2
+
+
+def test_inflight_request_times_out():
+    """Una repeticion mientras la original sigue en curso espera y, al agotar el tiempo, falla (409 en la ruta)."""
+    store = IdempotencyStore(maxsize=10, ttl=60)
+    assert store.begin("key", timeout=1) is None
+    with pytest.raises(TimeoutError):
+        store.begin("key", timeout=0.05)
+    store.finish("key", {"status": 200})
+    assert store.begin("key", timeout=0.05) == {"status": 200}
@@ -0,0 +1,19 @@
+import pytest
+from services import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(["12345678z", 3, 20])) == ["12345678z", 3, 20]
+
+
+@pytest.mark.parametrize("values", [[[], 1, 2], [{"dni": "a"}], [True], [1.5], []])
+def test_decode_cursor_rejects_invalid_values(values):
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor(values))
+
+
+@pytest.mark.parametrize("after", ["W1tdLDEsMl0", encode_cursor([1, 2, 3]), encode_cursor(["12345678z", "3", 20]), encode_cursor(["12345678z"])])
+def test_mortgage_list_rejects_malformed_cursor(client, after):
+    """Un cursor con valores del tipo o numero equivocados es un 400, no un 500."""
+    response = client.get(f"/api/mortgage?after={after}")
+    assert response.status_code == 400
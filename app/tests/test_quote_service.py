@@ -0,0 +1,13 @@
+import pytest
+from services import parse_quote_axis
+
+
+def test_parse_quote_axis_range_and_list():
+    assert parse_quote_axis({"start": 1, "stop": 5, "step": 2}, "tae", 100) == ([1, 3, 5], '')
+    assert parse_quote_axis([10, 20], "years", 100) == ([10, 20], '')
+
+
+@pytest.mark.parametrize("value", [[1.9], [True], ["3"], {"start": 1.5, "stop": 5}, {"start": 1, "stop": True}, {"start": 1, "stop": 5, "step": 1.0}])
+def test_parse_quote_axis_rejects_non_integers(value):
+    """int() truncaria los decimales y convertiria true en 1: solo se aceptan enteros."""
+    assert parse_quote_axis(value, "tae", 100) == ([], "Invalid tae")
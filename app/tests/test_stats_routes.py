@@ -0,0 +1,7 @@
+def test_stats_etag_changes_after_recompute(client):
+    """Tras recalcular los agregados, el ETag anterior de las estadisticas deja de ser valido."""
+    etag = client.get("/api/stats").headers["ETag"]
+    assert client.get("/api/stats", headers={"If-None-Match": etag}).status_code == 304
+
+    assert client.post("/api/stats/recompute").status_code == 200
+    assert client.get("/api/stats", headers={"If-None-Match": etag}).status_code == 200
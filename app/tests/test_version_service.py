@@ -0,0 +1,11 @@
+def test_migrations_seed_table_versions(app):
+    """Los contadores de version existen desde el arranque, asi bump_version solo actualiza."""
+    from models import TableVersion
+    from services import bump_version, get_version
+    from config import db
+
+    with app.app_context():
+        names = set(db.session.execute(db.select(TableVersion.name)).scalars())
+        assert names == set(TableVersion.NAMES)
+        assert bump_version("stats") == get_version("stats") == 1
+        db.session.rollback()
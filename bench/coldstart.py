@@ -0,0 +1,100 @@
+"""
+Tiempo de arranque en frio de la aplicacion.
+
+Cada ejecucion es un interprete nuevo sobre una base de datos vacia que mide
+por separado la importacion de `server`, `create_app()` (configuracion,
+blueprints y creacion del esquema) y la primera peticion. Ademas indica que
+modulos de red pesados (dnspython, smtplib, anyio) se han cargado sin usarse.
+
+Uso (desde la raiz del repositorio):
+    python bench/coldstart.py                    # 5 arranques, mediana por fase
+    python bench/coldstart.py --warm-up          # con WARM_UP=1
+    python bench/coldstart.py --budget-ms 1500   # codigo 1 si la mediana total lo supera
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+APP_DIR = os.path.join(ROOT_DIR, 'app')
+
+# Modulos que no deberian cargarse hasta verificar un correo o usar el modo ASGI
+LAZY_MODULES = ("dns.resolver", "smtplib", "anyio", "services.email_service", "services.asgi_service")
+
+# Programa que ejecuta cada interprete: imprime una linea JSON con las fases
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import server
+imported = time.perf_counter()
+app = server.create_app()
+created = time.perf_counter()
+response = app.test_client().get("/api/client?limit=1")
+requested = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "create_ms": (created - imported) * 1000,
+    "first_request_ms": (requested - created) * 1000,
+    "status": response.status_code,
+    "loaded": [name for name in %r if name in sys.modules],
+}))
+""" % (LAZY_MODULES,)
+
+def run_once(warm_up):
+    """
+    Arranca la aplicacion en un interprete nuevo.
+
+    Returns:
+        dict: Milisegundos de cada fase, estado de la primera peticion y
+        modulos perezosos cargados.
+    """
+    with tempfile.TemporaryDirectory(prefix="roams-coldstart-") as directory:
+        env = dict(os.environ, STORAGE="file", DATABASE_PATH=os.path.join(directory, "database.db"),
+                   LOG_LEVEL="WARNING", WARM_UP="1" if warm_up else "0")
+        result = subprocess.run([sys.executable, "-c", PROBE], cwd=APP_DIR, env=env,
+                                capture_output=True, text=True, check=True)
+    sample = json.loads(result.stdout.strip().splitlines()[-1])
+    sample["total_ms"] = sample["import_ms"] + sample["create_ms"] + sample["first_request_ms"]
+    return sample
+
+def summarize(samples):
+    """Mediana y minimo de cada fase."""
+    summary = {}
+    for phase in ("import_ms", "create_ms", "first_request_ms", "total_ms"):
+        values = [sample[phase] for sample in samples]
+        summary[phase] = {"median": round(statistics.median(values), 1), "min": round(min(values), 1)}
+    summary["loaded_lazy_modules"] = sorted({name for sample in samples for name in sample["loaded"]})
+    summary["errors"] = sum(1 for sample in samples if sample["status"] >= 400)
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tiempo de arranque en frio de la aplicacion.")
+    parser.add_argument("--runs", type=int, default=5, help="Arranques a medir.")
+    parser.add_argument("--warm-up", action="store_true", help="Arranca con WARM_UP=1.")
+    parser.add_argument("--budget-ms", type=float, help="Mediana maxima del tiempo total.")
+    parser.add_argument("--json", action="store_true", help="Muestra el resultado en JSON.")
+    args = parser.parse_args(argv)
+
+    summary = summarize([run_once(args.warm_up) for _ in range(args.runs)])
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        for phase in ("import_ms", "create_ms", "first_request_ms", "total_ms"):
+            print(f"{phase:<18} {summary[phase]['median']:>9.1f} ms (min {summary[phase]['min']:.1f})")
+        print(f"{'lazy modules':<18} {', '.join(summary['loaded_lazy_modules']) or '-'}")
+
+    if summary["errors"]:
+        print("La primera peticion ha fallado", file=sys.stderr)
+        return 1
+    if args.budget_ms is not None and summary["total_ms"]["median"] > args.budget_ms:
+        print(f"Arranque por encima del presupuesto: {summary['total_ms']['median']} ms > {args.budget_ms} ms", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,470 @@
+"""
+Prueba de carga HTTP reproducible de la API.
+
+Crea la aplicacion con `server.create_app` y la arranca con waitress sobre una base de datos temporal sembrada
+con N clientes y M hipotecas, sustituye DNS y SMTP por stubs locales con
+latencia configurable y lanza trabajadores concurrentes que recorren todas
+las rutas de /api/client y /api/mortgage con una mezcla de lecturas y
+escrituras. El resultado (throughput, latencias p50/p95/p99 y tasa de error,
+en total y por operacion) se escribe en JSON y se puede comparar con una
+linea base guardada.
+
+Uso (desde la raiz del repositorio):
+    python bench/loadtest.py --clients 2000 --mortgages 4000 --duration 20
+    python bench/loadtest.py --baseline bench/baselines/loadtest.json
+    python bench/loadtest.py --baseline bench/baselines/loadtest.json --save-baseline
+
+El proceso termina con codigo 1 si hay regresiones respecto a la linea base.
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+APP_DIR = os.path.join(ROOT_DIR, 'app')
+
+# Letras de control del DNI
+LETTERS = 'TRWAGMYFPDXBNJZSQVHLCKE'
+
+def dni_for(number):
+    """DNI valido a partir de su numero."""
+    return f"{number:08d}{LETTERS[number % 23]}"
+
+def name_for(number):
+    """Nombre valido (solo letras y espacios) a partir de un numero."""
+    letters = ''
+    while True:
+        number, rest = divmod(number, 26)
+        letters += chr(ord('a') + rest)
+        if not number:
+            return f"Cliente {letters}"
+
+def percentile(values, fraction):
+    """Percentil de una lista ya ordenada (metodo del rango mas cercano)."""
+    if not values:
+        return None
+    index = min(len(values) - 1, max(0, int(round(fraction * len(values) + 0.5)) - 1))
+    return values[index]
+
+# == Arranque del servidor ================================================
+
+def boot(args, database_path):
+    """
+    Configura el entorno, importa la aplicacion, siembra la base de datos,
+    instala los stubs de correo y arranca waitress en un puerto libre.
+
+    Returns:
+        dict: Servidor, puerto, stubs y datos sembrados.
+    """
+    os.environ.update({
+        "STORAGE": "file",
+        "DATABASE_PATH": database_path,
+        "THREADS": str(args.threads),
+        "EMAIL_VERIFICATION": args.email_verification,
+        "LOG_LEVEL": args.log_level,
+    })
+    sys.path.insert(0, APP_DIR)
+    from config import db
+    from server import create_app
+    from services import observe_dispatcher, waitress_options
+    from stubs import install_email_stubs
+    from waitress import create_server
+
+    # Los avisos de cola de waitress son esperables al saturar el servidor
+    logging.getLogger("waitress.queue").setLevel(logging.ERROR)
+    app = create_app()
+    with app.app_context():
+        seeded = seed(db, args, random.Random(args.seed))
+    resolver, smtp = install_email_stubs(args.dns_latency_ms / 1000, args.smtp_latency_ms / 1000)
+
+    server = create_server(app, host="127.0.0.1", port=0, **waitress_options(app))
+    observe_dispatcher(server.task_dispatcher)
+    stopping = threading.Event()
+
+    def serve():
+        # Equivalente a server.run(), pero con un bucle que se puede detener
+        while not stopping.is_set():
+            server.asyncore.loop(timeout=0.1, map=server._map, use_poll=server.adj.asyncore_use_poll, count=1)
+
+    thread = threading.Thread(target=serve, name="bench-server", daemon=True)
+    thread.start()
+
+    def shutdown():
+        stopping.set()
+        thread.join()
+        server.task_dispatcher.shutdown()
+        server.close()
+        smtp.shutdown()
+        with app.app_context():
+            db.engine.dispose()
+
+    return {"port": server.effective_port, "shutdown": shutdown, "resolver": resolver, "smtp": smtp, **seeded}
+
+def seed(db, args, rng):
+    """
+    Inserta los clientes y las hipotecas de partida con inserciones en lote.
+
+    Returns:
+        dict: DNI de los clientes sembrados ("clients") y claves (dni, tae,
+        years) de las hipotecas sembradas ("mortgages").
+    """
+    from models import Client, Mortgage
+    from services import monthly_fee, recompute_portfolio_stats
+    from sqlalchemy import insert
+
+    clients = []
+    for number in range(1, args.clients + 1):
+        clients.append({
+            "dni": dni_for(number).lower(),
+            "name": name_for(number),
+            "email": f"user{number}@d{number % args.email_domains}.bench.test",
+            "capital": rng.randrange(50_000, 500_000, 1000),
+            "email_status": "verified",
+            "version": 1,
+        })
+    keys = set()
+    mortgages = []
+    while len(mortgages) < min(args.mortgages, args.clients * 10 * 36):
+        client = rng.choice(clients)
+        tae, years = rng.randint(1, 10), rng.choice(range(5, 41))
+        if (client["dni"], tae, years) in keys:
+            continue
+        keys.add((client["dni"], tae, years))
+        mortgages.append({
+            "dni": client["dni"], "tae": tae, "years": years, "capital": client["capital"],
+            "monthly_fee": monthly_fee(client["capital"], tae, years),
+        })
+    for start in range(0, len(clients), 5000):
+        db.session.execute(insert(Client), clients[start:start + 5000])
+    for start in range(0, len(mortgages), 5000):
+        db.session.execute(insert(Mortgage), mortgages[start:start + 5000])
+    recompute_portfolio_stats()
+    db.session.commit()
+    return {"clients": [client["dni"] for client in clients], "mortgages": sorted(keys)}
+
+# == Carga ================================================================
+
+class Worker:
+    """
+    Trabajador con una conexion HTTP persistente. Solo borra los clientes y
+    las hipotecas que ha creado, por lo que los datos sembrados se mantienen y
+    las lecturas sobre ellos siempre deben responder 200.
+    """
+    def __init__(self, index, port, context, rng):
+        self.index = index
+        self.port = port
+        self.context = context
+        self.rng = rng
+        self.connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        self.next_number = 50_000_000 + index * 1_000_000
+        self.created = []
+        self.mortgages = []
+        self.samples = []
+
+    def new_client(self, email_user=None):
+        """Datos de un cliente nuevo con un DNI del rango del trabajador."""
+        self.next_number += 1
+        number = self.next_number
+        user = email_user or f"user{number}"
+        return {
+            "dni": dni_for(number), "name": name_for(number),
+            "email": f"{user}@d{number % self.context['email_domains']}.bench.test",
+            "capital": self.rng.randrange(50_000, 500_000, 1000),
+        }
+
+    def request(self, method, path, body=None, content_type="application/json"):
+        """Envia la peticion y devuelve (estado, cuerpo)."""
+        headers = {}
+        if body is not None:
+            if not isinstance(body, (bytes, str)):
+                body = json.dumps(body)
+            headers["Content-Type"] = content_type
+        try:
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            return response.status, response.read()
+        except (OSError, http.client.HTTPException):
+            self.connection.close()
+            self.connection = http.client.HTTPConnection("127.0.0.1", self.port, timeout=60)
+            return None, b''
+
+    # -- Operaciones: cada una devuelve True si la respuesta es la esperada --
+
+    def get_client(self):
+        status, _ = self.request("GET", f"/api/client/{self.rng.choice(self.context['clients'])}")
+        return status == 200
+
+    def get_client_mortgages(self):
+        status, _ = self.request("GET", f"/api/client/{self.rng.choice(self.context['clients'])}/mortgage")
+        return status == 200
+
+    def list_clients(self):
+        status, _ = self.request("GET", "/api/client?limit=50")
+        return status == 200
+
+    def list_mortgages(self):
+        status, _ = self.request("GET", "/api/mortgage?limit=50")
+        return status == 200
+
+    def get_schedule(self):
+        dni, tae, years = self.rng.choice(self.context['mortgages'])
+        status, _ = self.request("GET", f"/api/client/{dni}/mortgage/{tae}/{years}/schedule")
+        return status == 200
+
+    def quote(self):
+        body = {"tae": {"start": 1, "stop": 10}, "years": {"start": 5, "stop": 40, "step": 5}}
+        status, _ = self.request("POST", f"/api/client/{self.rng.choice(self.context['clients'])}/mortgage/quote", body)
+        return status == 200
+
+    def create_client(self):
+        client = self.new_client()
+        status, _ = self.request("POST", "/api/client", client)
+        if status == 200:
+            self.created.append(client["dni"])
+        return status == 200
+
+    def create_client_rejected(self):
+        # Buzon rechazado por el stub SMTP: se espera un 400
+        status, _ = self.request("POST", "/api/client", self.new_client(email_user=f"unknown{self.next_number}"))
+        return status == 400
+
+    def update_client(self):
+        dni = self.rng.choice(self.created) if self.created else self.rng.choice(self.context['clients'])
+        status, _ = self.request("PATCH", f"/api/client/{dni}", {"capital": self.rng.randrange(50_000, 500_000, 1000)})
+        return status == 200
+
+    def add_mortgage(self):
+        if not self.created:
+            return self.create_client()
+        dni = self.rng.choice(self.created)
+        tae, years = self.rng.randint(1, 10), self.rng.choice(range(5, 41))
+        status, _ = self.request("POST", f"/api/client/{dni}/mortgage", {"tae": tae, "years": years})
+        if status == 200:
+            self.mortgages.append((dni, tae, years))
+        return status == 200
+
+    def delete_mortgage(self):
+        if not self.mortgages:
+            return self.add_mortgage()
+        dni, tae, years = self.mortgages.pop(self.rng.randrange(len(self.mortgages)))
+        status, _ = self.request("DELETE", f"/api/client/{dni}/mortgage", {"tae": tae, "years": years})
+        # Puede haberse borrado antes junto con su cliente
+        return status in (200, 404)
+
+    def delete_client(self):
+        if not self.created:
+            return self.create_client()
+        dni = self.created.pop(self.rng.randrange(len(self.created)))
+        status, _ = self.request("DELETE", f"/api/client/{dni}")
+        return status == 200
+
+    def bulk_import(self):
+        clients = [self.new_client() for _ in range(20)]
+        body = "\n".join(json.dumps(client) for client in clients)
+        status, payload = self.request("POST", "/api/client/bulk", body, "application/x-ndjson")
+        results = [json.loads(line) for line in payload.splitlines() if line.strip()] if status == 200 else []
+        self.created.extend(result["dni"] for result in results if result.get("status") == 200)
+        return status == 200 and len(results) == len(clients) and all(r.get("status") == 200 for r in results)
+
+# Mezcla por defecto: (peso, escritura)
+OPERATIONS = {
+    "get_client": (25, False),
+    "get_client_mortgages": (15, False),
+    "list_clients": (10, False),
+    "list_mortgages": (10, False),
+    "get_schedule": (12, False),
+    "quote": (8, False),
+    "create_client": (6, True),
+    "create_client_rejected": (1, True),
+    "update_client": (4, True),
+    "add_mortgage": (4, True),
+    "delete_mortgage": (2, True),
+    "delete_client": (2, True),
+    "bulk_import": (1, True),
+}
+
+def operation_weights(write_ratio):
+    """Pesos de las operaciones escalados para que las escrituras sumen `write_ratio`."""
+    reads = sum(weight for weight, write in OPERATIONS.values() if not write)
+    writes = sum(weight for weight, write in OPERATIONS.values() if write)
+    return {
+        name: (weight / writes * write_ratio if write else weight / reads * (1 - write_ratio))
+        for name, (weight, write) in OPERATIONS.items()
+    }
+
+def run_load(args, context):
+    """
+    Ejecuta la carga durante el calentamiento mas la duracion indicada.
+
+    Returns:
+        tuple: (muestras [(operacion, segundos, correcta)], segundos medidos)
+    """
+    weights = operation_weights(args.write_ratio)
+    names, values = list(weights), list(weights.values())
+    start = time.perf_counter()
+    measure_from = start + args.warmup
+    deadline = measure_from + args.duration
+    workers = [Worker(index, context["port"], context, random.Random(args.seed * 1000 + index)) for index in range(args.workers)]
+
+    def loop(worker):
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            name = worker.rng.choices(names, values)[0]
+            ok = getattr(worker, name)()
+            end = time.perf_counter()
+            if now >= measure_from:
+                worker.samples.append((name, end - now, ok))
+        worker.connection.close()
+
+    threads = [threading.Thread(target=loop, args=(worker,), name=f"bench-worker-{worker.index}") for worker in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return [sample for worker in workers for sample in worker.samples], args.duration
+
+def summarize(samples, elapsed):
+    """Throughput, latencias y tasa de error de un conjunto de muestras."""
+    latencies = sorted(latency for _, latency, _ in samples)
+    errors = sum(1 for _, _, ok in samples if not ok)
+    return {
+        "requests": len(samples),
+        "throughput": round(len(samples) / elapsed, 2) if elapsed else 0,
+        "error_rate": round(errors / len(samples), 4) if samples else 0,
+        "latency_ms": {
+            name: round(percentile(latencies, fraction) * 1000, 3) if latencies else None
+            for name, fraction in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99), ("max", 1.0))
+        },
+    }
+
+def source_commit():
+    """
+    Commit del codigo medido, con el sufijo '-dirty' si app/ tiene cambios sin
+    confirmar. None si no se ejecuta dentro de un repositorio git.
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--", "app"], cwd=ROOT_DIR,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return f"{commit}-dirty" if dirty else commit
+
+def build_report(args, samples, elapsed, context):
+    """Informe JSON de la ejecucion."""
+    by_operation = {}
+    for sample in samples:
+        by_operation.setdefault(sample[0], []).append(sample)
+    return {
+        "config": {
+            key: getattr(args, key) for key in (
+                "clients", "mortgages", "workers", "threads", "duration", "warmup", "write_ratio",
+                "dns_latency_ms", "smtp_latency_ms", "email_domains", "email_verification", "seed",
+            )
+        },
+        "python": sys.version.split()[0],
+        "commit": source_commit(),
+        "total": summarize(samples, elapsed),
+        "operations": {name: summarize(items, elapsed) for name, items in sorted(by_operation.items())},
+        "stubs": {"dns_queries": context["resolver"].queries, "smtp_connections": context["smtp"].connections},
+    }
+
+# == Lineas base ==========================================================
+
+def compare(report, baseline, tolerance, min_requests=20):
+    """
+    Compara el informe con una linea base.
+
+    Se considera regresion (en total y por cada operacion con al menos
+    `min_requests` peticiones en ambos informes) que el throughput baje o que
+    p95/p99 suban mas de `tolerance`, o que la tasa de error suba mas de un
+    punto porcentual.
+
+    Returns:
+        list: Descripcion de cada regresion encontrada.
+    """
+    regressions = []
+    pairs = [("total", report["total"], baseline.get("total", {}))]
+    pairs += [
+        (name, stats, baseline.get("operations", {}).get(name, {}))
+        for name, stats in report["operations"].items()
+    ]
+    for name, current, base in pairs:
+        if current.get("requests", 0) < min_requests or base.get("requests", 0) < min_requests:
+            continue
+        if current["throughput"] < base["throughput"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {current['throughput']} < {base['throughput']} (-{tolerance:.0%})")
+        for key in ("p95", "p99"):
+            now, before = current["latency_ms"][key], base["latency_ms"][key]
+            if now is not None and before is not None and now > before * (1 + tolerance):
+                regressions.append(f"{name}: {key} {now} ms > {before} ms (+{tolerance:.0%})")
+        if current["error_rate"] > base["error_rate"] + 0.01:
+            regressions.append(f"{name}: error rate {current['error_rate']} > {base['error_rate']}")
+    return regressions
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga HTTP de la API con DNS/SMTP simulados.")
+    parser.add_argument("--clients", type=int, default=2000, help="Clientes sembrados.")
+    parser.add_argument("--mortgages", type=int, default=4000, help="Hipotecas sembradas.")
+    parser.add_argument("--workers", type=int, default=8, help="Trabajadores concurrentes.")
+    parser.add_argument("--threads", type=int, default=8, help="Hilos de waitress (THREADS).")
+    parser.add_argument("--duration", type=float, default=20, help="Segundos medidos.")
+    parser.add_argument("--warmup", type=float, default=2, help="Segundos de calentamiento no medidos.")
+    parser.add_argument("--write-ratio", type=float, default=0.2, help="Fraccion de operaciones de escritura.")
+    parser.add_argument("--dns-latency-ms", type=float, default=20, help="Latencia de cada consulta DNS simulada.")
+    parser.add_argument("--smtp-latency-ms", type=float, default=5, help="Latencia de cada respuesta SMTP simulada.")
+    parser.add_argument("--email-domains", type=int, default=50, help="Dominios de correo distintos.")
+    parser.add_argument("--email-verification", choices=("sync", "async"), default="sync", help="EMAIL_VERIFICATION.")
+    parser.add_argument("--log-level", default="WARNING", help="LOG_LEVEL del servidor.")
+    parser.add_argument("--seed", type=int, default=1, help="Semilla de los datos y de la mezcla.")
+    parser.add_argument("--output", help="Fichero donde escribir el informe JSON (por defecto, la salida estandar).")
+    parser.add_argument("--baseline", help="Linea base JSON con la que comparar.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Empeoramiento relativo tolerado.")
+    parser.add_argument("--save-baseline", action="store_true", help="Guarda el informe como nueva linea base.")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory(prefix="roams-bench-") as directory:
+        context = boot(args, os.path.join(directory, "bench.db"))
+        context["email_domains"] = args.email_domains
+        samples, elapsed = run_load(args, context)
+        context["shutdown"]()
+        report = build_report(args, samples, elapsed, context)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+
+    if args.baseline and args.save_baseline:
+        with open(args.baseline, "w") as file:
+            file.write(output + "\n")
+        return 0
+    if args.baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        if baseline.get("config") != report["config"]:
+            print("WARNING the baseline was recorded with a different configuration", file=sys.stderr)
+        regressions = compare(report, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
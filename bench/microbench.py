@@ -0,0 +1,188 @@
+"""
+Micro-benchmarks de los caminos calientes en Python puro: validadores,
+calculo de la cuota y serializacion de los modelos.
+
+Cada benchmark mide el coste por llamada (el mejor de varias repeticiones
+con `timeit`). Los resultados se pueden guardar en un historial por commit
+(bench/results/microbench.jsonl) y comparar con el ultimo registro guardado
+de otro commit, para ver el cambio de coste al tocar validadores o modelos.
+
+Uso (desde la raiz del repositorio):
+    python bench/microbench.py                  # ejecutar y mostrar
+    python bench/microbench.py --compare        # comparar con el ultimo commit registrado (mismo Python)
+    python bench/microbench.py --record         # anadir al historial
+    python bench/microbench.py -k get_dict      # solo los que contienen 'get_dict'
+
+Con --compare el proceso termina con codigo 1 si algun benchmark es mas lento
+que el registrado en mas de --threshold.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import timeit
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+APP_DIR = os.path.join(ROOT_DIR, 'app')
+HISTORY = os.path.join(BENCH_DIR, 'results', 'microbench.jsonl')
+
+def _client(mortgages):
+    """Cliente en memoria (sin base de datos) con el numero de hipotecas indicado."""
+    from models import Client, Mortgage
+    client = Client(dni="12345678z", name="Juan Perez", email="juan.perez@example.com", capital=150000,
+                    email_status="verified", version=1)
+    client.mortgages = [
+        Mortgage(dni="12345678z", tae=1 + index % 10, years=5 + index // 10, monthly_fee=512.3, capital=150000)
+        for index in range(mortgages)
+    ]
+    return client
+
+def benchmarks():
+    """
+    Benchmarks disponibles.
+
+    Returns:
+        dict: Funcion sin argumentos por nombre de benchmark.
+    """
+    from services import classify_identifier, verify_dni, verify_client, verify_mortgage, monthly_fee
+
+    cases = {
+        # Validacion sin memorizar de cada rama y validacion memorizada de las rutas
+        "classify_identifier[DNI]": lambda: classify_identifier("12345678z"),
+        "classify_identifier[NIE]": lambda: classify_identifier("x1234567l"),
+        "classify_identifier[CIF]": lambda: classify_identifier("b12345674"),
+        "classify_identifier[invalid]": lambda: classify_identifier("1234"),
+        "verify_dni[cached]": lambda: verify_dni("12345678z"),
+        # Validacion completa sin las comprobaciones de red del correo
+        "verify_client": lambda: verify_client(
+            {"dni": "12345678z", "name": "Juan Perez", "email": "juan.perez@example.com", "capital": 150000},
+            network=False),
+        "verify_mortgage": lambda: verify_mortgage({"dni": "12345678z", "tae": 3, "years": 20}),
+        # Cuota de add_client_mortgage
+        "monthly_fee": lambda: monthly_fee(150000, 3, 20),
+        "monthly_fee[tae=0]": lambda: monthly_fee(150000, 0, 20),
+    }
+    mortgage = _client(1).mortgages[0]
+    cases["Mortgage.get_dict"] = mortgage.get_dict
+    for count in (0, 10, 100):
+        client = _client(count)
+        cases[f"Client.get_dict[{count}]"] = client.get_dict
+        cases[f"json(Client.get_dict)[{count}]"] = lambda client=client: json.dumps(client.get_dict())
+    # Serializacion de los listados desde filas de columnas y proveedor JSON
+    from flask import Flask
+    from models import Mortgage
+    from services import FastJSONProvider, mortgage_dicts
+    rows = [("12345678z", 1 + index % 10, 5 + index // 10, 512.3) for index in range(100)]
+    cases["mortgage_dicts[100]"] = lambda: mortgage_dicts(rows)
+    payload = {"value": mortgage_dicts(rows), "next": None}
+    for name, use_orjson in (("std", False), ("orjson", True)):
+        provider = FastJSONProvider(Flask(__name__), use_orjson=use_orjson)
+        if provider.use_orjson == use_orjson:
+            cases[f"FastJSONProvider[{name}](100 mortgages)"] = lambda provider=provider: provider.dumps(payload)
+    return cases
+
+def measure(function, repeat=5, min_time=0.2):
+    """
+    Coste por llamada en nanosegundos: el mejor de `repeat` repeticiones de un
+    numero de llamadas que tarde al menos `min_time` segundos.
+    """
+    timer = timeit.Timer(function)
+    number = 1
+    while timer.timeit(number) < min_time:
+        number *= 2
+    best = min(timer.repeat(repeat=repeat, number=number))
+    return {"ns_per_call": round(best / number * 1e9, 1), "calls": number}
+
+def git_revision():
+    """Commit actual y si hay cambios sin confirmar en app/."""
+    def git(*args):
+        try:
+            return subprocess.run(["git", *args], cwd=ROOT_DIR, capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    commit = git("rev-parse", "HEAD")
+    status = git("status", "--porcelain", "--", "app")
+    return commit, bool(status)
+
+def load_history():
+    """Registros del historial, del mas antiguo al mas reciente."""
+    if not os.path.exists(HISTORY):
+        return []
+    with open(HISTORY) as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+def compare(report, previous, threshold):
+    """
+    Compara cada benchmark con el registro anterior.
+
+    Returns:
+        tuple: (lineas de la tabla, nombres de los benchmarks mas lentos que `threshold`)
+    """
+    lines, slower = [], []
+    for name, result in report["results"].items():
+        before = previous["results"].get(name)
+        if not before:
+            lines.append(f"{name:<32} {result['ns_per_call']:>12.1f} ns   (nuevo)")
+            continue
+        change = result["ns_per_call"] / before["ns_per_call"] - 1
+        mark = ""
+        if change > threshold:
+            mark = "  SLOWER"
+            slower.append(name)
+        lines.append(f"{name:<32} {result['ns_per_call']:>12.1f} ns  {before['ns_per_call']:>12.1f} ns  {change:+7.1%}{mark}")
+    return lines, slower
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-benchmarks de validadores, cuota y serializacion.")
+    parser.add_argument("-k", "--filter", default="", help="Solo los benchmarks cuyo nombre contiene el texto.")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeticiones por benchmark (se toma la mejor).")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Segundos minimos de cada repeticion.")
+    parser.add_argument("--record", action="store_true", help="Anade el resultado al historial por commit.")
+    parser.add_argument("--compare", action="store_true", help="Compara con el ultimo registro de otro commit.")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Empeoramiento relativo tolerado en --compare.")
+    parser.add_argument("--json", action="store_true", help="Muestra el resultado en JSON.")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, APP_DIR)
+    commit, dirty = git_revision()
+    report = {
+        "commit": commit,
+        "dirty": dirty,
+        "date": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": sys.version.split()[0],
+        "results": {
+            name: measure(function, args.repeat, args.min_time)
+            for name, function in benchmarks().items() if args.filter in name
+        },
+    }
+
+    status = 0
+    if args.compare:
+        # Solo se compara con registros de la misma version de Python: el
+        # coste por llamada cambia entre versiones aunque el codigo no cambie
+        history = [entry for entry in load_history() if (entry["commit"], entry["dirty"]) != (commit, dirty)]
+        previous = next((entry for entry in reversed(history) if entry.get("python") == report["python"]), None)
+        if previous is None:
+            print(f"No hay registros anteriores con Python {report['python']} con los que comparar", file=sys.stderr)
+        else:
+            print(f"Comparando con {previous['commit'][:12]}{' (dirty)' if previous['dirty'] else ''} del {previous['date']}")
+            lines, slower = compare(report, previous, args.threshold)
+            print("\n".join(lines))
+            status = 1 if slower else 0
+    elif args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for name, result in report["results"].items():
+            print(f"{name:<32} {result['ns_per_call']:>12.1f} ns")
+
+    if args.record:
+        os.makedirs(os.path.dirname(HISTORY), exist_ok=True)
+        with open(HISTORY, "a") as file:
+            file.write(json.dumps(report) + "\n")
+    return status
+
+if __name__ == '__main__':
+    sys.exit(main())
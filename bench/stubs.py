@@ -0,0 +1,124 @@
+import smtplib
+import socketserver
+import threading
+import time
+import dns.resolver
+import services.email_service as email_service
+from services.email_service import EmailVerifier, SMTPSessionPool
+
+# == Stubs de DNS y SMTP ==================================================
+# Sustituyen la red en los benchmarks: la verificacion de correos recorre el
+# mismo codigo (caches, pool de sesiones, transacciones RCPT) pero contra un
+# resolutor y un servidor SMTP locales con una latencia configurable.
+# Convenciones de los datos de prueba:
+# - Los dominios terminados en '.invalid' no tienen MX.
+# - Los buzones cuya parte local empieza por 'unknown' se rechazan (550).
+
+class _Exchange:
+    """Nombre de un registro MX (imita a dns.name.Name)."""
+    def __init__(self, name):
+        self.name = name
+
+    def to_text(self):
+        return self.name + '.'
+
+class _MXRecord:
+    """Registro MX con prioridad y servidor."""
+    def __init__(self, preference, exchange):
+        self.preference = preference
+        self.exchange = _Exchange(exchange)
+
+class StubResolver:
+    """
+    Resolutor DNS local: responde a las consultas MX tras `latency` segundos.
+
+    Args:
+        latency (float): Latencia de cada consulta en segundos.
+    """
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.queries = 0
+
+    def resolve(self, domain, rdtype):
+        self.queries += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if domain.endswith('.invalid'):
+            raise dns.resolver.NXDOMAIN()
+        return [_MXRecord(10, f"mx.{domain}")]
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Sesion SMTP minima: acepta todo salvo los buzones 'unknown*'."""
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        self.wfile.write(b"220 stub ESMTP\r\n")
+        for line in self.rfile:
+            if server.latency:
+                time.sleep(server.latency)
+            command = line.decode(errors="replace").strip().upper()
+            if command.startswith("QUIT"):
+                self.wfile.write(b"221 bye\r\n")
+                return
+            if command.startswith("RCPT"):
+                self.wfile.write(b"550 unknown mailbox\r\n" if "<UNKNOWN" in command else b"250 ok\r\n")
+            else:
+                self.wfile.write(b"250 ok\r\n")
+
+class StubSMTPServer(socketserver.ThreadingTCPServer):
+    """
+    Servidor SMTP local en un puerto libre de 127.0.0.1. Cada comando se
+    responde tras `latency` segundos.
+
+    Args:
+        latency (float): Latencia de cada respuesta en segundos.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+    # Cola de conexiones pendientes: muchas verificaciones pueden conectar a la vez
+    request_queue_size = 1024
+
+    def __init__(self, latency=0.0):
+        super().__init__(("127.0.0.1", 0), _SMTPHandler)
+        self.latency = latency
+        self.connections = 0
+        self.lock = threading.Lock()
+        self.port = self.server_address[1]
+
+    def start(self):
+        """Atiende conexiones en un hilo en segundo plano."""
+        threading.Thread(target=self.serve_forever, name="stub-smtp", daemon=True).start()
+        return self
+
+class StubSMTPSessionPool(SMTPSessionPool):
+    """Pool de sesiones que conecta con el servidor SMTP local sea cual sea el host MX."""
+    def __init__(self, port, **kwargs):
+        super().__init__(**kwargs)
+        self.port = port
+
+    def connect(self, host):
+        smtp = smtplib.SMTP(timeout=self.timeout)
+        smtp.connect("127.0.0.1", self.port)
+        smtp.helo(self.helo_name)
+        return smtp
+
+def install_email_stubs(dns_latency=0.0, smtp_latency=0.0):
+    """
+    Sustituye el motor de verificacion de correos compartido por uno que usa
+    el resolutor y el servidor SMTP locales.
+
+    Args:
+        dns_latency (float): Latencia de cada consulta DNS en segundos.
+        smtp_latency (float): Latencia de cada respuesta SMTP en segundos.
+
+    Returns:
+        tuple: (StubResolver, StubSMTPServer) para consultar sus contadores.
+    """
+    server = StubSMTPServer(smtp_latency).start()
+    resolver = StubResolver(dns_latency)
+    verifier = EmailVerifier()
+    verifier.resolver = resolver
+    verifier.pool = StubSMTPSessionPool(server.port, timeout=10)
+    email_service._verifier = verifier
+    return resolver, server